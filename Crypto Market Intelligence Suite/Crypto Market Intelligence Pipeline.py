@@ -2,7 +2,8 @@
 Crypto Market Intelligence Pipeline
 
 A robust implementation of the semester project notebook that:
-- Fetches historical market data from CoinGecko for Bitcoin, Ethereum, and Ripple
+- Fetches historical market data from CoinGecko for a configurable coin universe
+  (Bitcoin, Ethereum, and Ripple by default)
 - Cleans and aligns multi-asset time-series data
 - Computes return-based analytics and risk metrics
 - Generates business-ready visualizations
@@ -12,27 +13,578 @@ A robust implementation of the semester project notebook that:
 from __future__ import annotations
 
 import argparse
+import hashlib
+import json
 import math
+import os
+import shutil
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
 from pathlib import Path
-from typing import Dict, Iterable, List
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
 
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+
+from backtesting import (
+    STRATEGIES,
+    STRATEGY_PARAMETERS,
+    backtest,
+    parameter_grid,
+    parse_parameter_grid,
+    periods_per_year,
+    run_sweep,
+    strategy_weights,
+)
+from chart_rendering import CHARTS, render_charts
+from chunked_store import ChunkedTable, GapFiller, MomentAccumulator
+from correlation_engine import CORRELATION_METHODS, CorrelationEngine
+from gap_filling import fill_gaps
+from indicators import INDICATORS, IndicatorEngine
+from live_stream import PriceRingBuffer
+from market_payload import VALUE_DTYPES, SeriesArrays, parse_market_chart_stream, payload_to_arrays
+from market_store import MarketStore
+from portfolio import PortfolioOptimizer
+from rolling_risk import RollingRiskEngine
+from stage_profiler import StageProfiler
+from summary_stats import (
+    DEFAULT_QUANTILES,
+    DEFAULT_VAR_LEVELS,
+    column_moments,
+    extreme_rows,
+    median,
+    tail_statistics,
+    validate_levels,
+)
 
 
 COINS = ["bitcoin", "ethereum", "ripple"]
 VS_CURRENCY = "usd"
 BASE_URL = "https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart"
+STATE_FILE = "market_state.parquet"
+CHUNK_DIR = ".chunks"
+CORRELATION_STATE_FILE = "correlation_state_{name}.npz"
+INDICATOR_STATE_FILE = "indicator_state.parquet"
+INDICATOR_ENGINE_FILE = "indicator_engine.npz"
+SUMMARY_STATE_FILE = "summary_state.npz"
+ROLLING_STATE_FILE = "rolling_risk_state.npz"
+# Running moments behind the asset summary, saved between incremental runs.
+SUMMARY_MOMENTS = ("prices", "returns", "log_returns", "downside")
+# CoinGecko timestamps are whole milliseconds.
+SUMMARY_TIME_DTYPE = "datetime64[ms, UTC]"
+CHECKPOINT_DIR = "checkpoints"
+FAILURE_REPORT_FILE = "fetch_failures.json"
+FETCH_ERROR_POLICIES = ("abort", "skip")
+STREAM_CHUNK_BYTES = 1024 * 1024
+# Server errors retried inside the transport; 429 is handled by the shared rate limiter.
+RETRY_STATUSES = (500, 502, 503, 504)
+# Compressed Content-Length understates the body; JSON number arrays inflate roughly tenfold.
+COMPRESSED_SIZE_FACTOR = 10
+EXPORT_FORMATS = ("csv", "parquet", "feather", "npy")
+BENCHMARK_COIN = "bitcoin"
+RESAMPLE_RULES = {"1m": "1min", "5m": "5min", "1h": "1h", "1d": "1D"}
+
+
+def load_coin_universe(coins: Iterable[str] | None = None, coins_file: Path | None = None) -> List[str]:
+    """Combine CLI coin ids and a coins file (one id per line, '#' comments) into an ordered universe."""
+    coin_ids: List[str] = list(coins or [])
+    if coins_file is not None:
+        for line in coins_file.read_text(encoding="utf-8").splitlines():
+            entry = line.split("#", 1)[0].strip()
+            coin_ids.extend(part.strip() for part in entry.split(",") if part.strip())
+
+    universe = list(dict.fromkeys(coin.lower() for coin in coin_ids))
+    return universe or list(COINS)
+
+
+def _npy_values(series: pd.Series) -> np.ndarray:
+    if isinstance(series.dtype, pd.DatetimeTZDtype):
+        # .npy has no timezone; timestamps are stored as naive UTC datetime64[ns].
+        return series.dt.tz_convert("UTC").dt.tz_localize(None).to_numpy("datetime64[ns]")
+    if pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_datetime64_dtype(series.dtype):
+        return series.to_numpy()
+    # Fixed-width unicode keeps text columns memory-mappable (object arrays need pickle).
+    return series.astype(str).to_numpy(dtype=str)
+
+
+def _write_npy_columns(frame: pd.DataFrame, target_dir: Path) -> None:
+    # Each column becomes <name>.npy, so a blank name would be a hidden, unreadable file.
+    blank = [column for column in frame.columns if not str(column).strip()]
+    if blank:
+        raise ValueError(f"Cannot write {len(blank)} unnamed column(s) to npy")
+    target_dir.mkdir(parents=True, exist_ok=True)
+    for column in frame.columns:
+        np.save(target_dir / f"{column}.npy", np.ascontiguousarray(_npy_values(frame[column])), allow_pickle=False)
+
+
+def write_table(frame: pd.DataFrame, path_stem: Path, fmt: str, compression: str = "snappy") -> Path:
+    if fmt == "csv":
+        path = path_stem.with_suffix(".csv")
+        frame.to_csv(path, index=False)
+    elif fmt == "parquet":
+        path = path_stem.with_suffix(".parquet")
+        frame.to_parquet(path, index=False, compression=compression)
+    elif fmt == "feather":
+        # Uncompressed Arrow IPC so readers can memory-map it without decoding.
+        path = path_stem.with_suffix(".feather")
+        frame.to_feather(path, compression="uncompressed")
+    elif fmt == "npy":
+        path = path_stem.parent / f"{path_stem.name}_npy"
+        _write_npy_columns(frame, path)
+    else:
+        raise ValueError(f"Unsupported export format '{fmt}'. Choose from {', '.join(EXPORT_FORMATS)}")
+    return path
+
+
+class ChunkedTableWriter:
+    """Stream a table to one export format chunk by chunk; output matches write_table.
+
+    ``rows`` is the final row count and is required for ``npy``, whose column files are
+    preallocated and filled in place.
+    """
+
+    def __init__(self, path_stem: Path, fmt: str, compression: str = "snappy", rows: int | None = None) -> None:
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format '{fmt}'. Choose from {', '.join(EXPORT_FORMATS)}")
+        if fmt == "npy" and rows is None:
+            raise ValueError("rows is required to stream a table to npy")
+        self.path_stem = path_stem
+        self.fmt = fmt
+        self.compression = compression
+        self.rows = rows
+        self.path = path_stem.parent / f"{path_stem.name}_npy" if fmt == "npy" else path_stem.with_suffix(f".{fmt}")
+        self._writer = None
+        self._columns: Dict[str, np.ndarray] = {}
+        self._written = 0
+
+    def __enter__(self) -> "ChunkedTableWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def write(self, frame: pd.DataFrame) -> None:
+        if self.fmt == "csv":
+            frame.to_csv(self.path, mode="w" if self._written == 0 else "a", header=self._written == 0, index=False)
+        elif self.fmt == "npy":
+            self._write_npy(frame)
+        else:
+            import pyarrow as pa
+
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._writer is None:
+                self._writer = self._open_arrow_writer(table.schema)
+            self._writer.write_table(table)
+        self._written += len(frame)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        for values in self._columns.values():
+            values.flush()
+        self._columns = {}
+
+    def _open_arrow_writer(self, schema):
+        if self.fmt == "parquet":
+            import pyarrow.parquet as pq
+
+            return pq.ParquetWriter(self.path, schema, compression=self.compression)
+        import pyarrow as pa
+
+        # Uncompressed Arrow IPC, as in write_table, so the file stays memory-mappable.
+        return pa.ipc.new_file(self.path, schema, options=pa.ipc.IpcWriteOptions(compression=None))
+
+    def _write_npy(self, frame: pd.DataFrame) -> None:
+        if not self._columns:
+            self.path.mkdir(parents=True, exist_ok=True)
+        for column in frame.columns:
+            values = _npy_values(frame[column])
+            if values.dtype.kind == "U":
+                raise ValueError(f"Text column '{column}' cannot be streamed to npy")
+            if column not in self._columns:
+                self._columns[column] = np.lib.format.open_memmap(
+                    self.path / f"{column}.npy", mode="w+", dtype=values.dtype, shape=(self.rows,)
+                )
+            self._columns[column][self._written : self._written + len(values)] = values
+
+
+def read_table(path_stem: Path, fmt: str) -> pd.DataFrame | Dict[str, np.ndarray]:
+    """Load an exported table; Feather and .npy outputs are memory-mapped rather than parsed."""
+    if fmt == "csv":
+        return pd.read_csv(path_stem.with_suffix(".csv"))
+    if fmt == "parquet":
+        return pd.read_parquet(path_stem.with_suffix(".parquet"))
+    if fmt == "feather":
+        import pyarrow.feather as feather
+
+        return feather.read_table(path_stem.with_suffix(".feather"), memory_map=True).to_pandas()
+    if fmt == "npy":
+        column_dir = path_stem.parent / f"{path_stem.name}_npy"
+        return {path.stem: np.load(path, mmap_mode="r") for path in sorted(column_dir.glob("*.npy"))}
+    raise ValueError(f"Unsupported export format '{fmt}'. Choose from {', '.join(EXPORT_FORMATS)}")
+
+
+def align_on_timestamp(parts: List[pd.DataFrame | pd.Series], resample: str | None = None) -> pd.DataFrame:
+    """Outer-join timestamp-indexed series/frames in one pass, optionally on a fixed time grid.
+
+    Each part is sorted and de-duplicated (first row wins) and, when ``resample`` is one of
+    RESAMPLE_RULES, reduced to the last observation per bucket before a single concat builds
+    the wide table on the union of timestamps.
+    """
+    if resample is not None and resample not in RESAMPLE_RULES:
+        raise ValueError(f"Unsupported resample interval '{resample}'. Choose from {', '.join(RESAMPLE_RULES)}")
+
+    aligned = []
+    for part in parts:
+        part = part.sort_index(kind="stable")
+        part = part[~part.index.duplicated(keep="first")]
+        if resample is not None:
+            part = part.resample(RESAMPLE_RULES[resample]).last()
+        aligned.append(part)
+
+    wide = pd.concat(aligned, axis=1, join="outer", sort=True)
+    wide.index.name = "timestamp"
+    return wide.reset_index()
+
+
+def compute_return_matrix(prices: np.ndarray, previous: np.ndarray | None = None) -> np.ndarray:
+    """Return a (rows, coins, 2) array of pct and log returns for a (rows, coins) price matrix.
+
+    Both return kinds are written into one preallocated block. Without ``previous`` (the
+    last observed price per coin before the block) the first row is a 0.0 placeholder.
+    Unobserved prices (gaps left by --max-gap) have missing returns, and the first price
+    after a gap is measured against the last observed one, so the move is not lost.
+    Zero prices are reported as 0.0.
+    """
+    prices = np.ascontiguousarray(prices, dtype=np.float64)
+    returns = np.empty(prices.shape + (2,), dtype=np.float64)
+    pct = returns[..., 0]
+    log = returns[..., 1]
+    missing = np.isnan(prices)
+    if not len(prices):
+        return returns
+    if previous is None and not missing.any():
+        pct[0] = 0.0
+        log[0] = 0.0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            np.divide(prices[1:], prices[:-1], out=pct[1:])
+            np.log(pct[1:], out=log[1:])
+        pct[1:] -= 1.0
+        returns[~np.isfinite(returns)] = 0.0
+        return returns
+
+    # Each row's base is the last observed price before it, carried across gaps.
+    rows, width = prices.shape
+    observed_row = np.maximum.accumulate(np.where(missing, -1, np.arange(rows)[:, None]), axis=0)
+    base_row = np.vstack([np.full((1, width), -1), observed_row[:-1]])
+    anchor = np.full(width, np.nan) if previous is None else np.asarray(previous, dtype=np.float64)
+    base = np.where(base_row >= 0, prices[np.maximum(base_row, 0), np.arange(width)], anchor)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.divide(prices, base, out=pct)
+        np.log(pct, out=log)
+    pct -= 1.0
+    returns[~np.isfinite(returns) & ~np.isnan(base)[..., None]] = 0.0
+    if previous is None:
+        returns[0] = 0.0
+    returns[missing] = np.nan
+    return returns
 
 
 @dataclass
 class CoinSeries:
     coin_id: str
     dataframe: pd.DataFrame
+    vs_currency: str = VS_CURRENCY
+
+
+@dataclass
+class FetchConfig:
+    """Transport, pacing, caching and parsing options for the market_chart requests."""
+
+    base_url: str = BASE_URL
+    # Analytics run on the first quote; the others join the multi-quote table.
+    vs_currencies: Iterable[str] = (VS_CURRENCY,)
+    timeout_seconds: int = 20
+    retries: int = 6
+    retry_backoff: float = 2.0
+    request_spacing_seconds: float = 1.0
+    max_concurrency: int = 1
+    pool_size: int = 10
+    keep_alive: bool = True
+    use_cache: bool = True
+    cache_ttl_seconds: float = 900.0
+    cache_max_bytes: int = 256 * 1024 * 1024
+    value_dtype: str = "float64"
+    # Payloads above this size are parsed incrementally instead of via response.json().
+    stream_threshold_bytes: int = 32 * 1024 * 1024
+    # Reuse per-coin checkpoints left by an interrupted run instead of refetching those coins.
+    resume: bool = False
+    on_fetch_error: str = "abort"
+
+    def __post_init__(self) -> None:
+        self.vs_currencies = list(dict.fromkeys(currency.lower() for currency in self.vs_currencies))
+        if not self.vs_currencies:
+            raise ValueError("vs_currencies must not be empty")
+        if self.max_concurrency <= 0:
+            raise ValueError("max_concurrency must be a positive integer")
+        if self.pool_size <= 0:
+            raise ValueError("pool_size must be a positive integer")
+        if self.value_dtype not in VALUE_DTYPES:
+            raise ValueError(f"value_dtype must be one of {', '.join(VALUE_DTYPES)}")
+        if self.on_fetch_error not in FETCH_ERROR_POLICIES:
+            raise ValueError(f"on_fetch_error must be one of {', '.join(FETCH_ERROR_POLICIES)}")
+
+
+@dataclass
+class StorageConfig:
+    """How the aligned table is built, kept between runs and stored."""
+
+    incremental: bool = False
+    resample: str | None = None
+    # Gaps longer than this stay missing instead of being interpolated; None fills every gap.
+    max_gap: str | pd.Timedelta | None = None
+    # When set, the aligned table is processed in time-ordered chunks of this many rows on disk.
+    chunk_rows: int | None = None
+    # Processed rows are also upserted into a coin/month partitioned store for range queries.
+    store_dir: Path | None = None
+
+    def __post_init__(self) -> None:
+        if self.resample is not None and self.resample not in RESAMPLE_RULES:
+            raise ValueError(f"resample must be one of {', '.join(RESAMPLE_RULES)}")
+        self.max_gap = pd.Timedelta(self.max_gap) if self.max_gap is not None else None
+        if self.max_gap is not None and self.max_gap <= pd.Timedelta(0):
+            raise ValueError("max_gap must be a positive duration")
+        if self.chunk_rows is not None and self.chunk_rows <= 0:
+            raise ValueError("chunk_rows must be a positive integer")
+        if self.chunk_rows is not None and self.incremental:
+            raise ValueError("Chunked processing cannot be combined with incremental runs")
+
+
+@dataclass
+class AnalyticsConfig:
+    """Window, summary, indicator, backtest and portfolio options."""
+
+    rolling_window: int = 7
+    correlation_method: str = "sample"
+    correlation_halflife: float = 30.0
+    # Return quantiles and VaR/CVaR confidence levels reported in the asset summary.
+    summary_quantiles: Iterable[float] = DEFAULT_QUANTILES
+    var_levels: Iterable[float] = DEFAULT_VAR_LEVELS
+    indicators: Iterable[str] = ()
+    indicator_window: int = 20
+    backtest_strategy: str | None = None
+    backtest_grid: Dict[str, List[float]] | None = None
+    transaction_cost_bps: float = 10.0
+    backtest_workers: int = 1
+    risk_aversion: float = 3.0
+    frontier_points: int = 50
+
+    def __post_init__(self) -> None:
+        if self.correlation_method not in CORRELATION_METHODS:
+            raise ValueError(f"correlation_method must be one of {', '.join(CORRELATION_METHODS)}")
+        if self.correlation_halflife <= 0:
+            raise ValueError("correlation_halflife must be positive")
+        self.summary_quantiles = validate_levels(self.summary_quantiles, "summary_quantiles")
+        self.var_levels = validate_levels(self.var_levels, "var_levels")
+        self.indicators = list(dict.fromkeys(self.indicators))
+        unknown_indicators = [name for name in self.indicators if name not in INDICATORS]
+        if unknown_indicators:
+            raise ValueError(f"Unsupported indicator(s): {', '.join(unknown_indicators)}")
+        if self.indicator_window <= 0:
+            raise ValueError("indicator_window must be a positive integer")
+        if self.backtest_strategy is not None and self.backtest_strategy not in STRATEGIES:
+            raise ValueError(f"backtest_strategy must be one of {', '.join(STRATEGIES)}")
+        if self.transaction_cost_bps < 0:
+            raise ValueError("transaction_cost_bps must not be negative")
+        if self.backtest_strategy is not None:
+            # Surface grid errors before anything is fetched.
+            parameter_grid(self.backtest_strategy, self.backtest_grid)
+        if self.risk_aversion <= 0:
+            raise ValueError("risk_aversion must be positive")
+        if self.frontier_points < 0:
+            raise ValueError("frontier_points must not be negative")
+
+
+@dataclass
+class OutputConfig:
+    """Exported table formats and rendered charts."""
+
+    export_formats: Iterable[str] = ("csv",)
+    parquet_compression: str = "snappy"
+    charts: Iterable[str] = CHARTS
+    render_workers: int = 1
+    plot_decimation: bool = True
+
+    def __post_init__(self) -> None:
+        self.export_formats = list(dict.fromkeys(self.export_formats))
+        unknown_formats = [fmt for fmt in self.export_formats if fmt not in EXPORT_FORMATS]
+        if unknown_formats:
+            raise ValueError(f"Unsupported export format(s): {', '.join(unknown_formats)}")
+        self.charts = list(self.charts)
+
+
+class TransportRetry(Retry):
+    """urllib3 retry policy that leaves 429 replies to the shared rate limiter.
+
+    Stock Retry also honours Retry-After on 413 and 429 by sleeping inside the worker
+    thread, so the other workers would never pause.
+    """
+
+    RETRY_AFTER_STATUS_CODES = frozenset({503})
+
+
+def retry_after_seconds(value: str | None) -> float | None:
+    """Seconds to wait from a Retry-After header (delay-seconds or an HTTP-date), or None."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = pd.Timestamp(parsedate_to_datetime(value))
+    except (TypeError, ValueError):
+        return None
+    # HTTP-dates are GMT; parsedate_to_datetime returns a naive value for a "-0000" zone.
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.tz_localize("UTC")
+    return max((retry_at - pd.Timestamp.now(tz="UTC")).total_seconds(), 0.0)
+
+
+class RateLimiter:
+    """Token bucket shared by every fetch worker; a 429 pauses all of them."""
+
+    def __init__(self, spacing_seconds: float, burst: int = 1) -> None:
+        self.rate = 1.0 / spacing_seconds if spacing_seconds > 0 else math.inf
+        self.capacity = float(max(1, burst))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    wait_seconds = self._blocked_until - now
+                elif math.isinf(self.rate):
+                    return
+                else:
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1.0:
+                        self._tokens -= 1.0
+                        return
+                    wait_seconds = (1.0 - self._tokens) / self.rate
+            time.sleep(wait_seconds)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._blocked_until = max(self._blocked_until, now + seconds)
+            # Drain the bucket so workers resume at the base rate, not in a burst.
+            self._tokens = 0.0
+            self._updated = max(self._updated, self._blocked_until)
+
+
+class ResponseCache:
+    """Content-addressed store of raw market_chart payloads with TTL and LRU eviction."""
+
+    def __init__(self, cache_dir: Path, ttl_seconds: float = 900.0, max_bytes: int = 256 * 1024 * 1024) -> None:
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(url: str, params: Dict[str, object]) -> str:
+        # The full request, so endpoints behind different base URLs never share an entry.
+        raw = json.dumps({"url": url, "params": params}, sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def open_fresh(self, key: str) -> Optional[BinaryIO]:
+        """Open a live entry positioned at its raw JSON payload, or return None on a miss."""
+        path = self._path(key)
+        try:
+            handle = path.open("rb")
+        except OSError:
+            return None
+
+        # Entries are a fetch-time header line followed by the payload bytes as received.
+        try:
+            fetched_at = float(handle.readline())
+        except ValueError:
+            fetched_at = 0.0
+        if time.time() - fetched_at > self.ttl_seconds:
+            handle.close()
+            path.unlink(missing_ok=True)
+            return None
+
+        # Touch the file so eviction treats mtime as last access.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return handle
+
+    def get(self, key: str) -> Optional[dict]:
+        handle = self.open_fresh(key)
+        if handle is None:
+            return None
+        with handle:
+            try:
+                return json.load(handle)
+            except ValueError:
+                return None
+
+    def put(self, key: str, payload: dict) -> None:
+        with self.writer(key) as handle:
+            handle.write(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+
+    @contextmanager
+    def writer(self, key: str) -> Iterator[BinaryIO]:
+        """Write payload bytes to a new entry; it is published only if the block succeeds."""
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            with tmp_path.open("wb") as handle:
+                handle.write(f"{time.time()}\n".encode("ascii"))
+                yield handle
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        self._evict()
+
+    def _evict(self) -> None:
+        with self._lock:
+            entries = []
+            for path in self.cache_dir.glob("*.json"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries, key=lambda item: item[0]):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
 
 
 class CryptoMarketPipeline:
@@ -40,247 +592,1368 @@ class CryptoMarketPipeline:
         self,
         days: int,
         output_dir: Path,
-        timeout_seconds: int = 20,
-        retries: int = 6,
-        retry_backoff: float = 2.0,
-        request_spacing_seconds: float = 1.0,
+        fetch: FetchConfig | None = None,
+        storage: StorageConfig | None = None,
+        analytics: AnalyticsConfig | None = None,
+        output: OutputConfig | None = None,
+        profiler: StageProfiler | None = None,
     ) -> None:
         if days <= 0:
             raise ValueError("days must be a positive integer")
+        self.fetch = fetch if fetch is not None else FetchConfig()
+        self.storage = storage if storage is not None else StorageConfig()
+        self.analytics = analytics if analytics is not None else AnalyticsConfig()
+        self.output = output if output is not None else OutputConfig()
+        if len(self.fetch.vs_currencies) > 1 and self.storage.chunk_rows is not None:
+            raise ValueError("Chunked processing supports a single quote currency")
 
         self.days = days
         self.output_dir = output_dir
-        self.timeout_seconds = timeout_seconds
-        self.retries = retries
-        self.retry_backoff = retry_backoff
-        self.request_spacing_seconds = request_spacing_seconds
+        self.vs_currency = self.fetch.vs_currencies[0]
+        # Checkpoints are only written when a later run could use them, so default runs need no Parquet engine.
+        self.checkpoint = self.fetch.resume or self.fetch.on_fetch_error == "skip"
+        self.profiler = profiler if profiler is not None else StageProfiler()
+        self.store: MarketStore | None = None
+        if self.storage.store_dir is not None:
+            self.store = MarketStore(self.storage.store_dir, self.output.parquet_compression)
+        # Requests are paced per host, so every coin served by one API shares a single budget.
+        self.rate_limiters: Dict[str, RateLimiter] = {}
+        self._rate_limiters_lock = threading.Lock()
+        self.session = self._build_session(self.fetch.pool_size, self.fetch.keep_alive)
 
         self.output_dir.mkdir(parents=True, exist_ok=True)
         (self.output_dir / "visuals").mkdir(parents=True, exist_ok=True)
+        self.cache: ResponseCache | None = None
+        if self.fetch.use_cache:
+            self.cache = ResponseCache(
+                self.output_dir / ".cache", self.fetch.cache_ttl_seconds, self.fetch.cache_max_bytes
+            )
 
         self.raw_series: Dict[str, CoinSeries] = {}
+        # Series for the additional quote currencies, keyed by currency and then coin.
+        self.quote_series: Dict[str, Dict[str, CoinSeries]] = {}
+        self.multi_quote_table: pd.DataFrame | None = None
+        self.quote_summary: pd.DataFrame | None = None
+        # Coins the last fetch_all gave up on under the "skip" policy, with the error.
+        self.failed_coins: Dict[str, str] = {}
         self.market_data: pd.DataFrame | None = None
         self.price_returns: pd.DataFrame | None = None
         self.summary_table: pd.DataFrame | None = None
         self.correlation_matrix: pd.DataFrame | None = None
+        self.return_correlation: pd.DataFrame | None = None
+        # "prices" (sample correlation of price levels) and "returns" (configured method).
+        self.correlation_engines: Dict[str, CorrelationEngine] = {}
+        self.rolling_engine: RollingRiskEngine | None = None
+        self.rolling_risk: pd.DataFrame | None = None
+        self.indicator_engine: IndicatorEngine | None = None
+        self.indicator_table: pd.DataFrame | None = None
+        # Portfolio weights and return/volatility per optimizer, and the efficient frontier.
+        self.portfolio_weights: pd.DataFrame | None = None
+        self.efficient_frontier: pd.DataFrame | None = None
+        # One row per swept parameter combination, and the best combination's equity curve.
+        self.backtest_sweep: pd.DataFrame | None = None
+        self.backtest_equity: pd.DataFrame | None = None
+        # Previously exported returns table, used as the base for incremental runs.
+        self.state: pd.DataFrame | None = None
+        # Stored rows that fell out of the ``days`` window on this run, plus the first row kept: saved
+        # engines and moments take them back out instead of being rebuilt.
+        self.trimmed_rows = 0
+        self.trimmed_state: pd.DataFrame | None = None
+        # The stored last resample bucket, reopened because it was still filling when it was stored.
+        self.reopened_state: pd.DataFrame | None = None
+        self.summary_moments: Dict[str, MomentAccumulator] | None = None
+        # On-disk stand-ins for market_data and price_returns in chunked mode.
+        self.market_store: ChunkedTable | None = None
+        self.returns_store: ChunkedTable | None = None
+        self.indicator_store: ChunkedTable | None = None
+
+    def _build_session(self, pool_size: int, keep_alive: bool) -> requests.Session:
+        # Connection errors and 5xx replies are retried by urllib3 with exponential backoff.
+        retry = TransportRetry(
+            total=max(self.fetch.retries - 1, 0),
+            backoff_factor=self.fetch.retry_backoff / 2,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"GET"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers["Accept-Encoding"] = "gzip, deflate"
+        if not keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    def close(self) -> None:
+        self.session.close()
+        # Chunk files back the chunked tables (and follow mode) until the pipeline closes; they are not outputs.
+        shutil.rmtree(self.output_dir / CHUNK_DIR, ignore_errors=True)
+        self.market_store = self.returns_store = self.indicator_store = None
+
+    def _rate_limiter(self, url: str) -> RateLimiter:
+        host = urlsplit(url).netloc
+        with self._rate_limiters_lock:
+            if host not in self.rate_limiters:
+                self.rate_limiters[host] = RateLimiter(self.fetch.request_spacing_seconds)
+            return self.rate_limiters[host]
+
+    def run(self, coin_ids: Iterable[str]) -> None:
+        """Run every batch stage in order, timing each one on self.profiler."""
+        stages = [
+            ("fetch_all", lambda: self.fetch_all(coin_ids)),
+            ("prepare_market_table", self.prepare_market_table),
+            ("compute_returns_and_risk", self.compute_returns_and_risk),
+            ("build_summary", self.build_summary),
+            ("optimize_portfolio", self.optimize_portfolio),
+            ("compute_rolling_risk", self.compute_rolling_risk),
+            ("compute_indicators", self.compute_indicators),
+            ("run_backtest", self.run_backtest),
+            ("make_visualizations", self.make_visualizations),
+            ("export_outputs", self.export_outputs),
+        ]
+        for name, action in stages:
+            with self.profiler.stage(name):
+                action()
+                self.profiler.count("rows", self._rows_loaded())
+
+        # Checkpoints only matter until a run gets through; failed coins keep them for --resume.
+        if self.checkpoint and not self.failed_coins:
+            self.clear_checkpoints()
+
+    def _rows_loaded(self) -> int:
+        for table in (self.returns_store, self.market_store, self.price_returns, self.market_data):
+            if table is not None:
+                return len(table)
+        return sum(len(series.dataframe) for series in self.raw_series.values())
+
+    @property
+    def coins(self) -> List[str]:
+        """Coin ids in the loaded universe, in fetch order."""
+        return list(self.raw_series)
 
-    def fetch_all(self, coin_ids: Iterable[str]) -> None:
+    def load_state(self, coin_ids: Iterable[str]) -> bool:
+        state_path = self.output_dir / STATE_FILE
+        if not state_path.exists():
+            return False
+
+        coin_ids = list(coin_ids)
+        state = pd.read_parquet(state_path)
+        missing = [coin for coin in coin_ids if f"{coin}_price" not in state.columns]
+        if state.empty or missing:
+            print(f"Stored market table does not cover {missing or 'any rows'}; running a full refresh.")
+            return False
+        # Coins dropped since the last run are projected out, so the stored table matches the fetch.
+        stored = [col[: -len("_price")] for col in state.columns if col.endswith("_price")]
+        extra = [coin for coin in stored if coin not in coin_ids]
+        if extra:
+            state = state.drop(columns=[col for coin in extra for col in self._coin_columns(coin)], errors="ignore")
+
+        state = state.sort_values("timestamp").reset_index(drop=True)
+        for price_col in [col for col in state.columns if col.endswith("_price")]:
+            # Tables stored before gap masks existed were fully filled.
+            if self._gap_mask_column(price_col) not in state.columns:
+                state[self._gap_mask_column(price_col)] = False
+        self.state = state
+        return True
+
+    def save_state(self) -> None:
+        if self.price_returns is None:
+            raise RuntimeError("Return table unavailable. Call compute_returns_and_risk first.")
+        self.price_returns.to_parquet(self.output_dir / STATE_FILE, index=False)
+        for name, engine in self.correlation_engines.items():
+            engine.save(self.output_dir / CORRELATION_STATE_FILE.format(name=name))
+        if self.rolling_engine is not None:
+            self.rolling_engine.save(self.output_dir / ROLLING_STATE_FILE)
+        if self.summary_moments is not None:
+            arrays = {
+                f"{name}_{field}": getattr(accumulator, field)
+                for name, accumulator in self.summary_moments.items()
+                for field in ("count", "mean", "m2")
+            }
+            coins = np.asarray(self.coins, dtype=str)
+            np.savez(self.output_dir / SUMMARY_STATE_FILE, coins=coins, rows=len(self.price_returns), **arrays)
+        if self.indicator_engine is not None and self.indicator_table is not None:
+            self.indicator_table.to_parquet(self.output_dir / INDICATOR_STATE_FILE, index=False)
+            self.indicator_engine.save(self.output_dir / INDICATOR_ENGINE_FILE)
+
+    def fetch_all(self, coin_ids: Iterable[str], since: pd.Timestamp | None = None) -> None:
         coin_id_list = list(coin_ids)
-        for idx, coin_id in enumerate(coin_id_list):
-            self.raw_series[coin_id] = self._fetch_coin_series(coin_id)
-            # Respect public API limits by spacing requests.
-            if idx < len(coin_id_list) - 1:
-                time.sleep(self.request_spacing_seconds)
+        # Additional quotes are fetched by batch calls only, always over the full window.
+        extra_quotes = self.fetch.vs_currencies[1:] if since is None else []
+        if since is None and self.storage.incremental and (self.state is not None or self.load_state(coin_id_list)):
+            since = self.state["timestamp"].iloc[-1]
+
+        # One task per coin x quote, all scheduled through the same pool and per-host rate limiter.
+        tasks: List[Tuple[str, str, pd.Timestamp | None]] = [(coin_id, self.vs_currency, since) for coin_id in coin_id_list]
+        tasks += [(coin_id, quote, None) for quote in extra_quotes for coin_id in coin_id_list]
+
+        fetched: Dict[Tuple[str, str], CoinSeries] = {}
+        if self.fetch.resume:
+            for coin_id, quote, task_since in tasks:
+                series = self._load_checkpoint(coin_id, quote) if task_since is None else None
+                if series is not None:
+                    fetched[coin_id, quote] = series
+            if fetched:
+                print(f"Resuming: {len(fetched)} of {len(tasks)} series restored from checkpoints.")
+
+        def fetch(task: Tuple[str, str, pd.Timestamp | None]) -> CoinSeries:
+            coin_id, quote, task_since = task
+            series = self._fetch_coin_series(coin_id, task_since, quote)
+            if task_since is None and self.checkpoint:
+                self._save_checkpoint(series)
+            return series
+
+        self.failed_coins = {}
+        pending = [task for task in tasks if task[:2] not in fetched]
+        if self.fetch.max_concurrency == 1 or len(pending) <= 1:
+            for task in pending:
+                try:
+                    fetched[task[:2]] = fetch(task)
+                except RuntimeError as exc:
+                    self._record_fetch_failure(self._series_label(*task[:2]), exc)
+        else:
+            # Requests are spaced by the shared rate limiter, so workers only overlap network latency.
+            workers = min(self.fetch.max_concurrency, len(pending))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fetch") as executor:
+                futures = {executor.submit(fetch, task): task for task in pending}
+                for future in as_completed(futures):
+                    task = futures[future]
+                    try:
+                        fetched[task[:2]] = future.result()
+                    except RuntimeError as exc:
+                        if self.fetch.on_fetch_error == "abort":
+                            # Coins already in flight finish and keep their checkpoints.
+                            executor.shutdown(wait=False, cancel_futures=True)
+                        self._record_fetch_failure(self._series_label(*task[:2]), exc)
 
-    def _fetch_coin_series(self, coin_id: str) -> CoinSeries:
-        url = BASE_URL.format(coin_id=coin_id)
-        params = {"vs_currency": VS_CURRENCY, "days": self.days}
+        for coin_id in coin_id_list:
+            if (coin_id, self.vs_currency) in fetched:
+                self.raw_series[coin_id] = fetched[coin_id, self.vs_currency]
+        if extra_quotes:
+            self.quote_series = {
+                quote: {coin_id: fetched[coin_id, quote] for coin_id in coin_id_list if (coin_id, quote) in fetched}
+                for quote in extra_quotes
+            }
 
+        if since is None:
+            self._write_failure_report()
+        if self.failed_coins:
+            if not self.raw_series:
+                raise RuntimeError(f"Unable to fetch any coin: {self.failed_coins}")
+            print(f"Continuing without {len(self.failed_coins)} failed coin(s): {', '.join(self.failed_coins)}")
+            if self.state is not None:
+                # The stored table no longer covers every coin, so the next run does a full refresh.
+                failed_columns = [col for coin in self.failed_coins for col in self._coin_columns(coin)]
+                self.state = self.state.drop(columns=failed_columns, errors="ignore")
+
+    def _series_label(self, coin_id: str, vs_currency: str) -> str:
+        return coin_id if vs_currency == self.vs_currency else f"{coin_id}/{vs_currency}"
+
+    def _record_fetch_failure(self, label: str, error: Exception) -> None:
+        if self.fetch.on_fetch_error == "abort":
+            raise error
+        print(f"Skipping {label}: {error}")
+        self.failed_coins[label] = str(error)
+        self.profiler.count("failed_coins")
+
+    def _write_failure_report(self) -> None:
+        report_path = self.output_dir / FAILURE_REPORT_FILE
+        if not self.failed_coins:
+            report_path.unlink(missing_ok=True)
+            return
+        report = {"days": self.days, "vs_currencies": self.fetch.vs_currencies, "failed_coins": self.failed_coins}
+        report_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    @staticmethod
+    def _coin_columns(coin_id: str) -> List[str]:
+        suffixes = ("price", "market_cap", "volume", "filled", "pct_return", "log_return")
+        return [f"{coin_id}_{suffix}" for suffix in suffixes]
+
+    def _checkpoint_path(self, coin_id: str, vs_currency: str) -> Path:
+        return self.output_dir / CHECKPOINT_DIR / f"{coin_id}_{vs_currency}_{self.days}d.parquet"
+
+    def _save_checkpoint(self, series: CoinSeries) -> None:
+        path = self._checkpoint_path(series.coin_id, series.vs_currency)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        series.dataframe.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+    def _load_checkpoint(self, coin_id: str, vs_currency: str) -> CoinSeries | None:
+        path = self._checkpoint_path(coin_id, vs_currency)
+        if not path.exists():
+            return None
+        try:
+            frame = pd.read_parquet(path)
+        except (OSError, ValueError) as exc:
+            print(f"Ignoring unreadable checkpoint for {coin_id}: {exc}")
+            return None
+        if list(frame.columns) != list(self._empty_frame(coin_id).columns):
+            return None
+        return CoinSeries(coin_id=coin_id, dataframe=frame, vs_currency=vs_currency)
+
+    def clear_checkpoints(self) -> None:
+        shutil.rmtree(self.output_dir / CHECKPOINT_DIR, ignore_errors=True)
+
+    def _fetch_coin_series(
+        self,
+        coin_id: str,
+        since: pd.Timestamp | None = None,
+        vs_currency: str | None = None,
+    ) -> CoinSeries:
+        vs_currency = vs_currency or self.vs_currency
+        if since is None:
+            url = self.fetch.base_url.format(coin_id=coin_id)
+            params = {"vs_currency": vs_currency, "days": self.days}
+        else:
+            # Delta fetch: only the candles after the last stored timestamp.
+            url = self.fetch.base_url.format(coin_id=coin_id) + "/range"
+            params = {"vs_currency": vs_currency, "from": int(since.timestamp()), "to": int(time.time())}
+
+        cache_key = ResponseCache.key(url, params)
+        if self.cache is not None and since is None:
+            cached = self.cache.open_fresh(cache_key)
+            if cached is not None:
+                try:
+                    with cached:
+                        if os.fstat(cached.fileno()).st_size > self.fetch.stream_threshold_bytes:
+                            chunks = iter(lambda: cached.read(STREAM_CHUNK_BYTES), b"")
+                            arrays = parse_market_chart_stream(chunks, self.fetch.value_dtype)
+                        else:
+                            arrays = payload_to_arrays(json.load(cached), self.fetch.value_dtype)
+                    frame = self._arrays_to_frame(coin_id, arrays)
+                    self.profiler.count("cache_hits")
+                    return CoinSeries(coin_id=coin_id, dataframe=frame, vs_currency=vs_currency)
+                except ValueError as exc:
+                    print(f"Ignoring unreadable cache entry for {coin_id}: {exc}")
+
+        rate_limiter = self._rate_limiter(url)
         last_error = None
-        for attempt in range(1, self.retries + 1):
+        for attempt in range(1, self.fetch.retries + 1):
+            # Respect public API limits by spacing requests across all workers.
+            rate_limiter.acquire()
             try:
-                response = requests.get(url, params=params, timeout=self.timeout_seconds)
+                response = self.session.get(url, params=params, timeout=self.fetch.timeout_seconds, stream=True)
+            except requests.RequestException as exc:
+                # The transport has already retried connection errors by the time one surfaces.
+                last_error = exc
+                break
+            self.profiler.count("requests")
+            transport_retries = getattr(getattr(response.raw, "retries", None), "history", ())
+            if transport_retries:
+                self.profiler.count("retries", len(transport_retries))
+
+            with response:
                 if response.status_code == 429:
-                    retry_after = response.headers.get("Retry-After")
-                    wait_seconds = float(retry_after) if retry_after else self.retry_backoff ** attempt
+                    self.profiler.count("network_bytes", len(response.content))
+                    wait_seconds = retry_after_seconds(response.headers.get("Retry-After"))
+                    if wait_seconds is None:
+                        wait_seconds = self.fetch.retry_backoff ** attempt
                     print(f"Rate-limited for {coin_id}. Waiting {wait_seconds:.1f}s before retry.")
-                    time.sleep(wait_seconds)
+                    rate_limiter.pause(wait_seconds)
+                    self.profiler.count("retries")
                     continue
 
-                response.raise_for_status()
-                payload = response.json()
-                return CoinSeries(coin_id=coin_id, dataframe=self._payload_to_frame(coin_id, payload))
-            except (requests.RequestException, ValueError) as exc:
-                last_error = exc
-                if attempt < self.retries:
-                    sleep_time = self.retry_backoff ** attempt
-                    print(f"Retrying {coin_id} fetch in {sleep_time:.1f}s after error: {exc}")
-                    time.sleep(sleep_time)
+                try:
+                    response.raise_for_status()
+                    cache_key_for_put = cache_key if self.cache is not None and since is None else None
+                    frame = self._read_response(coin_id, response, cache_key_for_put, allow_empty=since is not None)
+                    return CoinSeries(coin_id=coin_id, dataframe=frame, vs_currency=vs_currency)
+                except requests.HTTPError as exc:
+                    last_error = exc
+                    break
+                except (requests.RequestException, ValueError) as exc:
+                    # Truncated or malformed bodies are not covered by transport retries.
+                    last_error = exc
+            if attempt < self.fetch.retries:
+                sleep_time = self.fetch.retry_backoff ** attempt
+                self.profiler.count("retries")
+                print(f"Retrying {coin_id} fetch in {sleep_time:.1f}s after error: {last_error}")
+                time.sleep(sleep_time)
 
-        raise RuntimeError(f"Unable to fetch data for {coin_id}: {last_error}")
+        raise RuntimeError(f"Unable to fetch data for {self._series_label(coin_id, vs_currency)}: {last_error}")
 
     @staticmethod
-    def _payload_to_frame(coin_id: str, payload: dict) -> pd.DataFrame:
-        required_keys = ["prices", "market_caps", "total_volumes"]
-        for key in required_keys:
-            if key not in payload or not payload[key]:
-                raise ValueError(f"Payload for {coin_id} is missing '{key}' data")
+    def _empty_frame(coin_id: str) -> pd.DataFrame:
+        frame = pd.DataFrame(columns=[f"{coin_id}_price", f"{coin_id}_market_cap", f"{coin_id}_volume"], dtype=float)
+        frame.insert(0, "timestamp", pd.Series(dtype="datetime64[ns, UTC]"))
+        return frame
 
-        df_price = pd.DataFrame(payload["prices"], columns=["timestamp", f"{coin_id}_price"])
-        df_cap = pd.DataFrame(payload["market_caps"], columns=["timestamp", f"{coin_id}_market_cap"])
-        df_vol = pd.DataFrame(payload["total_volumes"], columns=["timestamp", f"{coin_id}_volume"])
+    def _read_response(
+        self,
+        coin_id: str,
+        response: requests.Response,
+        cache_key: str | None,
+        allow_empty: bool = False,
+    ) -> pd.DataFrame:
+        def to_frame(arrays: Dict[str, SeriesArrays]) -> pd.DataFrame:
+            if allow_empty and not len(arrays["prices"][0]):
+                return self._empty_frame(coin_id)
+            return self._arrays_to_frame(coin_id, arrays)
 
-        merged = df_price.merge(df_cap, on="timestamp", how="outer").merge(df_vol, on="timestamp", how="outer")
-        merged["timestamp"] = pd.to_datetime(merged["timestamp"], unit="ms", utc=True)
-        merged = merged.sort_values("timestamp").drop_duplicates(subset=["timestamp"])
+        content_length = response.headers.get("Content-Length")
+        expected_bytes = int(content_length) if content_length else None
+        if expected_bytes is not None and response.headers.get("Content-Encoding"):
+            expected_bytes *= COMPRESSED_SIZE_FACTOR
+        # Bodies of unknown length are streamed rather than trusted to be small.
+        if expected_bytes is not None and expected_bytes <= self.fetch.stream_threshold_bytes:
+            body = response.content
+            self.profiler.count("network_bytes", len(body))
+            frame = to_frame(payload_to_arrays(json.loads(body), self.fetch.value_dtype))
+            if cache_key is not None:
+                with self.cache.writer(cache_key) as sink:
+                    sink.write(body)
+            return frame
 
-        numeric_cols = [f"{coin_id}_price", f"{coin_id}_market_cap", f"{coin_id}_volume"]
-        merged[numeric_cols] = merged[numeric_cols].apply(pd.to_numeric, errors="coerce")
-        return merged
+        def counted(chunks: Iterable[bytes], sink: BinaryIO | None) -> Iterator[bytes]:
+            for chunk in chunks:
+                self.profiler.count("network_bytes", len(chunk))
+                if sink is not None:
+                    sink.write(chunk)
+                yield chunk
 
-    def prepare_market_table(self) -> pd.DataFrame:
-        if not self.raw_series:
-            raise RuntimeError("No data loaded. Call fetch_all first.")
+        chunks = response.iter_content(chunk_size=STREAM_CHUNK_BYTES)
+        if cache_key is None:
+            return to_frame(parse_market_chart_stream(counted(chunks, None), self.fetch.value_dtype))
+        # Tee the stream into the cache; the entry is only published if the payload parses.
+        with self.cache.writer(cache_key) as sink:
+            return to_frame(parse_market_chart_stream(counted(chunks, sink), self.fetch.value_dtype))
+
+    @staticmethod
+    def _arrays_to_frame(coin_id: str, arrays: Dict[str, SeriesArrays]) -> pd.DataFrame:
+        for key, (timestamps, _) in arrays.items():
+            if not len(timestamps):
+                raise ValueError(f"Payload for {coin_id} is missing '{key}' data")
+
+        columns = {
+            f"{coin_id}_price": arrays["prices"],
+            f"{coin_id}_market_cap": arrays["market_caps"],
+            f"{coin_id}_volume": arrays["total_volumes"],
+        }
+        timestamps = arrays["prices"][0]
+        shared_axis = all(np.array_equal(ts, timestamps) for ts, _ in columns.values())
+        if shared_axis and bool(np.all(timestamps[1:] > timestamps[:-1])):
+            # Common case: one sorted, unique timestamp axis, so the arrays become columns as-is.
+            frame = pd.DataFrame({name: values for name, (_, values) in columns.items()}, copy=False)
+            frame.insert(0, "timestamp", pd.to_datetime(timestamps, unit="ms", utc=True))
+            return frame
 
-        merged: pd.DataFrame | None = None
-        for coin_id in self.raw_series:
-            coin_df = self.raw_series[coin_id].dataframe
-            merged = coin_df if merged is None else merged.merge(coin_df, on="timestamp", how="outer")
+        parts = [
+            pd.Series(values, index=pd.DatetimeIndex(pd.to_datetime(ts, unit="ms", utc=True)), name=name)
+            for name, (ts, values) in columns.items()
+        ]
+        return align_on_timestamp(parts)
 
-        if merged is None:
-            raise RuntimeError("No coin tables available for merge")
+    def prepare_market_table(self) -> pd.DataFrame | None:
+        if not self.raw_series:
+            raise RuntimeError("No data loaded. Call fetch_all first.")
+        if self.storage.chunk_rows is not None:
+            self._prepare_market_table_chunked()
+            return None
 
-        merged = merged.sort_values("timestamp").reset_index(drop=True)
+        coin_frames = [series.dataframe.set_index("timestamp") for series in self.raw_series.values()]
+        merged = align_on_timestamp(coin_frames, self.storage.resample)
 
-        numeric_columns = [col for col in merged.columns if col != "timestamp"]
-        merged[numeric_columns] = merged[numeric_columns].interpolate(method="linear", limit_direction="both")
-        merged[numeric_columns] = merged[numeric_columns].ffill().bfill()
+        if self.state is not None:
+            merged = self._append_to_state(merged)
+        else:
+            merged = self._fill_gaps(merged)
 
         self.market_data = merged
+        if self.quote_series:
+            self.multi_quote_table = self._build_multi_quote_table()
         return merged
 
-    def compute_returns_and_risk(self) -> pd.DataFrame:
-        if self.market_data is None:
-            raise RuntimeError("Market data unavailable. Call prepare_market_table first.")
+    def _fill_gaps(self, merged: pd.DataFrame, anchored: bool = False) -> pd.DataFrame:
+        """Fill gaps in one vectorized pass and append a ``{coin}_filled`` mask per price column.
 
-        result = self.market_data.copy()
+        With ``anchored`` the first row is the last stored row: it is returned unchanged and
+        the rows after it are interpolated from it, as if it preceded them in one table.
+        """
+        fill_columns = [col for col in merged.columns if col != "timestamp" and not self._is_gap_mask_column(col)]
+        values = merged[fill_columns].to_numpy(dtype=np.float64)
+        timestamps = merged["timestamp"].to_numpy(dtype="datetime64[ns]").astype(np.int64)
+        anchor = None
+        if anchored and len(values):
+            # A column left missing in the stored row (an unfilled gap) has nothing to anchor on.
+            has_anchor = ~np.isnan(values[0])
+            anchor = (np.where(has_anchor, 0, -1), values[0], np.full(len(fill_columns), timestamps[0]))
+            values, timestamps = values[1:], timestamps[1:]
+        max_gap = self.storage.max_gap.value if self.storage.max_gap is not None else None
+        positions = np.arange(0 if anchor is None else 1, len(merged))
+        filled = fill_gaps(values, positions, timestamps, max_gap, anchor)
+        if anchor is not None:
+            filled = np.vstack([merged[fill_columns].to_numpy(dtype=np.float64)[:1], filled])
 
-        price_cols = [f"{coin}_price" for coin in COINS]
-        for col in price_cols:
-            pct_col = col.replace("_price", "_pct_return")
-            log_col = col.replace("_price", "_log_return")
-            result[pct_col] = result[col].pct_change()
-            result[log_col] = np.log(result[col] / result[col].shift(1))
+        result = {"timestamp": merged["timestamp"]}
+        for idx, col in enumerate(fill_columns):
+            result[col] = filled[:, idx].astype(merged[col].dtype, copy=False)
+        for col in fill_columns:
+            if col.endswith("_price"):
+                # True where the price was synthesised (or left missing) rather than observed.
+                result[self._gap_mask_column(col)] = merged[col].isna().to_numpy()
+        return pd.DataFrame(result, index=merged.index)
+
+    @staticmethod
+    def _gap_mask_column(price_col: str) -> str:
+        return price_col[: -len("_price")] + "_filled"
+
+    @staticmethod
+    def _is_gap_mask_column(column: str) -> bool:
+        return column.endswith("_filled")
+
+    def _build_multi_quote_table(self) -> pd.DataFrame:
+        """Every quote currency on one shared timestamp axis, indexed by (vs_currency, timestamp)."""
+        coins = self.coins
+        columns = [f"{coin}_{field}" for coin in coins for field in ("price", "market_cap", "volume")]
+        # The first quote comes from the market table, which in incremental runs also holds the stored
+        # history. Its filled values are cleared so every quote is filled the same way on the shared axis.
+        primary = self.market_data.set_index("timestamp")
+        observed = {
+            f"{coin}_{field}": primary[f"{coin}_{field}"].mask(primary[f"{coin}_filled"])
+            for coin in coins
+            for field in ("price", "market_cap", "volume")
+        }
+        wide = {self.vs_currency: pd.DataFrame(observed, index=primary.index)}
+        for quote, series in self.quote_series.items():
+            if series:
+                parts = [item.dataframe.set_index("timestamp") for item in series.values()]
+                wide[quote] = align_on_timestamp(parts, self.storage.resample).set_index("timestamp")
+        timestamps = None
+        for frame in wide.values():
+            timestamps = frame.index if timestamps is None else timestamps.union(frame.index)
+
+        frames = []
+        for quote, frame in wide.items():
+            # Coins missing for a quote (skipped fetches) stay as all-NaN columns.
+            frame = frame.reindex(index=timestamps, columns=columns).rename_axis("timestamp").reset_index()
+            frame = self._with_returns(self._fill_gaps(frame), [f"{coin}_price" for coin in coins])
+            frames.append(frame.set_index("timestamp"))
+        return pd.concat(frames, keys=list(wide), names=["vs_currency", "timestamp"])
+
+    def _prepare_market_table_chunked(self) -> None:
+        parts = []
+        last_valid: Dict[str, pd.Timestamp | None] = {}
+        for series in self.raw_series.values():
+            part = series.dataframe.set_index("timestamp").sort_index(kind="stable")
+            part = part[~part.index.duplicated(keep="first")]
+            for column in part.columns:
+                valid_index = part.index[part[column].notna().to_numpy()]
+                last = valid_index[-1] if len(valid_index) else None
+                if last is not None and self.storage.resample is not None:
+                    last = last.floor(RESAMPLE_RULES[self.storage.resample])
+                last_valid[column] = last
+            parts.append(part)
+
+        labels = self._aligned_index(parts)
+        step = pd.Timedelta(RESAMPLE_RULES[self.storage.resample]) if self.storage.resample is not None else None
+        columns = [column for part in parts for column in part.columns]
+        mask_columns = {col: self._gap_mask_column(col) for col in columns if col.endswith("_price")}
+        max_gap = self.storage.max_gap.value if self.storage.max_gap is not None else None
+        filler = GapFiller(columns, last_valid, max_gap)
+        self.market_store = ChunkedTable(self.output_dir / CHUNK_DIR / "market_data").reset()
+
+        for start in range(0, len(labels), self.storage.chunk_rows):
+            chunk_labels = labels[start : start + self.storage.chunk_rows]
+            slices = []
+            for part in parts:
+                # Chunks are cut on bucket labels, so no resample bucket is split between two chunks.
+                lo = part.index.searchsorted(chunk_labels[0], side="left")
+                if step is None:
+                    hi = part.index.searchsorted(chunk_labels[-1], side="right")
+                else:
+                    hi = part.index.searchsorted(chunk_labels[-1] + step, side="left")
+                slices.append(part.iloc[lo:hi])
+
+            chunk = align_on_timestamp(slices, self.storage.resample).set_index("timestamp")
+            chunk = chunk.reindex(chunk_labels).rename_axis("timestamp").reset_index()
+            chunk = chunk[["timestamp", *columns]]
+            for price_col, mask_col in mask_columns.items():
+                chunk[mask_col] = chunk[price_col].isna()
+            self.market_store.append(filler.push(chunk))
+        self.market_store.append(filler.flush())
 
-        return_cols = [c for c in result.columns if c.endswith("_pct_return") or c.endswith("_log_return")]
-        result[return_cols] = result[return_cols].replace([np.inf, -np.inf], np.nan).fillna(0.0)
+    def _aligned_index(self, parts: List[pd.DataFrame]) -> pd.DatetimeIndex:
+        """Timestamps of the table align_on_timestamp would build, without building it."""
+        labels = None
+        for part in parts:
+            index = part.index
+            if self.storage.resample is not None and len(index):
+                rule = RESAMPLE_RULES[self.storage.resample]
+                index = pd.date_range(index[0].floor(rule), index[-1].floor(rule), freq=rule, unit=index.unit)
+            labels = index if labels is None else labels.union(index)
+        return labels
+
+    def _append_to_state(self, delta: pd.DataFrame) -> pd.DataFrame:
+        market_columns = [col for col in self.state.columns if not self._is_return_column(col)]
+        base = self.state[market_columns]
+        last_timestamp = base["timestamp"].iloc[-1]
+
+        value_columns = [col for col in market_columns if not self._is_gap_mask_column(col)]
+        tail = delta.loc[delta["timestamp"] >= last_timestamp, value_columns]
+        tail = tail.drop_duplicates(subset=["timestamp"], keep="last")
+        if self.storage.resample is None:
+            tail = self._onto_stored_grid(base, tail[tail["timestamp"] > last_timestamp])
+        elif len(self.state) > 1 and len(tail) and tail["timestamp"].iloc[0] == last_timestamp:
+            tail = self._reopen_last_bucket(tail, value_columns)
+            base = self.state[market_columns]
+        else:
+            tail = tail[tail["timestamp"] > last_timestamp]
+        if tail.empty:
+            return base.copy()
+
+        # Anchor the tail on the last stored row so gaps fill from known values only.
+        tail = self._fill_gaps(pd.concat([base.iloc[[-1]][value_columns], tail], ignore_index=True), anchored=True)
+        return self._trim_to_window(pd.concat([base, tail.iloc[1:][market_columns]], ignore_index=True))
+
+    def _reopen_last_bucket(self, tail: pd.DataFrame, value_columns: List[str]) -> pd.DataFrame:
+        """Drop the stored last bucket and rebuild it from ``tail``, whose first row is the same bucket.
+
+        The bucket was cut short when it was stored, and the delta holds its later observations.
+        Coins without one keep their stored observation. Saved engines take the old row back out.
+        """
+        last = self.state.iloc[[-1]].reset_index(drop=True)
+        observed = last[value_columns].copy()
+        for col in [col for col in value_columns if col.endswith("_price")]:
+            # Filled values are refilled from the rows around the rebuilt bucket.
+            coin = col[: -len("_price")]
+            if bool(last.at[0, self._gap_mask_column(col)]):
+                observed[[f"{coin}_price", f"{coin}_market_cap", f"{coin}_volume"]] = np.nan
+        bucket = tail.iloc[[0]].reset_index(drop=True).combine_first(observed)[value_columns]
+        self.reopened_state = last
+        self.state = self.state.iloc[:-1]
+        return pd.concat([bucket, tail.iloc[1:]], ignore_index=True)
+
+    def _onto_stored_grid(self, base: pd.DataFrame, tail: pd.DataFrame) -> pd.DataFrame:
+        """Sample a finer delta onto the stored spacing.
+
+        /range answers short ranges with 5-minute points while a full fetch of a longer window is
+        hourly or daily. The grid continues from the last stored timestamp, and each grid point takes
+        every column's observation nearest to it. Points whose half-step neighbourhood has not fully
+        arrived are left for the next run.
+        """
+        stored_step, delta_step = self._observed_step(base), self._observed_step(tail)
+        if stored_step is None or delta_step is None or delta_step * 2 > stored_step:
+            return tail
+        last_timestamp = base["timestamp"].iloc[-1]
+        offset = ((tail["timestamp"] - last_timestamp) / stored_step).to_numpy(dtype=np.float64)
+        steps = np.rint(offset).astype(np.int64)
+        keep = (steps > 0) & (steps + 0.5 <= offset[-1])
+        # Nearest first, so groupby().first() picks each column's closest non-missing observation.
+        nearest = np.argsort(np.abs(offset - steps)[keep], kind="stable")
+        sampled = tail[keep].iloc[nearest].groupby(steps[keep][nearest]).first()
+        sampled["timestamp"] = last_timestamp + sampled.index.to_numpy() * stored_step
+        return sampled.reset_index(drop=True)
+
+    def _observed_step(self, frame: pd.DataFrame) -> pd.Timedelta | None:
+        # Coins are interleaved on the aligned axis, so the spacing comes from each price column's own points.
+        spacings = []
+        for col in [col for col in frame.columns if col.endswith("_price")]:
+            observed = frame[col].notna().to_numpy()
+            if self._gap_mask_column(col) in frame.columns:
+                observed = observed & ~frame[self._gap_mask_column(col)].to_numpy(dtype=bool)
+            spacings.append(frame["timestamp"][observed].diff().iloc[1:])
+        spacings = pd.concat(spacings) if spacings else pd.Series(dtype="timedelta64[ns]")
+        # Whole milliseconds, the API's resolution, so grid timestamps keep the table's unit.
+        return spacings.median().floor("ms") if len(spacings) else None
+
+    def _trim_to_window(self, merged: pd.DataFrame) -> pd.DataFrame:
+        # Like a full fetch, the table keeps only the last ``days`` of history.
+        cutoff = merged["timestamp"].iloc[-1] - pd.Timedelta(days=self.days)
+        trimmed = int((merged["timestamp"] < cutoff).sum())
+        if not trimmed:
+            return merged
+        if trimmed >= len(self.state):
+            # Everything stored has left the window; the rest is processed like a full refresh.
+            self.state = None
+            self.reopened_state = None
+            return merged.iloc[trimmed:].reset_index(drop=True)
+
+        self.trimmed_rows = trimmed
+        self.trimmed_state = self.state.iloc[: trimmed + 1].reset_index(drop=True)
+        state = self.state.iloc[trimmed:].reset_index(drop=True)
+        for col in [col for col in state.columns if col.endswith("_price")]:
+            # The new first row gets the placeholder return a full run starts with.
+            placeholder = 0.0 if pd.notna(state.at[0, col]) else np.nan
+            state.loc[0, [col.replace("_price", "_pct_return"), col.replace("_price", "_log_return")]] = placeholder
+        self.state = state
+        return merged.iloc[trimmed:].reset_index(drop=True)
+
+    @staticmethod
+    def _is_return_column(column: str) -> bool:
+        return column.endswith("_pct_return") or column.endswith("_log_return")
+
+    def compute_returns_and_risk(self) -> pd.DataFrame | None:
+        price_cols = [f"{coin}_price" for coin in self.coins]
+        if self.market_store is not None:
+            self._compute_returns_chunked(price_cols)
+            return None
+        if self.market_data is None:
+            raise RuntimeError("Market data unavailable. Call prepare_market_table first.")
+
+        stored_rows = len(self.state) if self.state is not None else 0
+        if 0 < stored_rows <= len(self.market_data):
+            # Only the appended rows need returns, measured from the last stored observation.
+            previous = self._last_observed(self.market_data.iloc[:stored_rows], price_cols)
+            tail = self._with_returns(self.market_data.iloc[stored_rows:].reset_index(drop=True), price_cols, previous)
+            result = pd.concat([self.state[tail.columns], tail], ignore_index=True)
+        else:
+            result = self._with_returns(self.market_data, price_cols)
 
         self.price_returns = result
         return result
 
+    def _compute_returns_chunked(self, price_cols: List[str]) -> None:
+        self.returns_store = ChunkedTable(self.output_dir / CHUNK_DIR / "market_data_with_returns").reset()
+        previous = None
+        for chunk in self.market_store.chunks():
+            # The last observed prices of earlier chunks are the predecessors of this chunk's first returns.
+            self.returns_store.append(self._with_returns(chunk, price_cols, previous))
+            previous = self._last_observed(chunk, price_cols, previous)
+
+    def _returns_tail(self, rows: int) -> pd.DataFrame:
+        if self.returns_store is not None:
+            return self.returns_store.tail(rows)
+        return self.price_returns.iloc[-rows:]
+
+    @staticmethod
+    def _last_observed(frame: pd.DataFrame, price_cols: List[str], previous: np.ndarray | None = None) -> np.ndarray:
+        """Last non-missing price per column, falling back to ``previous`` for all-missing columns."""
+        prices = frame[price_cols].to_numpy(dtype=np.float64)
+        last = pd.DataFrame(prices).ffill().to_numpy()[-1] if len(prices) else np.full(len(price_cols), np.nan)
+        return last if previous is None else np.where(np.isnan(last), previous, last)
+
+    @staticmethod
+    def _with_returns(frame: pd.DataFrame, price_cols: List[str], previous: np.ndarray | None = None) -> pd.DataFrame:
+        returns = compute_return_matrix(frame[price_cols].to_numpy(dtype=np.float64), previous)
+        return_cols = []
+        for col in price_cols:
+            return_cols.extend([col.replace("_price", "_pct_return"), col.replace("_price", "_log_return")])
+
+        # The (rows, coins, 2) block flattens to the pct/log-per-coin column order without copying.
+        return_frame = pd.DataFrame(
+            returns.reshape(len(frame), len(return_cols)), columns=return_cols, index=frame.index, copy=False
+        )
+        return pd.concat([frame, return_frame], axis=1)
+
     def build_summary(self) -> pd.DataFrame:
+        coins = self.coins
+        if self.returns_store is not None:
+            self.summary_table = self._summary_frame_chunked(coins)
+            return self.summary_table
         if self.price_returns is None:
             raise RuntimeError("Return table unavailable. Call compute_returns_and_risk first.")
 
-        summary_rows: List[dict] = []
-        for coin in COINS:
-            price_col = f"{coin}_price"
-            ret_col = f"{coin}_pct_return"
-            log_col = f"{coin}_log_return"
-
-            idx_max = self.price_returns[price_col].idxmax()
-            idx_min = self.price_returns[price_col].idxmin()
-
-            annualized_vol = self.price_returns[ret_col].std() * math.sqrt(365)
-            downside = self.price_returns.loc[self.price_returns[ret_col] < 0, ret_col]
-            downside_vol = downside.std() * math.sqrt(365) if not downside.empty else 0.0
-
-            summary_rows.append(
-                {
-                    "coin": coin.title(),
-                    "mean_price": self.price_returns[price_col].mean(),
-                    "median_price": self.price_returns[price_col].median(),
-                    "std_price": self.price_returns[price_col].std(),
-                    "annualized_volatility": annualized_vol,
-                    "downside_volatility": downside_vol,
-                    "max_price": self.price_returns[price_col].max(),
-                    "min_price": self.price_returns[price_col].min(),
-                    "time_of_max_price": self.price_returns.loc[idx_max, "timestamp"],
-                    "time_of_min_price": self.price_returns.loc[idx_min, "timestamp"],
-                    "avg_pct_return": self.price_returns[ret_col].mean(),
-                    "avg_log_return": self.price_returns[log_col].mean(),
-                }
+        if self.storage.incremental:
+            self.summary_moments = self._summary_moments(coins)
+        summary_df = self._summary_frame(self.price_returns, coins, self.summary_moments)
+        self._start_correlation_engines(coins)
+        for name, engine in self.correlation_engines.items():
+            # Restored engines have already seen the stored rows; only appended rows are merged.
+            first_row = engine.rows + (1 if name == "returns" else 0)
+            engine.update(self.price_returns[engine.assets].iloc[first_row:].to_numpy(dtype=np.float64))
+        self._publish_correlations()
+        self.summary_table = summary_df
+        if self.multi_quote_table is not None:
+            self.quote_summary = self._quote_summary_frame(coins)
+        return summary_df
+
+    def _quote_summary_frame(self, coins: List[str]) -> pd.DataFrame:
+        summaries = []
+        for quote, frame in self.multi_quote_table.groupby(level="vs_currency", sort=False):
+            # Coins skipped for this quote have no prices to summarise.
+            quote_coins = [coin for coin in coins if frame[f"{coin}_price"].notna().any()]
+            summary = self._summary_frame(frame.droplevel("vs_currency").reset_index(), quote_coins)
+            summary.insert(0, "vs_currency", quote)
+            summaries.append(summary)
+        return pd.concat(summaries, ignore_index=True)
+
+    def _saved_rows(self) -> int:
+        """Rows the engines and moments saved with the stored table had seen, 0 without a stored table."""
+        stored_rows = len(self.state) if self.state is not None else 0
+        if not stored_rows:
+            return 0
+        return stored_rows + self.trimmed_rows + (1 if self.reopened_state is not None else 0)
+
+    def _start_correlation_engines(self, coins: List[str]) -> None:
+        stored_rows = len(self.state) if self.state is not None else 0
+        saved_rows = self._saved_rows()
+        price_cols = [f"{coin}_price" for coin in coins]
+        return_cols = [f"{coin}_pct_return" for coin in coins]
+        leaving = self.trimmed_state
+        specs = {
+            "prices": (price_cols, "sample", saved_rows, leaving[price_cols].iloc[:-1] if leaving is not None else None),
+            # The first return row is a 0.0 placeholder, so the return engine skips it. After a trim the
+            # new first row's return leaves along with the trimmed rows.
+            "returns": (
+                return_cols,
+                self.analytics.correlation_method,
+                max(saved_rows - 1, 0),
+                leaving[return_cols].iloc[1:] if leaving is not None else None,
+            ),
+        }
+        self.correlation_engines = {}
+        for name, (columns, method, expected_count, removed) in specs.items():
+            engine = CorrelationEngine(columns, method, self.analytics.correlation_halflife)
+            path = self.output_dir / CORRELATION_STATE_FILE.format(name=name)
+            if stored_rows and path.exists():
+                stored = CorrelationEngine.load(path)
+                expected = (engine.assets, engine.method, engine.halflife, expected_count)
+                if (stored.assets, stored.method, stored.halflife, stored.rows) == expected:
+                    engine = stored
+                    if self.reopened_state is not None:
+                        engine.remove(self.reopened_state[columns].to_numpy(dtype=np.float64), newest=True)
+                    if removed is not None:
+                        engine.remove(removed.to_numpy(dtype=np.float64))
+            self.correlation_engines[name] = engine
+
+    def _publish_correlations(self) -> None:
+        self.correlation_matrix = self.correlation_engines["prices"].correlation()
+        self.return_correlation = self.correlation_engines["returns"].correlation()
+
+    def _summary_moments(self, coins: List[str]) -> Dict[str, MomentAccumulator]:
+        """Saved summary moments brought up to date with this run's rows, or built over the whole table."""
+        stored_rows = len(self.state) if self.state is not None else 0
+        moments = self._load_summary_moments(coins, self._saved_rows()) if stored_rows else None
+        if moments is None:
+            moments = {name: MomentAccumulator(len(coins)) for name in SUMMARY_MOMENTS}
+            stored_rows = 0
+        else:
+            if self.reopened_state is not None:
+                # The reopened bucket's old row leaves; its rebuilt row is merged with the new rows below.
+                for name, block in self._moment_blocks(self.reopened_state, coins).items():
+                    moments[name].remove(block)
+            if self.trimmed_state is not None:
+                leaving = self._moment_blocks(self.trimmed_state, coins)
+                first = self._moment_blocks(self.state.iloc[:1], coins)
+                for name, accumulator in moments.items():
+                    # Trimmed prices leave; the returns also lose the new first row's, now a placeholder.
+                    accumulator.remove(leaving[name][:-1] if name == "prices" else leaving[name])
+                    if name != "prices":
+                        accumulator.update(first[name])
+        for name, block in self._moment_blocks(self.price_returns.iloc[stored_rows:], coins).items():
+            moments[name].update(block)
+        return moments
+
+    def _load_summary_moments(self, coins: List[str], rows: int) -> Dict[str, MomentAccumulator] | None:
+        path = self.output_dir / SUMMARY_STATE_FILE
+        if not path.exists():
+            return None
+        moments = {}
+        with np.load(path, allow_pickle=False) as data:
+            if data["coins"].tolist() != coins or int(data["rows"]) != rows:
+                return None
+            for name in SUMMARY_MOMENTS:
+                accumulator = MomentAccumulator(len(coins))
+                accumulator.count, accumulator.mean, accumulator.m2 = (
+                    data[f"{name}_{field}"].copy() for field in ("count", "mean", "m2")
+                )
+                moments[name] = accumulator
+        return moments
+
+    @staticmethod
+    def _moment_blocks(frame: pd.DataFrame, coins: List[str]) -> Dict[str, np.ndarray]:
+        returns = frame[[f"{coin}_pct_return" for coin in coins]].to_numpy(dtype=np.float64)
+        return {
+            "prices": frame[[f"{coin}_price" for coin in coins]].to_numpy(dtype=np.float64),
+            "returns": returns,
+            "log_returns": frame[[f"{coin}_log_return" for coin in coins]].to_numpy(dtype=np.float64),
+            "downside": np.where(returns < 0, returns, np.nan),
+        }
+
+    def _summary_frame(
+        self, frame: pd.DataFrame, coins: List[str], moments: Dict[str, MomentAccumulator] | None = None
+    ) -> pd.DataFrame:
+        # A handful of whole-matrix passes cover every coin and statistic at once.
+        prices = frame[[f"{coin}_price" for coin in coins]].to_numpy(dtype=np.float64)
+        returns = frame[[f"{coin}_pct_return" for coin in coins]].to_numpy(dtype=np.float64)
+        if moments is None:
+            stats = {name: column_moments(block) for name, block in self._moment_blocks(frame, coins).items()}
+        else:
+            # Running moments kept across incremental runs; only order statistics need the rows.
+            stats = self._accumulated_moments(moments)
+
+        columns = np.arange(len(coins))
+        arg_max, arg_min = extreme_rows(prices)
+        timestamps = frame["timestamp"].reset_index(drop=True)
+        extremes = (
+            np.where(arg_max >= 0, prices[arg_max, columns], np.nan),
+            np.where(arg_min >= 0, prices[arg_min, columns], np.nan),
+            timestamps.reindex(arg_max).array,
+            timestamps.reindex(arg_min).array,
+        )
+        tail = tail_statistics(returns, self.analytics.summary_quantiles, self.analytics.var_levels)
+        return self._summary_table(coins, stats, median(prices), extremes, tail)
+
+    @staticmethod
+    def _accumulated_moments(moments: Dict[str, MomentAccumulator]) -> Dict[str, Tuple[np.ndarray, ...]]:
+        # Columns without observations have no mean, as with column_moments.
+        return {
+            name: (acc.count, np.where(acc.count > 0, acc.mean, np.nan), acc.std()) for name, acc in moments.items()
+        }
+
+    @staticmethod
+    def _summary_table(
+        coins: List[str],
+        moments: Dict[str, Tuple[np.ndarray, ...]],
+        medians: np.ndarray,
+        extremes: Tuple[np.ndarray, ...],
+        tail: Dict[str, np.ndarray],
+    ) -> pd.DataFrame:
+        """The asset summary from per-coin (count, mean, std) moments, medians, extremes and tail statistics."""
+        _, mean_price, std_price = moments["prices"]
+        _, mean_return, std_return = moments["returns"]
+        _, mean_log_return, _ = moments["log_returns"]
+        downside_count, _, downside_std = moments["downside"]
+        max_price, min_price, time_of_max, time_of_min = extremes
+        stats = {
+            "mean_price": mean_price,
+            "median_price": medians,
+            "std_price": std_price,
+            "annualized_volatility": std_return * math.sqrt(365),
+            "downside_volatility": np.where(downside_count > 0, downside_std * math.sqrt(365), 0.0),
+            "max_price": max_price,
+            "min_price": min_price,
+            "time_of_max_price": time_of_max,
+            "time_of_min_price": time_of_min,
+            "avg_pct_return": mean_return,
+            "avg_log_return": mean_log_return,
+        }
+        table = pd.DataFrame({"coin": [coin.title() for coin in coins], **stats, **tail})
+        # In-memory and chunked tables can carry different datetime units; the summary always uses the API's.
+        times = ["time_of_max_price", "time_of_min_price"]
+        table[times] = table[times].astype(SUMMARY_TIME_DTYPE)
+        return table
+
+    def _summary_frame_chunked(self, coins: List[str]) -> pd.DataFrame:
+        # Same columns as _summary_frame, from mergeable accumulators over the stored chunks.
+        price_cols = [f"{coin}_price" for coin in coins]
+        return_cols = [f"{coin}_pct_return" for coin in coins]
+        log_cols = [f"{coin}_log_return" for coin in coins]
+        width = len(coins)
+        prices_acc, returns_acc = MomentAccumulator(width), MomentAccumulator(width)
+        log_acc, downside_acc = MomentAccumulator(width), MomentAccumulator(width)
+        self._start_correlation_engines(coins)
+        price_engine, return_engine = self.correlation_engines["prices"], self.correlation_engines["returns"]
+        max_price, min_price = np.full(width, -np.inf), np.full(width, np.inf)
+        time_of_max = pd.Series(pd.NaT, index=range(width), dtype="datetime64[ns, UTC]")
+        time_of_min = time_of_max.copy()
+
+        for chunk in self.returns_store.chunks():
+            prices = chunk[price_cols].to_numpy(dtype=np.float64)
+            returns = chunk[return_cols].to_numpy(dtype=np.float64)
+            prices_acc.update(prices)
+            returns_acc.update(returns)
+            log_acc.update(chunk[log_cols].to_numpy(dtype=np.float64))
+            downside_acc.update(np.where(returns < 0, returns, np.nan))
+            # The table's first return row is a placeholder and is left out, as in memory.
+            return_engine.update(returns[1:] if price_engine.rows == 0 else returns)
+            price_engine.update(prices)
+
+            columns = np.arange(width)
+            timestamps = chunk["timestamp"]
+            # Strict comparisons keep the first occurrence, like idxmax/idxmin on the whole table.
+            arg = np.where(np.isnan(prices), -np.inf, prices).argmax(axis=0)
+            better = prices[arg, columns] > max_price
+            max_price[better] = prices[arg, columns][better]
+            time_of_max[better] = timestamps.iloc[arg[better]].to_numpy()
+            arg = np.where(np.isnan(prices), np.inf, prices).argmin(axis=0)
+            better = prices[arg, columns] < min_price
+            min_price[better] = prices[arg, columns][better]
+            time_of_min[better] = timestamps.iloc[arg[better]].to_numpy()
+
+        # Medians and quantiles are not mergeable, so each coin's columns are read back on their own.
+        medians = np.empty(width)
+        tails: Dict[str, np.ndarray] = {}
+        for idx, (price_col, return_col) in enumerate(zip(price_cols, return_cols)):
+            columns = self.returns_store.read_columns([price_col, return_col])
+            medians[idx] = median(columns[[price_col]].to_numpy(dtype=np.float64))[0]
+            coin_tail = tail_statistics(
+                columns[[return_col]].to_numpy(dtype=np.float64),
+                self.analytics.summary_quantiles,
+                self.analytics.var_levels,
             )
+            for label, value in coin_tail.items():
+                tails.setdefault(label, np.empty(width))[idx] = value[0]
+        self._publish_correlations()
 
-        summary_df = pd.DataFrame(summary_rows)
+        moments = {"prices": prices_acc, "returns": returns_acc, "log_returns": log_acc, "downside": downside_acc}
+        extremes = (
+            np.where(np.isinf(max_price), np.nan, max_price),
+            np.where(np.isinf(min_price), np.nan, min_price),
+            time_of_max.array,
+            time_of_min.array,
+        )
+        return self._summary_table(coins, self._accumulated_moments(moments), medians, extremes, tails)
 
-        price_cols = [f"{coin}_price" for coin in COINS]
-        self.correlation_matrix = self.price_returns[price_cols].corr()
-        self.summary_table = summary_df
-        return summary_df
+    def compute_indicators(self) -> pd.DataFrame | None:
+        if not self.analytics.indicators:
+            return None
+        if self.price_returns is None and self.returns_store is None:
+            raise RuntimeError("Return table unavailable. Call compute_returns_and_risk first.")
+
+        coins = self.coins
+        price_cols = [f"{coin}_price" for coin in coins]
+        volume_cols = [f"{coin}_volume" for coin in coins]
+        if self.returns_store is not None:
+            # The engine carries its windows and filter outputs from one chunk to the next.
+            engine = self._new_indicator_engine(coins)
+            self.indicator_store = ChunkedTable(self.output_dir / CHUNK_DIR / "technical_indicators").reset()
+            for chunk in self.returns_store.chunks(["timestamp", *price_cols, *volume_cols]):
+                prices = chunk[price_cols].to_numpy(dtype=np.float64)
+                block = engine.update(prices, chunk[volume_cols].to_numpy(dtype=np.float64))
+                self.indicator_store.append(engine.frame(chunk["timestamp"], block))
+            self.indicator_engine = engine
+            return None
+
+        stored = self._load_indicator_state(coins)
+        engine, history = stored if stored is not None else (self._new_indicator_engine(coins), None)
+        # A restored engine has already seen the stored rows; only appended rows are computed.
+        rows = self.price_returns.iloc[engine.rows :]
+        block = engine.update(rows[price_cols].to_numpy(dtype=np.float64), rows[volume_cols].to_numpy(dtype=np.float64))
+        table = engine.frame(rows["timestamp"], block)
+        if history is not None:
+            table = pd.concat([history, table], ignore_index=True)
+
+        self.indicator_engine = engine
+        self.indicator_table = table
+        return table
+
+    def _new_indicator_engine(self, coins: List[str]) -> IndicatorEngine:
+        return IndicatorEngine(coins, self.analytics.indicators, self.analytics.indicator_window)
+
+    def _load_indicator_state(self, coins: List[str]) -> Tuple[IndicatorEngine, pd.DataFrame] | None:
+        stored_rows = len(self.state) if self.state is not None else 0
+        engine_path = self.output_dir / INDICATOR_ENGINE_FILE
+        table_path = self.output_dir / INDICATOR_STATE_FILE
+        # The filters cannot take a reopened bucket back out, so they are rebuilt over the table.
+        if not stored_rows or self.reopened_state is not None or not engine_path.exists() or not table_path.exists():
+            return None
+        saved_rows = self._saved_rows()
+        engine = IndicatorEngine.load(engine_path)
+        if engine.config() != self._new_indicator_engine(coins).config() or engine.rows != saved_rows:
+            return None
+        history = pd.read_parquet(table_path)
+        if len(history) != saved_rows:
+            return None
+        # The filters only carry the latest rows, so a trim just drops the oldest output rows.
+        engine.rows = stored_rows
+        return engine, history.iloc[self.trimmed_rows :].reset_index(drop=True)
+
+    def optimize_portfolio(self) -> pd.DataFrame | None:
+        engine = self.correlation_engines.get("returns")
+        if engine is None:
+            raise RuntimeError("Return covariance unavailable. Call build_summary first.")
+
+        # The return engine already holds the configured covariance estimate, so no pass over the rows.
+        covariance = engine.covariance()
+        if not np.isfinite(covariance).all() or not np.trace(covariance) > 0:
+            print("Too few complete return rows to optimize a portfolio; skipping portfolio_weights.")
+            return None
+        optimizer = PortfolioOptimizer(self.coins, engine.mean, covariance, periods_per_year(self._return_timestamps()))
+        self.portfolio_weights = optimizer.weights_table(self.analytics.risk_aversion)
+        if self.analytics.frontier_points:
+            self.efficient_frontier = optimizer.frontier_table(self.analytics.frontier_points)
+        return self.portfolio_weights
+
+    def _return_timestamps(self) -> pd.Series:
+        if self.returns_store is not None:
+            chunks = [chunk["timestamp"] for chunk in self.returns_store.chunks(["timestamp"])]
+            return pd.concat(chunks, ignore_index=True)
+        return self.price_returns["timestamp"]
+
+    def run_backtest(self) -> pd.DataFrame | None:
+        if self.analytics.backtest_strategy is None:
+            return None
+        if self.price_returns is None and self.returns_store is None:
+            raise RuntimeError("Return table unavailable. Call compute_returns_and_risk first.")
+
+        coins = self.coins
+        price_cols = [f"{coin}_price" for coin in coins]
+        return_cols = [f"{coin}_pct_return" for coin in coins]
+        if self.returns_store is not None:
+            # Signals need the full history, so chunks are read back into memory-mapped matrices.
+            arrays = self._chart_arrays_chunked(price_cols, return_cols)
+            timestamps = pd.Series(pd.DatetimeIndex(arrays["timestamps"]).tz_localize("UTC"))
+            prices, returns = arrays["prices"], arrays["returns"]
+        else:
+            timestamps = self.price_returns["timestamp"]
+            prices = self.price_returns[price_cols].to_numpy(dtype=np.float64)
+            returns = self.price_returns[return_cols].to_numpy(dtype=np.float64)
+
+        strategy = self.analytics.backtest_strategy
+        periods = periods_per_year(timestamps)
+        self.backtest_sweep = run_sweep(
+            prices,
+            returns,
+            strategy,
+            self.analytics.backtest_grid,
+            self.analytics.transaction_cost_bps,
+            periods,
+            self.analytics.backtest_workers,
+            self.output_dir,
+        )
+        best = self.backtest_sweep.iloc[0][list(STRATEGY_PARAMETERS[strategy])].to_dict()
+        weights = strategy_weights(strategy, prices, best)
+        result = backtest(returns, weights, self.analytics.transaction_cost_bps, periods)
+        self.backtest_equity = result.frame(timestamps)
+        return self.backtest_sweep
 
-    def make_visualizations(self) -> None:
-        if self.price_returns is None or self.correlation_matrix is None:
+    def compute_rolling_risk(self) -> pd.DataFrame:
+        if self.price_returns is None and self.returns_store is None:
+            raise RuntimeError("Return table unavailable. Call compute_returns_and_risk first.")
+
+        coins = self.coins
+        return_cols = [f"{coin}_pct_return" for coin in coins]
+        benchmark = BENCHMARK_COIN if BENCHMARK_COIN in coins else coins[0]
+        # The engine is primed with the history once; live updates then cost O(1) per tick.
+        engine = self._load_rolling_engine(coins, benchmark)
+        if engine is not None:
+            # A saved engine has already seen the stored rows; only appended rows are merged.
+            engine.prime(self.price_returns[return_cols].iloc[len(self.state) :].to_numpy())
+        else:
+            engine = RollingRiskEngine(coins, self.analytics.rolling_window, benchmark=benchmark)
+            if self.returns_store is not None:
+                for chunk in self.returns_store.chunks(return_cols):
+                    engine.prime(chunk.to_numpy(dtype=np.float64))
+            else:
+                engine.prime(self.price_returns[return_cols].to_numpy())
+        self.rolling_engine = engine
+
+        self.rolling_risk = self._rolling_risk_table()
+        return self.rolling_risk
+
+    def _load_rolling_engine(self, coins: List[str], benchmark: str) -> RollingRiskEngine | None:
+        stored_rows = len(self.state) if self.state is not None else 0
+        path = self.output_dir / ROLLING_STATE_FILE
+        if not stored_rows or not path.exists():
+            return None
+        engine = RollingRiskEngine.load(path)
+        expected = (coins, self.analytics.rolling_window, benchmark, self._saved_rows())
+        if (engine.assets, engine.window, engine.benchmark, engine.ticks) != expected:
+            return None
+        if self.reopened_state is not None:
+            engine.pop()
+        # The window must not reach back into trimmed rows; drawdowns keep running from the first saved run.
+        return engine if min(engine.window, engine.ticks) <= stored_rows else None
+
+    def _rolling_risk_table(self, as_of: pd.Timestamp | None = None) -> pd.DataFrame:
+        table = self.rolling_engine.snapshot().reset_index(drop=True)
+        table.insert(0, "coin", [coin.title() for coin in self.rolling_engine.assets])
+        table.insert(1, "as_of", as_of if as_of is not None else self._returns_tail(1)["timestamp"].iloc[-1])
+        return table
+
+    def follow(
+        self,
+        poll_interval: float,
+        buffer_size: int = 10_000,
+        max_polls: int | None = None,
+        max_failures: int = 5,
+    ) -> None:
+        """Poll for new candles and update the live window until interrupted or max_polls is reached.
+
+        A failed poll keeps the buffers and is retried after a backoff; ``max_failures`` failed polls
+        in a row end the session with a RuntimeError.
+        """
+        if max_failures <= 0:
+            raise ValueError("max_failures must be a positive integer")
+        if self.price_returns is None and self.returns_store is None:
+            raise RuntimeError("Return table unavailable. Run the batch workflow before following.")
+        if self.rolling_engine is None:
+            self.compute_rolling_risk()
+
+        coins = self.coins
+        price_cols = [f"{coin}_price" for coin in coins]
+        window = PriceRingBuffer(coins, buffer_size)
+        history = self._returns_tail(buffer_size)
+        window.extend(pd.DatetimeIndex(history["timestamp"]).as_unit("ns").asi8, history[price_cols].to_numpy())
+
+        live_dir = self.output_dir / "live"
+        live_dir.mkdir(parents=True, exist_ok=True)
+        print(f"Following {len(coins)} coins every {poll_interval:.0f}s. Press Ctrl+C to stop.")
+
+        polls = 0
+        failures = 0
+        try:
+            while max_polls is None or polls < max_polls:
+                # Failed polls back off on top of the interval, like retried requests.
+                time.sleep(poll_interval + (self.fetch.retry_backoff ** failures if failures else 0.0))
+                polls += 1
+
+                self.raw_series.clear()
+                try:
+                    self.fetch_all(coins, since=window.last_timestamp)
+                    error = f"no data for {', '.join(self.failed_coins)}" if self.failed_coins else None
+                except RuntimeError as exc:
+                    # Under the "abort" policy a single failed coin raises; in follow mode that is one failed poll.
+                    error = str(exc)
+                if error is not None:
+                    failures += 1
+                    print(f"Poll {polls}: skipped ({failures} failed in a row), {error}.")
+                    if failures >= max_failures:
+                        raise RuntimeError(f"Follow mode stopped after {failures} failed polls in a row: {error}")
+                    continue
+                failures = 0
+                new_rows = self._live_rows(window, price_cols)
+                if new_rows.empty:
+                    continue
+
+                timestamps = pd.DatetimeIndex(new_rows["timestamp"]).as_unit("ns").asi8
+                returns = window.extend(timestamps, new_rows[price_cols].to_numpy())
+                for row in returns:
+                    self.rolling_engine.update(row)
+
+                ticks = new_rows.copy()
+                for idx, coin in enumerate(coins):
+                    ticks[f"{coin}_pct_return"] = returns[:, idx]
+                self._append_csv(ticks, live_dir / "live_ticks.csv")
+
+                as_of = new_rows["timestamp"].iloc[-1]
+                summary = self._live_summary(window, coins)
+                summary.insert(0, "as_of", as_of)
+                self._append_csv(summary, live_dir / "live_summary.csv")
+                self._append_csv(self._rolling_risk_table(as_of), live_dir / "live_rolling_risk.csv")
+                window.correlation().to_csv(live_dir / "live_price_correlation.csv")
+                print(f"Poll {polls}: appended {len(new_rows)} rows up to {as_of}.")
+        except KeyboardInterrupt:
+            print("Follow mode stopped.")
+
+    def _live_summary(self, window: PriceRingBuffer, coins: List[str]) -> pd.DataFrame:
+        """The asset summary over the live window, without rebuilding it as a table."""
+        # Moments and extremes are kept current per tick; medians and tail statistics still select over the rows.
+        prices, returns = window.values()
+        tail = tail_statistics(returns, self.analytics.summary_quantiles, self.analytics.var_levels)
+        moments = self._accumulated_moments(window.summary_moments)
+        return self._summary_table(coins, moments, median(prices), window.extremes(), tail)
+
+    def _live_rows(self, window: PriceRingBuffer, price_cols: List[str]) -> pd.DataFrame:
+        frames = [series.dataframe.set_index("timestamp") for series in self.raw_series.values()]
+        delta = align_on_timestamp(frames, self.storage.resample)
+        delta = delta.loc[delta["timestamp"] > window.last_timestamp, ["timestamp", *price_cols]]
+        if delta.empty:
+            return delta
+
+        # Coins without a print at a given timestamp carry their last known price forward.
+        prices = np.vstack([window.last_prices, delta[price_cols].to_numpy(dtype=np.float64)])
+        prices = pd.DataFrame(prices).ffill().to_numpy()[1:]
+        delta[price_cols] = prices
+        return delta.reset_index(drop=True)
+
+    @staticmethod
+    def _append_csv(frame: pd.DataFrame, path: Path) -> None:
+        frame.to_csv(path, mode="a", header=not path.exists(), index=False)
+
+    def make_visualizations(self) -> List[Path]:
+        if (self.price_returns is None and self.returns_store is None) or self.correlation_matrix is None:
             raise RuntimeError("Analysis tables unavailable. Compute summary before plotting.")
 
-        visuals_dir = self.output_dir / "visuals"
-        ts = self.price_returns["timestamp"]
-
-        plt.style.use("ggplot")
-
-        # 1) Price history for each coin.
-        fig, ax = plt.subplots(figsize=(12, 6))
-        for coin in COINS:
-            ax.plot(ts, self.price_returns[f"{coin}_price"], label=coin.title())
-        ax.set_title("Crypto Prices Over Time")
-        ax.set_xlabel("Time")
-        ax.set_ylabel("Price (USD)")
-        ax.legend()
-        fig.tight_layout()
-        fig.savefig(visuals_dir / "01_price_trends.png", dpi=140)
-        plt.close(fig)
-
-        # 2) Indexed performance for apples-to-apples comparison.
-        fig, ax = plt.subplots(figsize=(12, 6))
-        for coin in COINS:
-            indexed = self.price_returns[f"{coin}_price"] / self.price_returns[f"{coin}_price"].iloc[0] * 100
-            ax.plot(ts, indexed, label=f"{coin.title()} (Base=100)")
-        ax.set_title("Indexed Relative Performance")
-        ax.set_xlabel("Time")
-        ax.set_ylabel("Indexed Value")
-        ax.legend()
-        fig.tight_layout()
-        fig.savefig(visuals_dir / "02_indexed_performance.png", dpi=140)
-        plt.close(fig)
-
-        # 3) Return dispersion.
-        fig, ax = plt.subplots(figsize=(10, 6))
-        data = [self.price_returns[f"{coin}_pct_return"] for coin in COINS]
-        ax.boxplot(data, tick_labels=[coin.title() for coin in COINS], showfliers=False)
-        ax.set_title("Daily Percentage Return Distribution")
-        ax.set_ylabel("Pct Return")
-        fig.tight_layout()
-        fig.savefig(visuals_dir / "03_return_boxplot.png", dpi=140)
-        plt.close(fig)
-
-        # 4) Rolling volatility trend.
-        fig, ax = plt.subplots(figsize=(12, 6))
-        for coin in COINS:
-            rolling_vol = self.price_returns[f"{coin}_pct_return"].rolling(window=7).std() * math.sqrt(365)
-            ax.plot(ts, rolling_vol, label=coin.title())
-        ax.set_title("7-Day Rolling Annualized Volatility")
-        ax.set_xlabel("Time")
-        ax.set_ylabel("Volatility")
-        ax.legend()
-        fig.tight_layout()
-        fig.savefig(visuals_dir / "04_rolling_volatility.png", dpi=140)
-        plt.close(fig)
-
-        # 5) Correlation heatmap.
-        fig, ax = plt.subplots(figsize=(8, 6))
-        matrix = self.correlation_matrix.values
-        im = ax.imshow(matrix, cmap="coolwarm", vmin=-1, vmax=1)
-        ax.set_xticks(range(len(COINS)))
-        ax.set_xticklabels([coin.title() for coin in COINS])
-        ax.set_yticks(range(len(COINS)))
-        ax.set_yticklabels([coin.title() for coin in COINS])
-        ax.set_title("Price Correlation Matrix")
-        for i in range(matrix.shape[0]):
-            for j in range(matrix.shape[1]):
-                ax.text(j, i, f"{matrix[i, j]:.2f}", ha="center", va="center", color="black")
-        fig.colorbar(im, ax=ax, fraction=0.046, pad=0.04)
-        fig.tight_layout()
-        fig.savefig(visuals_dir / "05_correlation_heatmap.png", dpi=140)
-        plt.close(fig)
+        if not self.output.charts:
+            return []
+
+        coins = self.coins
+        price_cols = [f"{coin}_price" for coin in coins]
+        return_cols = [f"{coin}_pct_return" for coin in coins]
+        if self.returns_store is not None:
+            arrays = self._chart_arrays_chunked(price_cols, return_cols)
+        else:
+            arrays = {
+                "timestamps": _npy_values(self.price_returns["timestamp"]),
+                "prices": self.price_returns[price_cols].to_numpy(dtype=np.float64),
+                "returns": self.price_returns[return_cols].to_numpy(dtype=np.float64),
+            }
+        arrays["correlation"] = self.correlation_matrix.to_numpy(dtype=np.float64)
+        return render_charts(
+            arrays,
+            [coin.title() for coin in coins],
+            self.output_dir / "visuals",
+            charts=self.output.charts,
+            workers=self.output.render_workers,
+            decimate=self.output.plot_decimation,
+            quote=self.vs_currency,
+        )
+
+    def _chart_arrays_chunked(self, price_cols: List[str], return_cols: List[str]) -> Dict[str, np.ndarray]:
+        # Chart inputs are filled into memory-mapped .npy files one chunk at a time.
+        plot_dir = self.output_dir / CHUNK_DIR / "plot"
+        plot_dir.mkdir(parents=True, exist_ok=True)
+        rows = len(self.returns_store)
+        arrays = {
+            "timestamps": np.lib.format.open_memmap(plot_dir / "timestamps.npy", "w+", "datetime64[ns]", (rows,)),
+            "prices": np.lib.format.open_memmap(plot_dir / "prices.npy", "w+", np.float64, (rows, len(price_cols))),
+            "returns": np.lib.format.open_memmap(plot_dir / "returns.npy", "w+", np.float64, (rows, len(return_cols))),
+        }
+        start = 0
+        for chunk in self.returns_store.chunks(["timestamp", *price_cols, *return_cols]):
+            stop = start + len(chunk)
+            arrays["timestamps"][start:stop] = _npy_values(chunk["timestamp"])
+            arrays["prices"][start:stop] = chunk[price_cols].to_numpy(dtype=np.float64)
+            arrays["returns"][start:stop] = chunk[return_cols].to_numpy(dtype=np.float64)
+            start = stop
+        return arrays
 
     def export_outputs(self) -> None:
-        if self.market_data is None or self.price_returns is None or self.summary_table is None:
+        if (self.price_returns is None and self.returns_store is None) or self.summary_table is None:
             raise RuntimeError("Not all outputs are ready for export")
 
-        self.market_data.to_csv(self.output_dir / "market_data_cleaned.csv", index=False)
-        self.price_returns.to_csv(self.output_dir / "market_data_with_returns.csv", index=False)
-        self.summary_table.to_csv(self.output_dir / "asset_summary.csv", index=False)
-        self.correlation_matrix.to_csv(self.output_dir / "price_correlation.csv")
+        tables = {
+            "asset_summary": self.summary_table,
+            "price_correlation": self.correlation_matrix.rename_axis("asset").reset_index(),
+            "price_correlation_condensed": self.correlation_engines["prices"].condensed(self.correlation_matrix),
+            "return_correlation": self.return_correlation.rename_axis("asset").reset_index(),
+            "return_correlation_condensed": self.correlation_engines["returns"].condensed(self.return_correlation),
+        }
+        stores: Dict[str, ChunkedTable] = {}
+        if self.returns_store is not None:
+            stores = {"market_data_cleaned": self.market_store, "market_data_with_returns": self.returns_store}
+        else:
+            tables = {"market_data_cleaned": self.market_data, "market_data_with_returns": self.price_returns, **tables}
+        if self.portfolio_weights is not None:
+            tables["portfolio_weights"] = self.portfolio_weights
+        if self.efficient_frontier is not None:
+            tables["efficient_frontier"] = self.efficient_frontier
+        if self.rolling_risk is not None:
+            tables["rolling_risk"] = self.rolling_risk
+        if self.indicator_store is not None:
+            stores["technical_indicators"] = self.indicator_store
+        elif self.indicator_table is not None:
+            tables["technical_indicators"] = self.indicator_table
+        if self.backtest_sweep is not None:
+            tables["backtest_sweep"] = self.backtest_sweep
+            tables["backtest_equity"] = self.backtest_equity
+        if self.multi_quote_table is not None:
+            tables["market_data_multi_quote"] = self.multi_quote_table.reset_index()
+            tables["asset_summary_by_quote"] = self.quote_summary
+        compression = self.output.parquet_compression
+        for fmt in self.output.export_formats:
+            for name, table in tables.items():
+                write_table(table, self.output_dir / name, fmt, compression)
+            for name, store in stores.items():
+                with ChunkedTableWriter(self.output_dir / name, fmt, compression, len(store)) as writer:
+                    for chunk in store.chunks():
+                        writer.write(chunk)
+
+        if self.store is not None:
+            self._write_store()
+        if self.storage.incremental:
+            self.save_state()
+
+    def _write_store(self) -> None:
+        coins = self.coins
+        if self.returns_store is not None:
+            for chunk in self.returns_store.chunks():
+                self.store.write(chunk, coins, self.vs_currency)
+        else:
+            table = self.price_returns
+            if self.state is not None:
+                # Incremental runs only upsert the rows appended after the stored table.
+                table = table[table["timestamp"] > self.state["timestamp"].iloc[-1]]
+            self.store.write(table, coins, self.vs_currency)
+        if self.multi_quote_table is not None:
+            for quote, frame in self.multi_quote_table.groupby(level="vs_currency", sort=False):
+                if quote != self.vs_currency:
+                    self.store.write(frame.droplevel("vs_currency").reset_index(), coins, quote)
 
 
 def parse_args() -> argparse.Namespace:
@@ -292,22 +1965,327 @@ def parse_args() -> argparse.Namespace:
         default=Path("outputs"),
         help="Directory to save csv outputs and visuals",
     )
+    parser.add_argument(
+        "--coins",
+        nargs="+",
+        default=None,
+        help="CoinGecko coin ids to analyse (default: bitcoin ethereum ripple)",
+    )
+    parser.add_argument(
+        "--coins-file",
+        type=Path,
+        default=None,
+        help="Text file listing CoinGecko coin ids, one per line or comma separated",
+    )
+    parser.add_argument(
+        "--vs-currencies",
+        nargs="+",
+        default=[VS_CURRENCY],
+        help="Quote currencies to fetch (e.g. usd eur btc); analytics use the first one",
+    )
+    parser.add_argument(
+        "--resample",
+        choices=list(RESAMPLE_RULES),
+        default=None,
+        help="Align all coins on a fixed time grid (last observation per interval)",
+    )
+    parser.add_argument(
+        "--max-gap",
+        default=None,
+        help="Longest gap (e.g. 30min, 6h) to interpolate; longer gaps stay missing. Default fills every gap",
+    )
+    parser.add_argument(
+        "--quantiles",
+        nargs="*",
+        type=float,
+        default=list(DEFAULT_QUANTILES),
+        help="Return quantiles reported per coin in the asset summary",
+    )
+    parser.add_argument(
+        "--var-levels",
+        nargs="*",
+        type=float,
+        default=list(DEFAULT_VAR_LEVELS),
+        help="Confidence levels for historical VaR and CVaR in the asset summary",
+    )
+    parser.add_argument(
+        "--indicators",
+        nargs="*",
+        choices=INDICATORS,
+        default=[],
+        help="Technical indicators to compute for every coin into technical_indicators",
+    )
+    parser.add_argument(
+        "--indicator-window",
+        type=int,
+        default=20,
+        help="Window for SMA, EMA, Bollinger bands and VWAP",
+    )
+    parser.add_argument(
+        "--risk-aversion",
+        type=float,
+        default=3.0,
+        help="Risk aversion of the mean-variance portfolio in portfolio_weights",
+    )
+    parser.add_argument(
+        "--frontier-points",
+        type=int,
+        default=50,
+        help="Points on the efficient frontier (0 skips efficient_frontier)",
+    )
+    parser.add_argument(
+        "--backtest",
+        choices=STRATEGIES,
+        default=None,
+        help="Sweep this signal strategy over its parameter grid into backtest_sweep and backtest_equity",
+    )
+    parser.add_argument(
+        "--backtest-grid",
+        nargs="+",
+        default=[],
+        help="Parameter values to sweep as name=v1,v2 items, e.g. lookback=12,24,48 (default: built-in grid)",
+    )
+    parser.add_argument(
+        "--transaction-cost-bps",
+        type=float,
+        default=10.0,
+        help="Transaction cost in basis points of traded notional",
+    )
+    parser.add_argument(
+        "--backtest-workers",
+        type=int,
+        default=1,
+        help="Processes evaluating the backtest parameter sweep",
+    )
+    parser.add_argument(
+        "--rolling-window",
+        type=int,
+        default=7,
+        help="Number of return observations in the rolling risk window",
+    )
+    parser.add_argument(
+        "--correlation-method",
+        choices=CORRELATION_METHODS,
+        default="sample",
+        help="Estimator for the return correlation matrix",
+    )
+    parser.add_argument(
+        "--correlation-halflife",
+        type=float,
+        default=30.0,
+        help="Half-life in rows for the ewma correlation method",
+    )
+    parser.add_argument(
+        "--follow",
+        action="store_true",
+        help="After the batch run, keep polling for new candles and append live outputs",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=60.0,
+        help="Seconds between polls in follow mode",
+    )
+    parser.add_argument(
+        "--buffer-size",
+        type=int,
+        default=10_000,
+        help="Number of recent points per coin kept in memory in follow mode",
+    )
+    parser.add_argument(
+        "--max-poll-failures",
+        type=int,
+        default=5,
+        help="Failed polls in a row after which follow mode gives up",
+    )
+    parser.add_argument(
+        "--base-url",
+        default=BASE_URL,
+        help="market_chart endpoint template with a {coin_id} placeholder (e.g. a local mock server)",
+    )
+    parser.add_argument(
+        "--charts",
+        nargs="*",
+        choices=CHARTS,
+        default=list(CHARTS),
+        help="Charts to render (pass no names to skip plotting)",
+    )
+    parser.add_argument(
+        "--render-workers",
+        type=int,
+        default=1,
+        help="Processes used to render charts in parallel",
+    )
+    parser.add_argument(
+        "--full-resolution-plots",
+        action="store_true",
+        help="Plot every row instead of a per-pixel min/max envelope",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Record tracemalloc allocation deltas per stage in the timing report (slower)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Dump cProfile stats per stage into <output-dir>/profile",
+    )
+    parser.add_argument(
+        "--value-dtype",
+        choices=VALUE_DTYPES,
+        default="float64",
+        help="Float precision for ingested prices, market caps and volumes",
+    )
+    parser.add_argument(
+        "--stream-threshold-mb",
+        type=float,
+        default=32.0,
+        help="Payloads larger than this are parsed as a stream to cap peak memory",
+    )
+    parser.add_argument(
+        "--chunk-rows",
+        type=int,
+        default=None,
+        help="Process the aligned table out of core in time-ordered chunks of this many rows",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=1,
+        help="Maximum number of coins fetched in parallel under the shared rate limit",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Checkpoint fetched coins and reuse the checkpoints of an interrupted run, fetching only the missing coins",
+    )
+    parser.add_argument(
+        "--on-fetch-error",
+        choices=FETCH_ERROR_POLICIES,
+        default="abort",
+        help="Abort the run when a coin cannot be fetched, or skip it and report it in fetch_failures.json",
+    )
+    parser.add_argument(
+        "--pool-size",
+        type=int,
+        default=10,
+        help="Pooled HTTP connections kept open per host",
+    )
+    parser.add_argument(
+        "--no-keep-alive",
+        action="store_true",
+        help="Close the connection after every request instead of reusing it",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=900.0,
+        help="Seconds a cached CoinGecko payload stays valid",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=float,
+        default=256.0,
+        help="Size bound of the on-disk response cache; least recently used entries are evicted",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Always fetch from the network")
+    parser.add_argument(
+        "--export-format",
+        nargs="+",
+        choices=EXPORT_FORMATS,
+        default=["csv"],
+        help="One or more output table formats",
+    )
+    parser.add_argument(
+        "--parquet-compression",
+        default="snappy",
+        help="Parquet codec used when exporting parquet (e.g. snappy, zstd, gzip, none)",
+    )
+    parser.add_argument(
+        "--store-dir",
+        type=Path,
+        default=None,
+        help="Also upsert processed rows into a coin/month partitioned Parquet store here for range queries",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Append only candles newer than the stored market table instead of refetching the full window",
+    )
     return parser.parse_args()
 
 
 def main() -> None:
     args = parse_args()
 
-    pipeline = CryptoMarketPipeline(days=args.days, output_dir=args.output_dir)
-    pipeline.fetch_all(COINS)
-    pipeline.prepare_market_table()
-    pipeline.compute_returns_and_risk()
-    pipeline.build_summary()
-    pipeline.make_visualizations()
-    pipeline.export_outputs()
+    profiler = StageProfiler(
+        trace_memory=args.trace_memory,
+        profile_dir=args.output_dir / "profile" if args.profile else None,
+    )
+    pipeline = CryptoMarketPipeline(
+        days=args.days,
+        output_dir=args.output_dir,
+        fetch=FetchConfig(
+            base_url=args.base_url,
+            vs_currencies=args.vs_currencies,
+            max_concurrency=args.max_concurrency,
+            pool_size=args.pool_size,
+            keep_alive=not args.no_keep_alive,
+            use_cache=not args.no_cache,
+            cache_ttl_seconds=args.cache_ttl,
+            cache_max_bytes=int(args.cache_max_mb * 1024 * 1024),
+            value_dtype=args.value_dtype,
+            stream_threshold_bytes=int(args.stream_threshold_mb * 1024 * 1024),
+            resume=args.resume,
+            on_fetch_error=args.on_fetch_error,
+        ),
+        storage=StorageConfig(
+            incremental=args.incremental,
+            resample=args.resample,
+            max_gap=args.max_gap,
+            chunk_rows=args.chunk_rows,
+            store_dir=args.store_dir,
+        ),
+        analytics=AnalyticsConfig(
+            rolling_window=args.rolling_window,
+            correlation_method=args.correlation_method,
+            correlation_halflife=args.correlation_halflife,
+            summary_quantiles=args.quantiles,
+            var_levels=args.var_levels,
+            indicators=args.indicators,
+            indicator_window=args.indicator_window,
+            backtest_strategy=args.backtest,
+            backtest_grid=parse_parameter_grid(args.backtest_grid),
+            transaction_cost_bps=args.transaction_cost_bps,
+            backtest_workers=args.backtest_workers,
+            risk_aversion=args.risk_aversion,
+            frontier_points=args.frontier_points,
+        ),
+        output=OutputConfig(
+            export_formats=args.export_format,
+            parquet_compression=args.parquet_compression,
+            charts=args.charts,
+            render_workers=args.render_workers,
+            plot_decimation=not args.full_resolution_plots,
+        ),
+        profiler=profiler,
+    )
+    try:
+        pipeline.run(load_coin_universe(args.coins, args.coins_file))
+        profiler.write_report(args.output_dir / "timing_report.json")
 
-    print("Workflow completed successfully.")
-    print(f"Outputs saved in: {args.output_dir.resolve()}")
+        print("Workflow completed successfully.")
+        print(f"Outputs saved in: {args.output_dir.resolve()}")
+
+        if args.follow:
+            pipeline.follow(
+                poll_interval=args.poll_interval,
+                buffer_size=args.buffer_size,
+                max_failures=args.max_poll_failures,
+            )
+    finally:
+        pipeline.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,312 @@
+"""
+Backtesting
+
+Vectorized evaluation of signal-driven strategies over the aligned market table:
+- Signals are (rows, coins) target weights; each row's weights are held over the next
+  row's return, so a signal never earns the return it was computed from
+- Positions, turnover, proportional transaction costs, PnL, equity and drawdowns are
+  whole-matrix operations with no per-tick Python loop
+- Built-in momentum, moving-average crossover and mean-reversion signals read window
+  means from cached cumulative sums, so a sweep reuses them across combinations
+- Parameter sweeps map batches of combinations over a process pool; the price and
+  return matrices are written once as .npy files and memory-mapped read-only by every
+  worker instead of being pickled into each task
+"""
+
+from __future__ import annotations
+
+import itertools
+import math
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Parameters of each built-in strategy and their types.
+STRATEGY_PARAMETERS = {
+    "momentum": {"lookback": int},
+    "ma_crossover": {"fast": int, "slow": int},
+    "mean_reversion": {"lookback": int, "threshold": float},
+}
+STRATEGIES = tuple(STRATEGY_PARAMETERS)
+DEFAULT_GRIDS = {
+    "momentum": {"lookback": [12, 24, 48, 96, 288]},
+    "ma_crossover": {"fast": [6, 12, 24, 48], "slow": [48, 96, 192, 288]},
+    "mean_reversion": {"lookback": [24, 48, 96], "threshold": [1.0, 1.5, 2.0, 2.5]},
+}
+METRICS = (
+    "total_return",
+    "annualized_return",
+    "annualized_volatility",
+    "sharpe",
+    "max_drawdown",
+    "avg_turnover",
+    "total_cost",
+    "avg_exposure",
+)
+# Window means kept per process; a sweep revisits the same windows across combinations.
+MAX_CACHED_WINDOWS = 16
+YEAR = pd.Timedelta(days=365)
+
+
+@dataclass
+class BacktestResult:
+    positions: np.ndarray
+    turnover: np.ndarray
+    costs: np.ndarray
+    gross_pnl: np.ndarray
+    net_pnl: np.ndarray
+    equity: np.ndarray
+    drawdown: np.ndarray
+    periods_per_year: float
+
+    def metrics(self) -> Dict[str, float]:
+        rows = len(self.net_pnl)
+        if not rows:
+            return {name: math.nan for name in METRICS}
+        std = self.net_pnl.std(ddof=1) if rows > 1 else math.nan
+        with np.errstate(invalid="ignore", divide="ignore"):
+            annualized_return = self.equity[-1] ** (self.periods_per_year / rows) - 1.0
+            sharpe = self.net_pnl.mean() / std * math.sqrt(self.periods_per_year)
+        return {
+            "total_return": float(self.equity[-1] - 1.0),
+            "annualized_return": float(annualized_return),
+            "annualized_volatility": float(std * math.sqrt(self.periods_per_year)),
+            "sharpe": float(sharpe) if std > 0 else math.nan,
+            "max_drawdown": float(self.drawdown.min()),
+            "avg_turnover": float(self.turnover.mean()),
+            "total_cost": float(self.costs.sum()),
+            "avg_exposure": float(np.abs(self.positions).sum(axis=1).mean()),
+        }
+
+    def frame(self, timestamps: pd.Series) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "timestamp": timestamps.reset_index(drop=True),
+                "gross_exposure": np.abs(self.positions).sum(axis=1),
+                "turnover": self.turnover,
+                "cost": self.costs,
+                "gross_pnl": self.gross_pnl,
+                "net_pnl": self.net_pnl,
+                "equity": self.equity,
+                "drawdown": self.drawdown,
+            }
+        )
+
+
+def backtest(
+    returns: np.ndarray,
+    weights: np.ndarray,
+    cost_bps: float = 10.0,
+    periods_per_year: float = 365.0,
+) -> BacktestResult:
+    """Hold each row's target ``weights`` over the next row's ``returns``.
+
+    Missing weights are flat and missing returns earn nothing. Costs are ``cost_bps`` of
+    the traded notional, charged on the row the position changes.
+    """
+    # C order keeps the row sums in one summation order whatever layout the caller passes.
+    returns = _zero_missing(np.ascontiguousarray(returns, dtype=np.float64))
+    weights = _zero_missing(np.ascontiguousarray(weights, dtype=np.float64))
+    if returns.ndim != 2 or weights.shape != returns.shape:
+        raise ValueError(f"Expected matching (rows, coins) matrices, got {returns.shape} and {weights.shape}")
+
+    positions = np.zeros_like(weights)
+    positions[1:] = weights[:-1]
+    trades = np.diff(positions, axis=0, prepend=0.0)
+    turnover = np.abs(trades).sum(axis=1)
+    costs = turnover * (cost_bps / 10_000.0)
+    gross_pnl = np.einsum("ij,ij->i", positions, returns)
+    net_pnl = gross_pnl - costs
+    equity = np.cumprod(1.0 + net_pnl)
+    # Equity starts at 1, so the running peak does too.
+    peak = np.maximum.accumulate(np.maximum(equity, 1.0))
+    return BacktestResult(positions, turnover, costs, gross_pnl, net_pnl, equity, equity / peak - 1.0, periods_per_year)
+
+
+def periods_per_year(timestamps: pd.Series | np.ndarray) -> float:
+    """Rows per year implied by the average spacing of the timestamps."""
+    values = pd.to_datetime(pd.Series(np.asarray(timestamps)))
+    # Unresampled tables interleave each coin's own timestamps, so the median gap understates the rate.
+    span = values.iloc[-1] - values.iloc[0] if len(values) > 1 else pd.Timedelta(0)
+    if pd.isna(span) or span <= pd.Timedelta(0):
+        return 365.0
+    # Float seconds, since dividing a millisecond-resolution Timedelta would round the spacing.
+    return YEAR.total_seconds() * (len(values) - 1) / span.total_seconds()
+
+
+def parameter_grid(strategy: str, grid: Dict[str, Iterable[float]] | None = None) -> List[Dict[str, float]]:
+    """Every valid combination of ``grid`` (default: DEFAULT_GRIDS) for ``strategy``."""
+    if strategy not in STRATEGY_PARAMETERS:
+        raise ValueError(f"Unknown strategy '{strategy}'. Choose from {', '.join(STRATEGIES)}")
+    types = STRATEGY_PARAMETERS[strategy]
+    grid = {**DEFAULT_GRIDS[strategy], **(grid or {})}
+    unknown = [name for name in grid if name not in types]
+    if unknown:
+        raise ValueError(f"Unknown {strategy} parameter(s) {', '.join(unknown)}. Choose from {', '.join(types)}")
+
+    values = {name: sorted({_parameter_value(name, types[name], value) for value in grid[name]}) for name in types}
+    combos = [dict(zip(types, combo)) for combo in itertools.product(*values.values())]
+    # Crossovers need the fast average to be shorter than the slow one.
+    if strategy == "ma_crossover":
+        combos = [combo for combo in combos if combo["fast"] < combo["slow"]]
+    if not combos:
+        raise ValueError(f"The {strategy} grid has no valid parameter combinations")
+    return combos
+
+
+def parse_parameter_grid(items: Iterable[str]) -> Dict[str, List[float]]:
+    """Parse ``name=v1,v2`` command-line items into a grid."""
+    grid: Dict[str, List[float]] = {}
+    for item in items:
+        name, sep, values = item.partition("=")
+        if not sep or not name or not values:
+            raise ValueError(f"Expected name=v1,v2,... in the parameter grid, got '{item}'")
+        try:
+            grid[name.strip()] = [float(value) for value in values.split(",") if value.strip()]
+        except ValueError as exc:
+            raise ValueError(f"Non-numeric value in the parameter grid item '{item}'") from exc
+    return grid
+
+
+def run_sweep(
+    prices: np.ndarray,
+    returns: np.ndarray,
+    strategy: str,
+    grid: Dict[str, Iterable[float]] | None = None,
+    cost_bps: float = 10.0,
+    periods: float = 365.0,
+    workers: int = 1,
+    scratch_dir: Path | None = None,
+) -> pd.DataFrame:
+    """Backtest every grid combination; one row of parameters and metrics per combination, best Sharpe first."""
+    combos = parameter_grid(strategy, grid)
+    prices = np.ascontiguousarray(prices, dtype=np.float64)
+    returns = np.ascontiguousarray(returns, dtype=np.float64)
+    if prices.ndim != 2 or returns.shape != prices.shape:
+        raise ValueError(f"Expected matching (rows, coins) matrices, got {prices.shape} and {returns.shape}")
+
+    if workers <= 1 or len(combos) == 1:
+        rows = _SweepData(prices, returns).evaluate(strategy, combos, cost_bps, periods)
+    else:
+        # Small batches keep the pool busy without one task per combination.
+        size = max(1, math.ceil(len(combos) / (workers * 4)))
+        batches = [(strategy, combos[lo : lo + size], cost_bps, periods) for lo in range(0, len(combos), size)]
+        with tempfile.TemporaryDirectory(prefix=".backtest-", dir=scratch_dir) as data_dir:
+            np.save(Path(data_dir) / "prices.npy", prices, allow_pickle=False)
+            np.save(Path(data_dir) / "returns.npy", returns, allow_pickle=False)
+            with ProcessPoolExecutor(
+                max_workers=min(workers, len(batches)), initializer=_init_worker, initargs=(data_dir,)
+            ) as executor:
+                rows = [row for batch in executor.map(_evaluate_batch, batches) for row in batch]
+
+    table = pd.DataFrame(rows, columns=[*STRATEGY_PARAMETERS[strategy], *METRICS])
+    return table.sort_values("sharpe", ascending=False, kind="stable", na_position="last").reset_index(drop=True)
+
+
+def strategy_weights(strategy: str, prices: np.ndarray, params: Dict[str, float]) -> np.ndarray:
+    """Equal-weighted target weights for one parameter combination."""
+    return _SweepData(np.asarray(prices, dtype=np.float64), None).weights(strategy, params)
+
+
+class _SweepData:
+    def __init__(self, prices: np.ndarray, returns: np.ndarray | None) -> None:
+        self.prices = prices
+        # Cleaned once here rather than on every combination's backtest.
+        self.returns = _zero_missing(returns) if returns is not None else None
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.log_prices = np.log(prices)
+        self._sums: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._means: Dict[Tuple[str, int], np.ndarray] = {}
+
+    def evaluate(self, strategy: str, combos: List[Dict[str, float]], cost_bps: float, periods: float) -> List[Dict]:
+        rows = []
+        for params in combos:
+            result = backtest(self.returns, self.weights(strategy, params), cost_bps, periods)
+            rows.append({**params, **result.metrics()})
+        return rows
+
+    def weights(self, strategy: str, params: Dict[str, float]) -> np.ndarray:
+        if strategy == "momentum":
+            lookback = int(params["lookback"])
+            signal = np.full_like(self.log_prices, np.nan)
+            signal[lookback:] = self.log_prices[lookback:] - self.log_prices[:-lookback]
+        elif strategy == "ma_crossover":
+            signal = self.window_mean("prices", int(params["fast"])) - self.window_mean("prices", int(params["slow"]))
+        elif strategy == "mean_reversion":
+            lookback = int(params["lookback"])
+            mean = self.window_mean("log_prices", lookback)
+            variance = np.maximum(self.window_mean("log_squares", lookback) - mean * mean, 0.0)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                zscore = (self.log_prices - mean) / np.sqrt(variance)
+            # Fade stretched prices: short above +threshold, long below -threshold.
+            threshold = params["threshold"]
+            signal = np.where(zscore > threshold, -1.0, np.where(zscore < -threshold, 1.0, 0.0))
+            signal[np.isnan(zscore)] = np.nan
+        else:
+            raise ValueError(f"Unknown strategy '{strategy}'. Choose from {', '.join(STRATEGIES)}")
+        # One unit of gross exposure spread equally across the coins.
+        return np.sign(signal) / self.prices.shape[1]
+
+    def window_mean(self, field: str, window: int) -> np.ndarray:
+        """Trailing mean over ``window`` rows; NaN until a window has no missing values."""
+        key = (field, window)
+        if key not in self._means:
+            total, count = self._cumulative(field)
+            mean = np.full(self.prices.shape, np.nan)
+            if window <= len(self.prices):
+                with np.errstate(invalid="ignore"):
+                    full = (count[window:] - count[:-window]) == window
+                    mean[window - 1 :] = np.where(full, (total[window:] - total[:-window]) / window, np.nan)
+            if len(self._means) >= MAX_CACHED_WINDOWS:
+                self._means.pop(next(iter(self._means)))
+            self._means[key] = mean
+        return self._means[key]
+
+    def _cumulative(self, field: str) -> Tuple[np.ndarray, np.ndarray]:
+        # Prefix sums with a zero row, so any window sum is one subtraction; NaNs count as gaps.
+        if field not in self._sums:
+            values = self.log_prices * self.log_prices if field == "log_squares" else getattr(self, field)
+            valid = ~np.isnan(values)
+            zero = np.zeros((1, values.shape[1]))
+            total = np.vstack([zero, np.cumsum(np.where(valid, values, 0.0), axis=0)])
+            count = np.vstack([zero, np.cumsum(valid, axis=0, dtype=np.float64)])
+            self._sums[field] = (total, count)
+        return self._sums[field]
+
+
+_WORKER_DATA: _SweepData | None = None
+
+
+def _init_worker(data_dir: str) -> None:
+    global _WORKER_DATA
+    directory = Path(data_dir)
+    _WORKER_DATA = _SweepData(
+        np.load(directory / "prices.npy", mmap_mode="r"),
+        np.load(directory / "returns.npy", mmap_mode="r"),
+    )
+
+
+def _evaluate_batch(batch: Tuple[str, List[Dict[str, float]], float, float]) -> List[Dict]:
+    strategy, combos, cost_bps, periods = batch
+    return _WORKER_DATA.evaluate(strategy, combos, cost_bps, periods)
+
+
+def _zero_missing(values: np.ndarray) -> np.ndarray:
+    # Complete matrices, such as sweep returns reused across combinations, skip the copy.
+    return np.nan_to_num(values, nan=0.0) if np.isnan(values).any() else values
+
+
+def _parameter_value(name: str, kind: type, value: float) -> float:
+    if kind is int:
+        if float(value) != int(value) or int(value) < 1:
+            raise ValueError(f"Parameter '{name}' takes positive integers, got {value}")
+        return int(value)
+    value = float(value)
+    if not value > 0:
+        raise ValueError(f"Parameter '{name}' must be positive, got {value}")
+    return value
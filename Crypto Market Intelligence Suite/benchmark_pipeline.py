@@ -0,0 +1,274 @@
+"""
+Crypto Pipeline Benchmark
+
+Measures pipeline throughput without touching CoinGecko:
+- Generates synthetic market_chart payloads of configurable size (coins x points)
+- Serves them from a local HTTP stand-in for the CoinGecko endpoint
+- Times every stage from fetch_all to export_outputs through the stage profiler
+- Appends each run to a history file and compares it with a stored baseline so
+  refactors that slow a stage down are flagged
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+SUITE_DIR = Path(__file__).resolve().parent
+PIPELINE_PATH = SUITE_DIR / "Crypto Market Intelligence Pipeline.py"
+POINT_SPACING_MS = 5 * 60 * 1000
+START_MS = 1_700_000_000_000
+
+
+def load_pipeline_module():
+    # The pipeline script name contains spaces, so it is loaded by path rather than imported.
+    spec = importlib.util.spec_from_file_location("crypto_market_pipeline", PIPELINE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def synthetic_payload(coin_index: int, points: int, seed: int = 7) -> dict:
+    """Geometric random-walk prices with market caps and volumes in CoinGecko's layout."""
+    rng = np.random.default_rng(seed + coin_index)
+    timestamps = START_MS + np.arange(points, dtype=np.int64) * POINT_SPACING_MS
+    # Jitter timestamps like the real API so the coin tables do not align trivially.
+    timestamps += rng.integers(0, 4000, size=points)
+    prices = (10.0 + 1000.0 * rng.random()) * np.exp(np.cumsum(rng.normal(0.0, 0.004, size=points)))
+    market_caps = prices * rng.uniform(1e6, 1e9)
+    volumes = market_caps * rng.uniform(0.01, 0.1, size=points)
+
+    ts_list = timestamps.tolist()
+    return {
+        "prices": [list(pair) for pair in zip(ts_list, prices.tolist())],
+        "market_caps": [list(pair) for pair in zip(ts_list, market_caps.tolist())],
+        "total_volumes": [list(pair) for pair in zip(ts_list, volumes.tolist())],
+    }
+
+
+class MockMarketServer:
+    """Threaded local server answering /coins/<id>/market_chart[/range] with synthetic payloads."""
+
+    def __init__(self, coin_ids: List[str], points: int) -> None:
+        self.payloads = {coin_id: synthetic_payload(idx, points) for idx, coin_id in enumerate(coin_ids)}
+        self.encoded = {coin_id: json.dumps(payload).encode("utf-8") for coin_id, payload in self.payloads.items()}
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/v3/coins/{{coin_id}}/market_chart"
+
+    def __enter__(self) -> "MockMarketServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                url = urlparse(self.path)
+                parts = url.path.strip("/").split("/")
+                coin_id = parts[3] if len(parts) > 3 else ""
+                if coin_id not in server.payloads:
+                    self.send_error(404, f"Unknown coin '{coin_id}'")
+                    return
+
+                if parts[-1] == "range":
+                    query = parse_qs(url.query)
+                    start = int(query.get("from", ["0"])[0]) * 1000
+                    end = int(query.get("to", [str(2**40)])[0]) * 1000
+                    payload = {
+                        key: [row for row in rows if start < row[0] <= end]
+                        for key, rows in server.payloads[coin_id].items()
+                    }
+                    body = json.dumps(payload).encode("utf-8")
+                else:
+                    body = server.encoded[coin_id]
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        return Handler
+
+
+def run_benchmark(
+    coins: int,
+    points: int,
+    repeats: int = 3,
+    charts: List[str] | None = None,
+    export_formats: List[str] | None = None,
+    max_concurrency: int = 4,
+    chunk_rows: int | None = None,
+) -> dict:
+    pipeline_module = load_pipeline_module()
+    charts = list(pipeline_module.CHARTS if charts is None else charts)
+    export_formats = list(export_formats or ["csv"])
+    coin_ids = [f"synthetic-{idx:04d}" for idx in range(coins)]
+    stage_runs: Dict[str, List[float]] = {}
+    totals: List[float] = []
+    peak_rss: List[float] = []
+
+    with MockMarketServer(coin_ids, points) as server:
+        for _ in range(repeats):
+            with tempfile.TemporaryDirectory(prefix="crypto-bench-") as output_dir:
+                profiler = pipeline_module.StageProfiler()
+                pipeline = pipeline_module.CryptoMarketPipeline(
+                    days=30,
+                    output_dir=Path(output_dir),
+                    fetch=pipeline_module.FetchConfig(
+                        base_url=server.base_url,
+                        request_spacing_seconds=0.0,
+                        max_concurrency=max_concurrency,
+                        use_cache=False,
+                    ),
+                    storage=pipeline_module.StorageConfig(chunk_rows=chunk_rows),
+                    output=pipeline_module.OutputConfig(charts=charts, export_formats=export_formats),
+                    profiler=profiler,
+                )
+                try:
+                    pipeline.run(coin_ids)
+                finally:
+                    pipeline.close()
+
+            report = profiler.report()
+            for stage in report["stages"]:
+                stage_runs.setdefault(stage["name"], []).append(stage["wall_seconds"])
+            totals.append(report["total_wall_seconds"])
+            if report["peak_rss_mb"] is not None:
+                peak_rss.append(report["peak_rss_mb"])
+
+    total_median = statistics.median(totals)
+    return {
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "config": {
+            "coins": coins,
+            "points": points,
+            "repeats": repeats,
+            "charts": charts,
+            "export_formats": export_formats,
+            "chunk_rows": chunk_rows,
+        },
+        "stages": {name: statistics.median(values) for name, values in stage_runs.items()},
+        "total_wall_seconds": total_median,
+        "rows_per_second": coins * points / total_median if total_median > 0 else None,
+        "peak_rss_mb": max(peak_rss) if peak_rss else None,
+    }
+
+
+def config_key(result: dict) -> str:
+    # Runs are only comparable when they render and export the same things.
+    config = result["config"]
+    charts = "+".join(config["charts"]) or "no-charts"
+    key = f"{config['coins']}x{config['points']}:{charts}:{'+'.join(config['export_formats'])}"
+    if config.get("chunk_rows"):
+        key += f":chunks{config['chunk_rows']}"
+    return key
+
+
+def compare_to_baseline(result: dict, baseline: dict, tolerance: float, min_seconds: float) -> List[str]:
+    """Return a message for every stage that is slower than the baseline beyond the tolerance."""
+    regressions = []
+    for name, seconds in result["stages"].items():
+        reference = baseline["stages"].get(name)
+        if reference is None:
+            continue
+        if seconds > reference * (1.0 + tolerance) and seconds - reference > min_seconds:
+            regressions.append(f"{name}: {seconds:.3f}s vs baseline {reference:.3f}s (+{seconds / reference - 1:.0%})")
+    return regressions
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the crypto pipeline against a local mock API")
+    parser.add_argument("--coins", type=int, default=20, help="Number of synthetic coins")
+    parser.add_argument("--points", type=int, default=8640, help="Points per coin (8640 = 30 days of 5m candles)")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per benchmark; stage medians are reported")
+    parser.add_argument("--max-concurrency", type=int, default=4, help="Parallel fetches against the mock server")
+    parser.add_argument("--charts", nargs="*", default=None, help="Charts to render (default: all)")
+    parser.add_argument("--export-format", nargs="+", default=["csv"], help="Export formats to benchmark")
+    parser.add_argument("--chunk-rows", type=int, default=None, help="Benchmark the out-of-core chunked mode")
+    parser.add_argument(
+        "--results-dir",
+        type=Path,
+        default=SUITE_DIR / "benchmarks",
+        help="Directory holding history.jsonl and baseline.json",
+    )
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown per stage (0.2 = 20%%)")
+    parser.add_argument(
+        "--min-seconds",
+        type=float,
+        default=0.05,
+        help="Ignore slowdowns smaller than this many seconds",
+    )
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the new baseline")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    result = run_benchmark(
+        coins=args.coins,
+        points=args.points,
+        repeats=args.repeats,
+        charts=args.charts,
+        export_formats=args.export_format,
+        max_concurrency=args.max_concurrency,
+        chunk_rows=args.chunk_rows,
+    )
+
+    print(f"Benchmark {config_key(result)} (median of {args.repeats} runs)")
+    for name, seconds in result["stages"].items():
+        print(f"  {name:<26} {seconds:8.3f}s")
+    print(f"  {'total':<26} {result['total_wall_seconds']:8.3f}s  ({result['rows_per_second']:,.0f} rows/s)")
+
+    args.results_dir.mkdir(parents=True, exist_ok=True)
+    with (args.results_dir / "history.jsonl").open("a", encoding="utf-8") as handle:
+        handle.write(json.dumps(result) + "\n")
+
+    baseline_path = args.results_dir / "baseline.json"
+    baselines = json.loads(baseline_path.read_text(encoding="utf-8")) if baseline_path.exists() else {}
+    key = config_key(result)
+
+    if args.update_baseline or key not in baselines:
+        baselines[key] = result
+        baseline_path.write_text(json.dumps(baselines, indent=2), encoding="utf-8")
+        print(f"Baseline for {key} saved to {baseline_path}")
+        return
+
+    regressions = compare_to_baseline(result, baselines[key], args.tolerance, args.min_seconds)
+    if regressions:
+        print("Regressions against baseline:")
+        for message in regressions:
+            print(f"  {message}")
+        sys.exit(1)
+    print("No stage regressed against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+Chart Rendering
+
+Renders the crypto visual pack, optionally across a process pool:
+- Each chart is an independent job drawn with the non-interactive Agg backend
+- Input arrays are written once as .npy files and memory-mapped by every worker,
+  so large price matrices are never pickled into the pool
+- Callers choose which charts to render
+- Line charts are reduced to a min/max envelope per horizontal pixel, so drawing
+  cost scales with the output width rather than the number of input rows
+"""
+
+from __future__ import annotations
+
+import math
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+
+CHART_FILES = {
+    "price_trends": "01_price_trends.png",
+    "indexed_performance": "02_indexed_performance.png",
+    "return_boxplot": "03_return_boxplot.png",
+    "rolling_volatility": "04_rolling_volatility.png",
+    "correlation_heatmap": "05_correlation_heatmap.png",
+}
+CHARTS = tuple(CHART_FILES)
+# Legends and heatmap labels stop being readable beyond this many assets.
+MAX_LABELLED_COINS = 20
+ROLLING_VOL_WINDOW = 7
+DPI = 140
+
+
+@dataclass
+class ChartJob:
+    chart: str
+    data_dir: str
+    labels: List[str]
+    output_path: str
+    decimate: bool = True
+    quote: str = "usd"
+
+
+def render_charts(
+    arrays: Dict[str, np.ndarray],
+    labels: List[str],
+    visuals_dir: Path,
+    charts: Iterable[str] = CHARTS,
+    workers: int = 1,
+    decimate: bool = True,
+    quote: str = "usd",
+) -> List[Path]:
+    """Render the selected charts from ``timestamps``, ``prices``, ``returns`` and ``correlation`` arrays."""
+    chart_list = list(dict.fromkeys(charts))
+    unknown = [chart for chart in chart_list if chart not in CHART_FILES]
+    if unknown:
+        raise ValueError(f"Unknown chart(s): {', '.join(unknown)}. Choose from {', '.join(CHARTS)}")
+    if not chart_list:
+        return []
+
+    visuals_dir.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix=".render-", dir=visuals_dir) as data_dir:
+        for name, values in arrays.items():
+            np.save(Path(data_dir) / f"{name}.npy", np.ascontiguousarray(values), allow_pickle=False)
+
+        jobs = [
+            ChartJob(chart, data_dir, labels, str(visuals_dir / CHART_FILES[chart]), decimate, quote)
+            for chart in chart_list
+        ]
+        if workers <= 1 or len(jobs) == 1:
+            rendered = [render_chart(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+                rendered = list(executor.map(render_chart, jobs))
+
+    return [Path(path) for path in rendered]
+
+
+def render_chart(job: ChartJob) -> str:
+    data = _MappedArrays(Path(job.data_dir))
+    plt.style.use("ggplot")
+    fig = _CHART_FUNCTIONS[job.chart](data, job.labels, job.decimate, job.quote)
+    fig.tight_layout()
+    fig.savefig(job.output_path, dpi=DPI)
+    plt.close(fig)
+    return job.output_path
+
+
+class _MappedArrays:
+    def __init__(self, data_dir: Path) -> None:
+        self.data_dir = data_dir
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return np.load(self.data_dir / f"{name}.npy", mmap_mode="r")
+
+
+def minmax_decimate(x: np.ndarray, y: np.ndarray, buckets: int) -> tuple[np.ndarray, np.ndarray]:
+    """Reduce a (rows, series) line set to the min and max of each of ``buckets`` x-ranges.
+
+    With one bucket per output pixel the drawn envelope matches the full-resolution
+    plot. NaNs are ignored inside a bucket; an all-NaN bucket stays NaN.
+    """
+    y = np.asarray(y)
+    squeeze = y.ndim == 1
+    if squeeze:
+        y = y[:, None]
+    if buckets <= 0 or len(x) <= 2 * buckets:
+        return np.asarray(x), (y[:, 0] if squeeze else np.asarray(y))
+
+    starts = np.linspace(0, len(x), buckets, endpoint=False).astype(np.int64)
+    ends = np.append(starts[1:], len(x))
+    with np.errstate(invalid="ignore"):
+        lows = np.fmin.reduceat(y, starts, axis=0)
+        highs = np.fmax.reduceat(y, starts, axis=0)
+
+    x_out = np.empty(2 * buckets, dtype=np.asarray(x).dtype)
+    x_out[0::2] = x[starts]
+    x_out[1::2] = x[(starts + ends - 1) // 2]
+    y_out = np.empty((2 * buckets, y.shape[1]), dtype=np.float64)
+    y_out[0::2] = lows
+    y_out[1::2] = highs
+    return x_out, (y_out[:, 0] if squeeze else y_out)
+
+
+def _line_data(fig: plt.Figure, x: np.ndarray, y: np.ndarray, decimate: bool) -> tuple[np.ndarray, np.ndarray]:
+    if not decimate:
+        return x, y
+    return minmax_decimate(x, y, int(fig.get_figwidth() * DPI))
+
+
+def _add_legend(ax: plt.Axes, lines: list, labels: List[str]) -> None:
+    if len(labels) <= MAX_LABELLED_COINS:
+        ax.legend(lines, labels)
+
+
+def _price_trends(data: _MappedArrays, labels: List[str], decimate: bool, quote: str) -> plt.Figure:
+    fig, ax = plt.subplots(figsize=(12, 6))
+    lines = ax.plot(*_line_data(fig, data["timestamps"], data["prices"], decimate))
+    ax.set_title("Crypto Prices Over Time")
+    ax.set_xlabel("Time")
+    ax.set_ylabel(f"Price ({quote.upper()})")
+    _add_legend(ax, lines, labels)
+    return fig
+
+
+def _indexed_performance(data: _MappedArrays, labels: List[str], decimate: bool, quote: str) -> plt.Figure:
+    prices = data["prices"]
+    fig, ax = plt.subplots(figsize=(12, 6))
+    lines = ax.plot(*_line_data(fig, data["timestamps"], prices / prices[0] * 100, decimate))
+    ax.set_title("Indexed Relative Performance")
+    ax.set_xlabel("Time")
+    ax.set_ylabel("Indexed Value")
+    _add_legend(ax, lines, [f"{label} (Base=100)" for label in labels])
+    return fig
+
+
+def _return_boxplot(data: _MappedArrays, labels: List[str], decimate: bool, quote: str) -> plt.Figure:
+    fig, ax = plt.subplots(figsize=(10, 6))
+    returns = np.asarray(data["returns"])
+    # Returns across unfilled gaps are missing; each box uses the coin's observed returns.
+    columns = [column[~np.isnan(column)] for column in returns.T]
+    ax.boxplot(columns, tick_labels=labels, showfliers=False)
+    if len(labels) > MAX_LABELLED_COINS:
+        ax.set_xticks([])
+    ax.set_title("Daily Percentage Return Distribution")
+    ax.set_ylabel("Pct Return")
+    return fig
+
+
+def _rolling_volatility(data: _MappedArrays, labels: List[str], decimate: bool, quote: str) -> plt.Figure:
+    rolling_vol = pd.DataFrame(data["returns"]).rolling(window=ROLLING_VOL_WINDOW).std() * math.sqrt(365)
+    fig, ax = plt.subplots(figsize=(12, 6))
+    lines = ax.plot(*_line_data(fig, data["timestamps"], rolling_vol.to_numpy(), decimate))
+    ax.set_title(f"{ROLLING_VOL_WINDOW}-Day Rolling Annualized Volatility")
+    ax.set_xlabel("Time")
+    ax.set_ylabel("Volatility")
+    _add_legend(ax, lines, labels)
+    return fig
+
+
+def _correlation_heatmap(data: _MappedArrays, labels: List[str], decimate: bool, quote: str) -> plt.Figure:
+    matrix = data["correlation"]
+    fig, ax = plt.subplots(figsize=(8, 6))
+    im = ax.imshow(matrix, cmap="coolwarm", vmin=-1, vmax=1)
+    ax.set_title("Price Correlation Matrix")
+    if len(labels) <= MAX_LABELLED_COINS:
+        ax.set_xticks(range(len(labels)))
+        ax.set_xticklabels(labels)
+        ax.set_yticks(range(len(labels)))
+        ax.set_yticklabels(labels)
+        for i in range(matrix.shape[0]):
+            for j in range(matrix.shape[1]):
+                ax.text(j, i, f"{matrix[i, j]:.2f}", ha="center", va="center", color="black")
+    fig.colorbar(im, ax=ax, fraction=0.046, pad=0.04)
+    return fig
+
+
+_CHART_FUNCTIONS = {
+    "price_trends": _price_trends,
+    "indexed_performance": _indexed_performance,
+    "return_boxplot": _return_boxplot,
+    "rolling_volatility": _rolling_volatility,
+    "correlation_heatmap": _correlation_heatmap,
+}
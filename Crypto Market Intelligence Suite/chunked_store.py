@@ -0,0 +1,194 @@
+"""
+Chunked Table Store
+
+Out-of-core building blocks for multi-year, high-frequency histories:
+- ChunkedTable: a time-ordered directory of Parquet parts that is appended to chunk by
+  chunk and read back one part, or a few columns, at a time
+- GapFiller: gap-aware filling that carries state across chunk boundaries and matches
+  the in-memory fill of the whole table
+- MomentAccumulator: mergeable per-column count/mean/M2 (Chan et al.), so summary
+  statistics never need every row in memory
+"""
+
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+import numpy as np
+import pandas as pd
+
+from gap_filling import fill_gaps
+
+
+class ChunkedTable:
+    def __init__(self, directory: Path, compression: str = "snappy") -> None:
+        self.directory = directory
+        self.compression = compression
+        self._parts: List[Path] = []
+        self._rows = 0
+        self._last_rows: pd.DataFrame | None = None
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def reset(self) -> "ChunkedTable":
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._parts = []
+        self._rows = 0
+        self._last_rows = None
+        return self
+
+    def append(self, frame: pd.DataFrame) -> None:
+        if frame.empty:
+            return
+        path = self.directory / f"part-{len(self._parts):05d}.parquet"
+        frame.to_parquet(path, index=False, compression=self.compression)
+        self._parts.append(path)
+        self._rows += len(frame)
+        self._last_rows = frame.iloc[-1:].reset_index(drop=True)
+
+    def chunks(self, columns: List[str] | None = None) -> Iterator[pd.DataFrame]:
+        """Yield the stored parts in time order, optionally projected to ``columns``."""
+        for path in self._parts:
+            yield pd.read_parquet(path, columns=columns)
+
+    def read_columns(self, columns: List[str]) -> pd.DataFrame:
+        # Columnar parts make a single-column read cost rows x 8 bytes, not the whole table.
+        parts = list(self.chunks(columns))
+        if not parts:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(parts, ignore_index=True)
+
+    def tail(self, rows: int) -> pd.DataFrame:
+        if rows == 1 and self._last_rows is not None:
+            return self._last_rows.copy()
+        parts: List[pd.DataFrame] = []
+        needed = rows
+        for path in reversed(self._parts):
+            if needed <= 0:
+                break
+            part = pd.read_parquet(path)
+            parts.append(part.iloc[-needed:])
+            needed -= len(part)
+        if not parts:
+            raise RuntimeError("Chunked table is empty")
+        return pd.concat(parts[::-1], ignore_index=True)
+
+
+class GapFiller:
+    """Fill NaNs chunk by chunk exactly as the in-memory table fill would.
+
+    Rows are only released once every column has a known value at or after them, so a
+    gap that straddles a chunk boundary is interpolated between the same two points as
+    on the full table. ``last_valid`` gives each column's final non-NaN timestamp; past
+    it the column is flat-filled and no longer holds rows back. Columns not listed in
+    ``columns`` (such as gap masks) pass through unchanged.
+    """
+
+    def __init__(
+        self,
+        columns: List[str],
+        last_valid: Dict[str, pd.Timestamp | None],
+        max_gap: int | None = None,
+    ) -> None:
+        self.columns = list(columns)
+        self.last_valid = [last_valid.get(column) for column in self.columns]
+        self.max_gap = max_gap
+        self._pending: pd.DataFrame | None = None
+        self._offset = 0
+        self._anchor_pos = np.full(len(self.columns), -1, dtype=np.int64)
+        self._anchor_val = np.full(len(self.columns), np.nan)
+        self._anchor_ts = np.zeros(len(self.columns), dtype=np.int64)
+
+    def push(self, frame: pd.DataFrame) -> pd.DataFrame:
+        segment = frame if self._pending is None else pd.concat([self._pending, frame], ignore_index=True)
+        return self._release(segment.reset_index(drop=True), final=False)
+
+    def flush(self) -> pd.DataFrame:
+        if self._pending is None:
+            return pd.DataFrame(columns=["timestamp", *self.columns])
+        return self._release(self._pending, final=True)
+
+    def _release(self, segment: pd.DataFrame, final: bool) -> pd.DataFrame:
+        values = segment[self.columns].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(values)
+        ready = len(segment)
+        if not final and ready:
+            segment_end = segment["timestamp"].iloc[-1]
+            for idx, last_valid in enumerate(self.last_valid):
+                if last_valid is None or last_valid <= segment_end:
+                    continue
+                # More values for this column are still to come; hold rows after its last one here.
+                positions = np.flatnonzero(valid[:, idx])
+                ready = min(ready, int(positions[-1]) + 1 if len(positions) else 0)
+
+        positions = np.arange(self._offset, self._offset + len(segment), dtype=np.float64)
+        timestamps = segment["timestamp"].to_numpy(dtype="datetime64[ns]").astype(np.int64)
+        anchor = (self._anchor_pos, self._anchor_val, self._anchor_ts)
+        # Filling the whole segment sees the next observation even past ``ready``.
+        block = fill_gaps(values, positions, timestamps, self.max_gap, anchor)[:ready]
+
+        filled = {"timestamp": segment["timestamp"].iloc[:ready].reset_index(drop=True)}
+        for idx, column in enumerate(self.columns):
+            filled[column] = block[:, idx].astype(segment[column].dtype, copy=False)
+            released = np.flatnonzero(valid[:ready, idx])
+            if len(released):
+                self._anchor_pos[idx] = self._offset + released[-1]
+                self._anchor_val[idx] = values[released[-1], idx]
+                self._anchor_ts[idx] = timestamps[released[-1]]
+        for column in segment.columns:
+            if column not in filled:
+                filled[column] = segment[column].iloc[:ready].reset_index(drop=True)
+
+        self._offset += ready
+        self._pending = None if ready == len(segment) else segment.iloc[ready:].reset_index(drop=True)
+        return pd.DataFrame(filled)
+
+
+class MomentAccumulator:
+    """Per-column NaN-skipping count, mean and M2 that merge across chunks."""
+
+    def __init__(self, width: int) -> None:
+        self.count = np.zeros(width)
+        self.mean = np.zeros(width)
+        self.m2 = np.zeros(width)
+
+    def update(self, block: np.ndarray) -> None:
+        block = np.asarray(block, dtype=np.float64)
+        count = np.sum(~np.isnan(block), axis=0).astype(np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(count > 0, np.nansum(block, axis=0) / count, 0.0)
+        m2 = np.nansum((block - mean) ** 2, axis=0)
+
+        total = self.count + count
+        with np.errstate(invalid="ignore", divide="ignore"):
+            delta = mean - self.mean
+            self.mean = np.where(total > 0, self.mean + delta * count / total, 0.0)
+            self.m2 = np.where(total > 0, self.m2 + m2 + delta**2 * self.count * count / total, 0.0)
+        self.count = total
+
+    def remove(self, block: np.ndarray) -> None:
+        """Take back rows merged earlier, e.g. history that left a fixed window."""
+        block = np.asarray(block, dtype=np.float64)
+        count = np.sum(~np.isnan(block), axis=0).astype(np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(count > 0, np.nansum(block, axis=0) / count, 0.0)
+        m2 = np.nansum((block - mean) ** 2, axis=0)
+
+        # The merge in update() run backwards: solve for the moments of the remaining rows.
+        rest = self.count - count
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rest_mean = np.where(rest > 0, (self.mean * self.count - mean * count) / rest, 0.0)
+            delta = mean - rest_mean
+            rest_m2 = self.m2 - m2 - delta**2 * rest * count / self.count
+            self.m2 = np.where(rest > 0, np.maximum(rest_m2, 0.0), 0.0)
+        self.mean = rest_mean
+        self.count = rest
+
+    def std(self) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.count > 1, np.sqrt(self.m2 / (self.count - 1)), np.nan)
+
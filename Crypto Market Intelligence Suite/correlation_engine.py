@@ -0,0 +1,226 @@
+"""
+Correlation Engine
+
+Covariance and correlation matrices for large asset universes:
+- Built from a centered observation matrix with one BLAS ``X.T @ X`` per block instead
+  of pandas' pairwise loop
+- Sample, exponentially weighted (half-life in rows) and Ledoit-Wolf shrinkage estimates
+- Blocks are merged into running moments, so new rows update the matrix without a
+  pass over the history, and the state can be saved between runs
+- The oldest rows can be taken back out, so a fixed window slides without a rebuild, and
+  so can the newest ones, so a revised last row is replaced without one
+- Condensed upper-triangle export (one row per asset pair) for wide universes
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterable, List
+
+import numpy as np
+import pandas as pd
+
+CORRELATION_METHODS = ("sample", "ewma", "ledoit-wolf")
+
+
+class CorrelationEngine:
+    def __init__(self, assets: Iterable[str], method: str = "sample", halflife: float = 30.0) -> None:
+        self.assets: List[str] = list(assets)
+        if not self.assets:
+            raise ValueError("assets must not be empty")
+        if method not in CORRELATION_METHODS:
+            raise ValueError(f"Unsupported correlation method '{method}'. Choose from {', '.join(CORRELATION_METHODS)}")
+        if method == "ewma" and halflife <= 0:
+            raise ValueError("halflife must be positive")
+
+        width = len(self.assets)
+        self.method = method
+        self.halflife = float(halflife)
+        self.decay = 0.5 ** (1.0 / self.halflife) if method == "ewma" else 1.0
+        self.count = 0
+        # Rows offered to update(), including incomplete ones that were skipped.
+        self.rows = 0
+        # Total observation weight; equals count unless rows are exponentially weighted.
+        self.weight = 0.0
+        self.mean = np.zeros(width)
+        self.comoment = np.zeros((width, width))
+
+        # Fourth-moment sums for the Ledoit-Wolf shrinkage intensity, kept relative to a
+        # fixed shift (the first block's mean) so they merge without cancellation.
+        self._shift = np.zeros(width)
+        self._sum_sq = 0.0
+        self._sum_sq2 = 0.0
+        self._sum_sq_x = np.zeros(width)
+
+    def update(self, block: np.ndarray) -> None:
+        """Merge a (rows, assets) block of observations, oldest row first.
+
+        Rows with a missing value (an unfilled gap) are skipped, as in complete-case estimation.
+        """
+        block = np.asarray(block, dtype=np.float64)
+        if block.ndim != 2 or block.shape[1] != len(self.assets):
+            raise ValueError(f"Expected a (rows, {len(self.assets)}) block, got {block.shape}")
+        self.rows += len(block)
+        block = block[~np.isnan(block).any(axis=1)]
+        rows = len(block)
+        if rows == 0:
+            return
+
+        if self.method == "ewma":
+            weights = self.decay ** np.arange(rows - 1, -1, -1, dtype=np.float64)
+            carried = self.decay**rows
+        else:
+            weights = None
+            carried = 1.0
+        block_weight = float(weights.sum()) if weights is not None else float(rows)
+        block_mean = (weights @ block) / block_weight if weights is not None else block.mean(axis=0)
+        centered = block - block_mean
+        weighted = centered * weights[:, None] if weights is not None else centered
+        block_comoment = weighted.T @ centered
+
+        if self.method == "ledoit-wolf":
+            if self.count == 0:
+                self._shift = block_mean.copy()
+            shifted = block - self._shift
+            squared_norms = np.einsum("ij,ij->i", shifted, shifted)
+            self._sum_sq += float(squared_norms.sum())
+            self._sum_sq2 += float(squared_norms @ squared_norms)
+            self._sum_sq_x += squared_norms @ shifted
+
+        old_weight = self.weight * carried
+        total = old_weight + block_weight
+        delta = block_mean - self.mean
+        self.comoment = self.comoment * carried + block_comoment + np.outer(delta, delta) * (old_weight * block_weight / total)
+        self.mean = self.mean + delta * (block_weight / total)
+        self.weight = total
+        self.count += rows
+
+    def remove(self, block: np.ndarray, newest: bool = False) -> None:
+        """Take rows back out: ``block`` is the first rows merged, or the last ones with ``newest``.
+
+        Rows are given oldest first. Under EWMA their current weights follow from the number of
+        complete rows merged after them.
+        """
+        block = np.asarray(block, dtype=np.float64)
+        if block.ndim != 2 or block.shape[1] != len(self.assets):
+            raise ValueError(f"Expected a (rows, {len(self.assets)}) block, got {block.shape}")
+        self.rows -= len(block)
+        block = block[~np.isnan(block).any(axis=1)]
+        rows = len(block)
+        if rows == 0:
+            return
+        if rows >= self.count:
+            offered = self.rows
+            self.__init__(self.assets, self.method, self.halflife)
+            self.rows = offered
+            return
+
+        if self.method == "ewma":
+            after = np.arange(rows - 1, -1, -1) if newest else np.arange(self.count - 1, self.count - rows - 1, -1)
+            weights = self.decay ** after.astype(np.float64)
+        else:
+            weights = None
+        block_weight = float(weights.sum()) if weights is not None else float(rows)
+        block_mean = (weights @ block) / block_weight if weights is not None else block.mean(axis=0)
+        centered = block - block_mean
+        weighted = centered * weights[:, None] if weights is not None else centered
+        block_comoment = weighted.T @ centered
+
+        if self.method == "ledoit-wolf":
+            shifted = block - self._shift
+            squared_norms = np.einsum("ij,ij->i", shifted, shifted)
+            self._sum_sq -= float(squared_norms.sum())
+            self._sum_sq2 -= float(squared_norms @ squared_norms)
+            self._sum_sq_x -= squared_norms @ shifted
+
+        # The merge in update() run backwards: solve for the moments of the remaining rows.
+        rest = self.weight - block_weight
+        rest_mean = (self.mean * self.weight - block_mean * block_weight) / rest
+        delta = block_mean - rest_mean
+        self.comoment = self.comoment - block_comoment - np.outer(delta, delta) * (rest * block_weight / self.weight)
+        self.mean = rest_mean
+        self.weight = rest
+        self.count -= rows
+        if newest and weights is not None:
+            # The remaining rows are now the newest, so their decay is undone.
+            carried = self.decay**rows
+            self.comoment = self.comoment / carried
+            self.weight = self.weight / carried
+
+    def covariance(self) -> np.ndarray:
+        width = len(self.assets)
+        if self.count < 2:
+            return np.full((width, width), np.nan)
+        if self.method == "sample":
+            return self.comoment / (self.count - 1)
+        if self.method == "ewma":
+            return self.comoment / self.weight
+        return self._ledoit_wolf()
+
+    def correlation(self) -> pd.DataFrame:
+        covariance = self.covariance()
+        scale = np.sqrt(np.maximum(np.diag(covariance), 0.0))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            matrix = np.clip(covariance / np.outer(scale, scale), -1.0, 1.0)
+        matrix[np.diag_indices_from(matrix)] = np.where(scale > 0, 1.0, np.nan)
+        return pd.DataFrame(matrix, index=self.assets, columns=self.assets)
+
+    def condensed(self, matrix: pd.DataFrame | None = None) -> pd.DataFrame:
+        """Upper triangle without the diagonal, one row per asset pair (``N * (N - 1) / 2`` rows)."""
+        values = (self.correlation() if matrix is None else matrix).to_numpy()
+        rows, cols = np.triu_indices(len(self.assets), k=1)
+        assets = np.asarray(self.assets, dtype=object)
+        return pd.DataFrame({"asset_a": assets[rows], "asset_b": assets[cols], "correlation": values[rows, cols]})
+
+    def save(self, path: Path) -> None:
+        np.savez(
+            path,
+            assets=np.asarray(self.assets, dtype=str),
+            method=np.asarray(self.method),
+            halflife=self.halflife,
+            count=self.count,
+            rows=self.rows,
+            weight=self.weight,
+            mean=self.mean,
+            comoment=self.comoment,
+            shift=self._shift,
+            sums=np.array([self._sum_sq, self._sum_sq2]),
+            sum_sq_x=self._sum_sq_x,
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "CorrelationEngine":
+        with np.load(path, allow_pickle=False) as data:
+            engine = cls(data["assets"].tolist(), str(data["method"]), float(data["halflife"]))
+            engine.count = int(data["count"])
+            engine.rows = int(data["rows"]) if "rows" in data else engine.count
+            engine.weight = float(data["weight"])
+            engine.mean = data["mean"].copy()
+            engine.comoment = data["comoment"].copy()
+            engine._shift = data["shift"].copy()
+            engine._sum_sq, engine._sum_sq2 = (float(value) for value in data["sums"])
+            engine._sum_sq_x = data["sum_sq_x"].copy()
+        return engine
+
+    def _ledoit_wolf(self) -> np.ndarray:
+        # Ledoit & Wolf (2004): shrink the biased sample covariance towards mu * I.
+        n, width = self.count, len(self.assets)
+        sample = self.comoment / n
+        mu = np.trace(sample) / width
+        frobenius = float(np.sum(sample**2))
+        delta = (frobenius - 2.0 * mu * np.trace(sample) + width * mu**2) / width
+
+        # sum_i |x_i - mean|^4 expanded around the stored shift.
+        offset = self.mean - self._shift
+        offset_sq = float(offset @ offset)
+        raw_second = self.comoment + n * np.outer(offset, offset)
+        fourth = (
+            self._sum_sq2
+            + 4.0 * float(offset @ raw_second @ offset)
+            - 4.0 * float(offset @ self._sum_sq_x)
+            + 2.0 * offset_sq * self._sum_sq
+            - 3.0 * n * offset_sq**2
+        )
+        beta = min((fourth - n * frobenius) / (width * n**2), delta)
+        shrinkage = beta / delta if delta > 0 else 0.0
+        return (1.0 - shrinkage) * sample + shrinkage * mu * np.eye(width)
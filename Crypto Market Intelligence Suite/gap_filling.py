@@ -0,0 +1,89 @@
+"""
+Gap Filling
+
+Single-pass, gap-aware filling of an aligned market table:
+- Interior gaps are interpolated linearly by row position, leading and trailing gaps
+  take the nearest observed value, which matches interpolate(limit_direction="both")
+  followed by ffill/bfill
+- With a maximum gap, any gap whose surrounding observations are further apart in
+  time is left missing instead of being invented across an outage
+- The previous/next observation of every cell comes from accumulated index arrays, so
+  the whole block is filled without per-column Python loops
+"""
+
+from __future__ import annotations
+
+from typing import Tuple
+
+import numpy as np
+
+# Per-column (position, value, timestamp) of the last observation before the block.
+Anchor = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def fill_gaps(
+    values: np.ndarray,
+    positions: np.ndarray,
+    timestamps: np.ndarray,
+    max_gap: int | None = None,
+    anchor: Anchor | None = None,
+) -> np.ndarray:
+    """Return a filled copy of a (rows, columns) block.
+
+    ``positions`` are the rows' global row numbers (interpolation weights), ``timestamps``
+    their int64 nanosecond times and ``max_gap`` the longest fillable gap in nanoseconds.
+    ``anchor`` supplies observations that precede the block, for chunked callers; columns
+    without one use a negative position.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rows, width = values.shape
+    filled = values.copy()
+    if rows == 0:
+        return filled
+
+    positions = np.asarray(positions, dtype=np.float64)
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    valid = ~np.isnan(values)
+    row_index = np.arange(rows)[:, None]
+    columns = np.arange(width)[None, :]
+
+    prev_idx = np.maximum.accumulate(np.where(valid, row_index, -1), axis=0)
+    next_idx = np.minimum.accumulate(np.where(valid, row_index, rows)[::-1], axis=0)[::-1]
+    has_prev = prev_idx >= 0
+    has_next = next_idx < rows
+
+    prev_clipped = np.maximum(prev_idx, 0)
+    next_clipped = np.minimum(next_idx, rows - 1)
+    prev_val = values[prev_clipped, columns]
+    prev_pos = positions[prev_clipped]
+    prev_ts = timestamps[prev_clipped]
+    next_val = values[next_clipped, columns]
+    next_pos = positions[next_clipped]
+    next_ts = timestamps[next_clipped]
+
+    if anchor is not None:
+        anchor_pos, anchor_val, anchor_ts = anchor
+        use_anchor = ~has_prev & (np.asarray(anchor_pos)[None, :] >= 0)
+        prev_val = np.where(use_anchor, np.asarray(anchor_val, dtype=np.float64)[None, :], prev_val)
+        prev_pos = np.where(use_anchor, np.asarray(anchor_pos, dtype=np.float64)[None, :], prev_pos)
+        prev_ts = np.where(use_anchor, np.asarray(anchor_ts, dtype=np.int64)[None, :], prev_ts)
+        has_prev = has_prev | use_anchor
+
+    missing = ~valid
+    interior = missing & has_prev & has_next
+    leading = missing & ~has_prev & has_next
+    trailing = missing & has_prev & ~has_next
+    if max_gap is not None:
+        row_ts = timestamps[:, None]
+        interior &= next_ts - prev_ts <= max_gap
+        leading &= next_ts - row_ts <= max_gap
+        trailing &= row_ts - prev_ts <= max_gap
+
+    # Same arithmetic as np.interp, so unlimited filling is bit-identical to pandas.
+    with np.errstate(invalid="ignore", divide="ignore"):
+        slope = (next_val - prev_val) / (next_pos - prev_pos)
+        interpolated = slope * (positions[:, None] - prev_pos) + prev_val
+    filled[interior] = interpolated[interior]
+    filled[leading] = next_val[leading]
+    filled[trailing] = prev_val[trailing]
+    return filled
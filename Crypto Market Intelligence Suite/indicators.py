@@ -0,0 +1,227 @@
+"""
+Technical Indicators
+
+Vectorized indicator kernels over the (rows, coins) price and volume matrices:
+- SMA, Bollinger bands and VWAP as fixed-order sums over the window offsets, so each value
+  depends only on its own window and a tail update reproduces the full computation exactly
+- EMA, RSI (Wilder smoothing), MACD and ATR through pandas' recursive exponential filter,
+  seeded with the previous output row instead of a Python loop per tick
+- IndicatorEngine keeps the last window of inputs and every filter's last output, so
+  appended rows (incremental runs, chunks) cost O(new rows) and the state can be saved
+- CoinGecko market charts only carry closes, so ATR uses the close-to-close true range
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+INDICATORS = ("sma", "ema", "rsi", "macd", "bollinger", "atr", "vwap")
+
+# Output columns per indicator, named "{coin}_{column}" in the indicator table.
+INDICATOR_COLUMNS = {
+    "sma": ("sma",),
+    "ema": ("ema",),
+    "rsi": ("rsi",),
+    "macd": ("macd", "macd_signal", "macd_hist"),
+    "bollinger": ("bb_upper", "bb_lower"),
+    "atr": ("atr",),
+    "vwap": ("vwap",),
+}
+
+
+class IndicatorEngine:
+    def __init__(
+        self,
+        coins: Iterable[str],
+        indicators: Iterable[str] = INDICATORS,
+        window: int = 20,
+        rsi_period: int = 14,
+        macd_spans: Tuple[int, int, int] = (12, 26, 9),
+        bollinger_width: float = 2.0,
+        atr_period: int = 14,
+    ) -> None:
+        self.coins: List[str] = list(coins)
+        self.indicators: List[str] = list(dict.fromkeys(indicators))
+        unknown = [name for name in self.indicators if name not in INDICATORS]
+        if unknown:
+            raise ValueError(f"Unsupported indicator(s) {', '.join(unknown)}. Choose from {', '.join(INDICATORS)}")
+        if min(window, rsi_period, atr_period, *macd_spans) < 1:
+            raise ValueError("Indicator windows and periods must be positive")
+
+        self.window = int(window)
+        self.rsi_period = int(rsi_period)
+        self.macd_spans = tuple(int(span) for span in macd_spans)
+        self.bollinger_width = float(bollinger_width)
+        self.atr_period = int(atr_period)
+        self.rows = 0
+        width = len(self.coins)
+        # The last window - 1 input rows, so the next block's first windows are complete.
+        self._prices = np.empty((0, width))
+        self._volumes = np.empty((0, width))
+        self._last_close = np.full(width, np.nan)
+        # Last output of every recursive filter, keyed by filter name.
+        self._filters: Dict[str, np.ndarray] = {}
+
+    @property
+    def columns(self) -> List[str]:
+        return [column for name in self.indicators for column in INDICATOR_COLUMNS[name]]
+
+    def config(self) -> Tuple:
+        return (
+            self.coins,
+            self.indicators,
+            self.window,
+            self.rsi_period,
+            self.macd_spans,
+            self.bollinger_width,
+            self.atr_period,
+        )
+
+    def update(self, prices: np.ndarray, volumes: np.ndarray | None = None) -> Dict[str, np.ndarray]:
+        """Indicators for appended (rows, coins) blocks, oldest row first, as column -> (rows, coins)."""
+        prices = np.asarray(prices, dtype=np.float64)
+        volumes = np.full_like(prices, np.nan) if volumes is None else np.asarray(volumes, dtype=np.float64)
+        if prices.ndim != 2 or prices.shape[1] != len(self.coins) or volumes.shape != prices.shape:
+            raise ValueError(f"Expected (rows, {len(self.coins)}) price and volume blocks, got {prices.shape}")
+
+        rows = len(prices)
+        if not rows:
+            return {column: np.empty((0, len(self.coins))) for column in self.columns}
+        history_prices = np.vstack([self._prices, prices])
+        history_volumes = np.vstack([self._volumes, volumes])
+        previous = np.vstack([self._last_close[None, :], prices[:-1]])
+        # Price change and close-to-close true range against the previous close.
+        change = prices - previous
+
+        out: Dict[str, np.ndarray] = {}
+        for name in self.indicators:
+            if name == "sma":
+                out["sma"] = self._windowed(history_prices, rows, self._window_mean)
+            elif name == "ema":
+                out["ema"] = self._ema("ema", prices, 2.0 / (self.window + 1))
+            elif name == "rsi":
+                alpha = 1.0 / self.rsi_period
+                # np.maximum keeps NaN changes (first row, gaps) out of the filters.
+                gain = self._ema("rsi_gain", np.maximum(change, 0.0), alpha)
+                loss = self._ema("rsi_loss", np.maximum(-change, 0.0), alpha)
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    flat = np.where(gain == 0, 50.0, 100.0)
+                    out["rsi"] = np.where(loss == 0, flat, 100.0 - 100.0 / (1.0 + gain / loss))
+            elif name == "macd":
+                fast, slow, signal = self.macd_spans
+                fast_ema = self._ema("macd_fast", prices, 2.0 / (fast + 1))
+                macd = fast_ema - self._ema("macd_slow", prices, 2.0 / (slow + 1))
+                signal_line = self._ema("macd_signal", macd, 2.0 / (signal + 1))
+                out.update(macd=macd, macd_signal=signal_line, macd_hist=macd - signal_line)
+            elif name == "bollinger":
+                mean = out["sma"] if "sma" in out else self._windowed(history_prices, rows, self._window_mean)
+                std = self._windowed(history_prices, rows, self._window_std)
+                out.update(bb_upper=mean + self.bollinger_width * std, bb_lower=mean - self.bollinger_width * std)
+            elif name == "atr":
+                out["atr"] = self._ema("atr", np.abs(change), 1.0 / self.atr_period)
+            elif name == "vwap":
+                notional = self._windowed(history_prices * history_volumes, rows, self._window_sum)
+                volume = self._windowed(history_volumes, rows, self._window_sum)
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    out["vwap"] = notional / volume
+
+        keep = self.window - 1
+        # Blocks shorter than the window keep their whole history, not a wrapped negative slice.
+        start = max(len(history_prices) - keep, 0)
+        self._prices = history_prices[start:] if keep else history_prices[:0]
+        self._volumes = history_volumes[start:] if keep else history_volumes[:0]
+        if rows:
+            self._last_close = prices[-1]
+        self.rows += rows
+        return {column: out[column] for column in self.columns}
+
+    def frame(self, timestamps: pd.Series, block: Dict[str, np.ndarray]) -> pd.DataFrame:
+        """Wide ``{coin}_{column}`` table for one update's output."""
+        data = {"timestamp": timestamps.reset_index(drop=True)}
+        for idx, coin in enumerate(self.coins):
+            for column in self.columns:
+                data[f"{coin}_{column}"] = block[column][:, idx]
+        return pd.DataFrame(data)
+
+    def save(self, path: Path) -> None:
+        np.savez(
+            path,
+            coins=np.asarray(self.coins, dtype=str),
+            indicators=np.asarray(self.indicators, dtype=str),
+            params=np.array([self.window, self.rsi_period, *self.macd_spans, self.atr_period]),
+            bollinger_width=self.bollinger_width,
+            rows=self.rows,
+            prices=self._prices,
+            volumes=self._volumes,
+            last_close=self._last_close,
+            filter_names=np.asarray(list(self._filters), dtype=str),
+            filters=np.array(list(self._filters.values())).reshape(len(self._filters), len(self.coins)),
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "IndicatorEngine":
+        with np.load(path, allow_pickle=False) as data:
+            window, rsi_period, fast, slow, signal, atr_period = (int(value) for value in data["params"])
+            engine = cls(
+                data["coins"].tolist(),
+                data["indicators"].tolist(),
+                window,
+                rsi_period,
+                (fast, slow, signal),
+                float(data["bollinger_width"]),
+                atr_period,
+            )
+            engine.rows = int(data["rows"])
+            engine._prices = data["prices"].copy()
+            engine._volumes = data["volumes"].copy()
+            engine._last_close = data["last_close"].copy()
+            engine._filters = {name: row.copy() for name, row in zip(data["filter_names"].tolist(), data["filters"])}
+        return engine
+
+    def _ema(self, name: str, block: np.ndarray, alpha: float) -> np.ndarray:
+        # y_t = (1 - alpha) * y_{t-1} + alpha * x_t, seeded with the previous block's last output.
+        seed = self._filters.get(name)
+        frame = pd.DataFrame(block if seed is None else np.vstack([seed[None, :], block]))
+        result = frame.ewm(alpha=alpha, adjust=False, ignore_na=True).mean().to_numpy()
+        if seed is not None:
+            result = result[1:]
+        if len(result):
+            last = result[-1]
+            self._filters[name] = last if seed is None else np.where(np.isnan(last), seed, last)
+        return result
+
+    def _windowed(self, history: np.ndarray, rows: int, reduce) -> np.ndarray:
+        """Reduce the windows ending on the last ``rows`` rows; rows without a full window are NaN."""
+        result = np.full((rows, history.shape[1]), np.nan)
+        count = min(rows, max(len(history) - self.window + 1, 0))
+        if count:
+            # Slice ``offset`` holds that position of every window as one contiguous row block,
+            # so reductions run over ``window`` array adds instead of strided per-window views.
+            start = len(history) - self.window + 1 - count
+            slices = [history[start + offset : start + offset + count] for offset in range(self.window)]
+            result[rows - count :] = reduce(slices)
+        return result
+
+    @staticmethod
+    def _window_sum(slices: List[np.ndarray]) -> np.ndarray:
+        total = slices[0].copy()
+        for values in slices[1:]:
+            total += values
+        return total
+
+    @classmethod
+    def _window_mean(cls, slices: List[np.ndarray]) -> np.ndarray:
+        return cls._window_sum(slices) / len(slices)
+
+    @classmethod
+    def _window_std(cls, slices: List[np.ndarray]) -> np.ndarray:
+        mean = cls._window_mean(slices)
+        total = np.zeros_like(mean)
+        for values in slices:
+            deviation = values - mean
+            total += deviation * deviation
+        return np.sqrt(total / len(slices))
@@ -0,0 +1,190 @@
+"""
+Live Market Window
+
+Fixed-size NumPy ring buffer holding the most recent prices and returns for a universe
+of assets. Appending a tick evicts the oldest one once the buffer is full, so memory
+stays flat however long a follow session runs. Windowed price co-moments
+(window_moments.py) are updated on every append, which keeps the correlation matrix
+current in O(N^2) per tick instead of rescanning the window. The summary moments
+(prices, returns, log returns, downside returns) and each asset's extremes are kept
+the same way; an extreme is only searched for again when it leaves the window.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from chunked_store import MomentAccumulator
+from summary_stats import extreme_rows
+from window_moments import WindowMoments
+
+SUMMARY_MOMENTS = ("prices", "returns", "log_returns", "downside")
+
+
+class PriceRingBuffer:
+    def __init__(self, assets: Iterable[str], capacity: int, resync_interval: int = 1000) -> None:
+        self.assets: List[str] = list(assets)
+        if not self.assets:
+            raise ValueError("assets must not be empty")
+        if capacity < 2:
+            raise ValueError("capacity must be at least 2")
+
+        n_assets = len(self.assets)
+        self.capacity = capacity
+        self.resync_interval = resync_interval
+        self._timestamps = np.zeros(capacity, dtype=np.int64)
+        self._prices = np.zeros((capacity, n_assets), dtype=np.float64)
+        self._returns = np.zeros((capacity, n_assets), dtype=np.float64)
+        self._head = 0
+        self._count = 0
+        self._appended = 0
+
+        self._moments = WindowMoments(n_assets, full=True)
+        # NaN-skipping moments behind the live summary, and the tick holding each asset's max and min.
+        self.summary_moments: Dict[str, MomentAccumulator] = {}
+        self._rebuild_summary_moments()
+        self._max_tick = np.full(n_assets, -1, dtype=np.int64)
+        self._min_tick = np.full(n_assets, -1, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def last_timestamp(self) -> pd.Timestamp:
+        if not self._count:
+            raise RuntimeError("Ring buffer is empty")
+        return pd.Timestamp(int(self._timestamps[self._head - 1]), unit="ns", tz="UTC")
+
+    @property
+    def last_prices(self) -> np.ndarray:
+        if not self._count:
+            raise RuntimeError("Ring buffer is empty")
+        return self._prices[self._head - 1].copy()
+
+    def extend(self, timestamps_ns: np.ndarray, prices: np.ndarray) -> np.ndarray:
+        """Append several ticks; returns their (rows, assets) pct returns."""
+        prices = np.asarray(prices, dtype=np.float64)
+        returns = np.empty_like(prices)
+        for row, (timestamp_ns, price_row) in enumerate(zip(np.asarray(timestamps_ns, dtype=np.int64), prices)):
+            returns[row] = self.append(int(timestamp_ns), price_row)
+        return returns
+
+    def append(self, timestamp_ns: int, prices: np.ndarray) -> np.ndarray:
+        """Append one tick of prices and return its pct returns against the previous tick."""
+        prices = np.asarray(prices, dtype=np.float64)
+        if prices.shape != (len(self.assets),):
+            raise ValueError(f"Expected {len(self.assets)} prices, got shape {prices.shape}")
+
+        if self._count:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                returns = prices / self._prices[self._head - 1] - 1.0
+            returns[~np.isfinite(returns)] = 0.0
+        else:
+            returns = np.zeros(len(self.assets))
+
+        tick = self._appended
+        evicted = None
+        if self._count == self.capacity:
+            evicted = tick - self.capacity
+            self._moments.remove(self._prices[self._head].copy())
+            for name, block in self._summary_blocks(self._prices[self._head], self._returns[self._head]).items():
+                self.summary_moments[name].remove(block)
+        else:
+            self._count += 1
+        self._timestamps[self._head] = timestamp_ns
+        self._prices[self._head] = prices
+        self._returns[self._head] = returns
+        self._head = (self._head + 1) % self.capacity
+        self._moments.add(prices)
+        for name, block in self._summary_blocks(prices, returns).items():
+            self.summary_moments[name].update(block)
+        self._track_extremes(tick, prices, evicted)
+
+        self._appended += 1
+        if self._appended % self.resync_interval == 0:
+            self._moments.rebuild(self._prices[self._order()])
+            self._rebuild_summary_moments()
+        return returns
+
+    def values(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Buffered (rows, assets) prices and returns in storage order, for order-free statistics."""
+        return self._prices[: self._count], self._returns[: self._count]
+
+    def extremes(self) -> Tuple[np.ndarray, np.ndarray, pd.DatetimeIndex, pd.DatetimeIndex]:
+        """Max and min buffered price per asset and when each was first reached (NaN/NaT if none)."""
+        columns = np.arange(len(self.assets))
+        result = []
+        for ticks in (self._max_tick, self._min_tick):
+            slots = ticks % self.capacity
+            result.append(np.where(ticks >= 0, self._prices[slots, columns], np.nan))
+        for ticks in (self._max_tick, self._min_tick):
+            times = pd.to_datetime(self._timestamps[ticks % self.capacity], unit="ns", utc=True)
+            result.append(times.where(ticks >= 0))
+        return tuple(result)
+
+    def window_frame(self) -> pd.DataFrame:
+        """Buffered ticks, oldest first, in the pipeline's wide column layout."""
+        order = self._order()
+        frame = pd.DataFrame({"timestamp": pd.to_datetime(self._timestamps[order], unit="ns", utc=True)})
+        prices = self._prices[order]
+        returns = self._returns[order]
+        columns = {}
+        for idx, asset in enumerate(self.assets):
+            columns[f"{asset}_price"] = prices[:, idx]
+        for idx, asset in enumerate(self.assets):
+            columns[f"{asset}_pct_return"] = returns[:, idx]
+            columns[f"{asset}_log_return"] = np.log1p(returns[:, idx])
+        return pd.concat([frame, pd.DataFrame(columns)], axis=1)
+
+    def correlation(self) -> pd.DataFrame:
+        """Pearson correlation of buffered price levels."""
+        comoment = self._moments.comoment
+        diagonal = np.sqrt(np.maximum(np.diag(comoment), 0.0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            matrix = comoment / np.outer(diagonal, diagonal)
+        labels = [f"{asset}_price" for asset in self.assets]
+        return pd.DataFrame(np.clip(matrix, -1.0, 1.0), index=labels, columns=labels)
+
+    @staticmethod
+    def _summary_blocks(prices: np.ndarray, returns: np.ndarray) -> Dict[str, np.ndarray]:
+        # Rows in the layout of window_frame(), whose log returns are log1p of the pct returns.
+        prices, returns = np.atleast_2d(prices), np.atleast_2d(returns)
+        return {
+            "prices": prices,
+            "returns": returns,
+            "log_returns": np.log1p(returns),
+            "downside": np.where(returns < 0, returns, np.nan),
+        }
+
+    def _rebuild_summary_moments(self) -> None:
+        self.summary_moments = {name: MomentAccumulator(len(self.assets)) for name in SUMMARY_MOMENTS}
+        if self._count:
+            order = self._order()
+            for name, block in self._summary_blocks(self._prices[order], self._returns[order]).items():
+                self.summary_moments[name].update(block)
+
+    def _track_extremes(self, tick: int, prices: np.ndarray, evicted: int | None) -> None:
+        columns = np.arange(len(self.assets))
+        observed = ~np.isnan(prices)
+        searched = None
+        for position, (ticks, better) in enumerate(((self._max_tick, np.greater), (self._min_tick, np.less))):
+            # The evicted tick's slot now holds the new row, so assets whose extreme left are searched again.
+            left = ticks == evicted if evicted is not None else np.zeros(len(columns), dtype=bool)
+            current = self._prices[ticks % self.capacity, columns]
+            with np.errstate(invalid="ignore"):
+                # Strict comparisons keep the first occurrence, like extreme_rows.
+                replace = observed & ~left & ((ticks < 0) | better(prices, current))
+            ticks[replace] = tick
+            if left.any():
+                if searched is None:
+                    searched = extreme_rows(self._prices[self._order()])
+                rows = searched[position][left]
+                ticks[left] = np.where(rows >= 0, tick + 1 - self._count + rows, -1)
+
+    def _order(self) -> np.ndarray:
+        if self._count < self.capacity:
+            return np.arange(self._count)
+        return (np.arange(self.capacity) + self._head) % self.capacity
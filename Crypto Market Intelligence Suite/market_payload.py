@@ -0,0 +1,110 @@
+"""
+Market Payload Parsing
+
+Compact ingestion of CoinGecko market_chart payloads:
+- Decoded payloads are copied straight into preallocated int64 timestamp and
+  float value arrays, without intermediate DataFrames
+- Very large payloads can be parsed from a byte stream, so the list-of-lists that
+  json would build (roughly 100 bytes per point) never exists in memory
+"""
+
+from __future__ import annotations
+
+import re
+from array import array
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+
+PAYLOAD_KEYS = ("prices", "market_caps", "total_volumes")
+VALUE_DTYPES = ("float64", "float32")
+
+_KEY_RE = re.compile(rb'"(prices|market_caps|total_volumes)"\s*:\s*\[')
+_PAIR_RE = re.compile(rb"\s*,?\s*\[\s*([-+0-9.eE]+)\s*,\s*([-+0-9.eE]+|null)\s*\]")
+_END_RE = re.compile(rb"\s*\]")
+# Bytes kept between chunks while searching for the next key.
+_KEY_LOOKBEHIND = 32
+
+SeriesArrays = Tuple[np.ndarray, np.ndarray]
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def pairs_to_arrays(pairs: list, value_dtype: str = "float64") -> SeriesArrays:
+    """Copy ``[[timestamp_ms, value], ...]`` into int64 and ``value_dtype`` arrays."""
+    count = len(pairs)
+    try:
+        timestamps = np.fromiter((pair[0] for pair in pairs), dtype=np.int64, count=count)
+    except (TypeError, ValueError):
+        timestamps = np.fromiter((_to_float(pair[0]) for pair in pairs), dtype=np.float64, count=count)
+        timestamps = timestamps.astype(np.int64)
+    try:
+        values = np.fromiter((pair[1] for pair in pairs), dtype=value_dtype, count=count)
+    except (TypeError, ValueError):
+        # Same coercion as pd.to_numeric(errors="coerce"): nulls and junk become NaN.
+        values = np.fromiter((_to_float(pair[1]) for pair in pairs), dtype=value_dtype, count=count)
+    return timestamps, values
+
+
+def payload_to_arrays(payload: dict, value_dtype: str = "float64") -> Dict[str, SeriesArrays]:
+    return {key: pairs_to_arrays(payload.get(key) or [], value_dtype) for key in PAYLOAD_KEYS}
+
+
+def parse_market_chart_stream(chunks: Iterable[bytes], value_dtype: str = "float64") -> Dict[str, SeriesArrays]:
+    """Parse a market_chart JSON byte stream incrementally into per-key arrays.
+
+    Only the ``prices``, ``market_caps`` and ``total_volumes`` arrays are read; other
+    keys are skipped. Values are buffered in compact ``array`` storage while parsing.
+    """
+    timestamps = {key: array("q") for key in PAYLOAD_KEYS}
+    values = {key: array("d") for key in PAYLOAD_KEYS}
+    current: str | None = None
+    buffer = b""
+
+    for chunk in chunks:
+        if not chunk:
+            continue
+        buffer += chunk
+        pos = 0
+        while True:
+            if current is None:
+                match = _KEY_RE.search(buffer, pos)
+                if match is None:
+                    pos = max(pos, len(buffer) - _KEY_LOOKBEHIND)
+                    break
+                current = match.group(1).decode("ascii")
+                pos = match.end()
+                continue
+
+            match = _PAIR_RE.match(buffer, pos)
+            if match is not None:
+                raw_ts, raw_value = match.groups()
+                timestamps[current].append(int(float(raw_ts)))
+                values[current].append(np.nan if raw_value == b"null" else float(raw_value))
+                pos = match.end()
+                continue
+
+            match = _END_RE.match(buffer, pos)
+            if match is not None:
+                current = None
+                pos = match.end()
+                continue
+            # The next pair is split across chunks.
+            break
+        buffer = buffer[pos:]
+
+    if current is not None:
+        raise ValueError(f"Truncated market_chart stream inside '{current}'")
+
+    return {
+        key: (
+            np.frombuffer(timestamps[key], dtype=np.int64),
+            np.frombuffer(values[key], dtype=np.float64).astype(value_dtype, copy=False),
+        )
+        for key in PAYLOAD_KEYS
+    }
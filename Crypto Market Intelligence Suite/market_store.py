@@ -0,0 +1,164 @@
+"""
+Market Store
+
+Embedded, partitioned Parquet store for the processed market history:
+- One file per quote currency, coin and calendar month
+  (``<root>/<vs_currency>/<coin>/<YYYY-MM>.parquet``), written by every pipeline run
+- Writes upsert month partitions on ``timestamp``, so reruns and incremental runs
+  never duplicate rows
+- Range queries open only the months that overlap the range, read only the requested
+  fields and push the time filter down to the Parquet row groups
+- Usable from Python (``MarketStore.query``) or the command line
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from pathlib import Path
+from typing import Iterable, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+STORE_FIELDS = ("price", "market_cap", "volume", "filled", "pct_return", "log_return")
+
+
+class MarketStore:
+    def __init__(self, root: Path, compression: str = "snappy") -> None:
+        self.root = Path(root)
+        self.compression = compression
+
+    def write(self, table: pd.DataFrame, coins: Iterable[str], vs_currency: str) -> int:
+        """Upsert a wide ``{coin}_{field}`` table; returns the number of partitions written."""
+        if table.empty:
+            return 0
+        table = table.sort_values("timestamp", kind="stable").reset_index(drop=True)
+        written = 0
+        for coin in coins:
+            fields = [field for field in STORE_FIELDS if f"{coin}_{field}" in table.columns]
+            if not fields:
+                continue
+            frame = table[["timestamp", *(f"{coin}_{field}" for field in fields)]]
+            frame.columns = ["timestamp", *fields]
+            for month, part in self._split_by_month(frame):
+                self._upsert(self._partition_path(vs_currency, coin, month), part)
+                written += 1
+        return written
+
+    def query(
+        self,
+        coins: str | Iterable[str],
+        start: str | pd.Timestamp | None = None,
+        end: str | pd.Timestamp | None = None,
+        fields: Iterable[str] | None = None,
+        vs_currency: str = "usd",
+    ) -> pd.DataFrame:
+        """Rows in ``[start, end)`` for one or more coins, in long form with a ``coin`` column."""
+        coin_list = [coins] if isinstance(coins, str) else list(coins)
+        start_ts = self._to_utc(start)
+        end_ts = self._to_utc(end)
+        columns = ["timestamp", *(fields if fields is not None else STORE_FIELDS)]
+        unknown = [field for field in columns[1:] if field not in STORE_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown field(s) {', '.join(unknown)}. Choose from {', '.join(STORE_FIELDS)}")
+
+        filters: List[Tuple[str, str, pd.Timestamp]] = []
+        if start_ts is not None:
+            filters.append(("timestamp", ">=", start_ts))
+        if end_ts is not None:
+            filters.append(("timestamp", "<", end_ts))
+
+        parts: List[pd.DataFrame] = []
+        for coin in coin_list:
+            for path in self._partitions(vs_currency, coin, start_ts, end_ts):
+                available = self._schema_names(path)
+                part = pd.read_parquet(
+                    path,
+                    columns=[column for column in columns if column in available],
+                    filters=filters or None,
+                )
+                part.insert(1, "coin", coin)
+                parts.append(part)
+        if not parts:
+            return pd.DataFrame(columns=["timestamp", "coin", *columns[1:]])
+        return pd.concat(parts, ignore_index=True)
+
+    def coins(self, vs_currency: str = "usd") -> List[str]:
+        directory = self.root / vs_currency
+        return sorted(path.name for path in directory.iterdir() if path.is_dir()) if directory.exists() else []
+
+    def months(self, coin: str, vs_currency: str = "usd") -> List[str]:
+        directory = self.root / vs_currency / coin
+        return sorted(path.stem for path in directory.glob("*.parquet"))
+
+    def _partition_path(self, vs_currency: str, coin: str, month: str) -> Path:
+        return self.root / vs_currency / coin / f"{month}.parquet"
+
+    def _partitions(
+        self, vs_currency: str, coin: str, start: pd.Timestamp | None, end: pd.Timestamp | None
+    ) -> Iterator[Path]:
+        # Month names sort chronologically, so the range prunes partitions by name alone.
+        first = start.strftime("%Y-%m") if start is not None else None
+        last = (end - pd.Timedelta(1, "ns")).strftime("%Y-%m") if end is not None else None
+        for month in self.months(coin, vs_currency):
+            if (first is None or month >= first) and (last is None or month <= last):
+                yield self._partition_path(vs_currency, coin, month)
+
+    @staticmethod
+    def _split_by_month(frame: pd.DataFrame) -> Iterator[Tuple[str, pd.DataFrame]]:
+        months = frame["timestamp"].to_numpy(dtype="datetime64[ns]").astype("datetime64[M]")
+        # Sorted timestamps give contiguous month runs, sliced without a groupby.
+        boundaries = np.flatnonzero(months[1:] != months[:-1]) + 1
+        for lo, hi in zip(np.r_[0, boundaries], np.r_[boundaries, len(frame)]):
+            yield str(months[lo]), frame.iloc[lo:hi]
+
+    def _upsert(self, path: Path, part: pd.DataFrame) -> None:
+        if path.exists():
+            stored = pd.read_parquet(path)
+            part = pd.concat([stored, part], ignore_index=True)
+            part = part.drop_duplicates(subset=["timestamp"], keep="last").sort_values("timestamp", kind="stable")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write beside the partition and swap it in, so readers never see a half-written month.
+        temporary = path.with_suffix(".tmp")
+        part.to_parquet(temporary, index=False, compression=self.compression)
+        os.replace(temporary, path)
+
+    @staticmethod
+    def _schema_names(path: Path) -> List[str]:
+        import pyarrow.parquet as pq
+
+        return pq.read_schema(path).names
+
+    @staticmethod
+    def _to_utc(value: str | pd.Timestamp | None) -> pd.Timestamp | None:
+        if value is None:
+            return None
+        timestamp = pd.Timestamp(value)
+        return timestamp.tz_localize("UTC") if timestamp.tzinfo is None else timestamp.tz_convert("UTC")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Query the partitioned market store")
+    parser.add_argument("store_dir", type=Path, help="Store directory written with --store-dir")
+    parser.add_argument("coins", nargs="+", help="CoinGecko coin ids to read")
+    parser.add_argument("--start", default=None, help="Inclusive start (e.g. 2024-03-01)")
+    parser.add_argument("--end", default=None, help="Exclusive end (e.g. 2024-04-01)")
+    parser.add_argument("--fields", nargs="+", choices=STORE_FIELDS, default=None, help="Fields to read (default: all)")
+    parser.add_argument("--vs-currency", default="usd", help="Quote currency partition to read")
+    parser.add_argument("--output", type=Path, default=None, help="Write the result to this CSV instead of printing it")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    result = MarketStore(args.store_dir).query(args.coins, args.start, args.end, args.fields, args.vs_currency)
+    if args.output is not None:
+        result.to_csv(args.output, index=False)
+        print(f"{len(result)} rows written to {args.output}")
+    else:
+        print(result.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
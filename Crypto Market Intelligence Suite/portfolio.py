@@ -0,0 +1,141 @@
+"""
+Portfolio Optimization
+
+Fully invested allocations over the loaded universe from the return covariance:
+- Minimum-variance and mean-variance (risk-aversion utility) weights; both are
+  unconstrained, so negative weights are short positions
+- Risk-parity weights, long-only by construction, from Newton steps on the convex
+  log-barrier formulation (Spinu, 2013)
+- One eigendecomposition of the covariance is cached and reused by every solve; tiny
+  eigenvalues are floored, so singular matrices (short histories, wide universes) still solve
+- Every efficient-frontier point is a closed-form mix of the two cached solves
+  inv(cov) @ 1 and inv(cov) @ mu, so the whole frontier is one batched outer product
+  instead of one solve per point
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+PORTFOLIOS = ("min_variance", "mean_variance", "risk_parity")
+# Eigenvalues below this fraction of the largest one are raised to it before inverting.
+EIGENVALUE_FLOOR = 1e-10
+
+
+class PortfolioOptimizer:
+    def __init__(
+        self,
+        assets: Iterable[str],
+        expected_returns: np.ndarray,
+        covariance: np.ndarray,
+        periods_per_year: float = 365.0,
+    ) -> None:
+        self.assets: List[str] = list(assets)
+        width = len(self.assets)
+        mean = np.asarray(expected_returns, dtype=np.float64)
+        covariance = np.asarray(covariance, dtype=np.float64)
+        if not width or mean.shape != (width,) or covariance.shape != (width, width):
+            raise ValueError(f"Expected {width} expected returns and a ({width}, {width}) covariance matrix")
+        if not (np.isfinite(mean).all() and np.isfinite(covariance).all()):
+            raise ValueError("Expected returns and covariance must be finite")
+
+        # Per-row moments are annualized, so reported returns and volatilities are yearly.
+        self.expected_returns = mean * periods_per_year
+        values, vectors = np.linalg.eigh((covariance + covariance.T) * (periods_per_year / 2.0))
+        if values[-1] <= 0:
+            raise ValueError("Covariance matrix has no variance to allocate")
+        self._values = np.maximum(values, values[-1] * EIGENVALUE_FLOOR)
+        self._vectors = vectors
+        self.covariance = (vectors * self._values) @ vectors.T
+
+        self._inv_ones = self.solve(np.ones(width))
+        self._inv_mean = self.solve(self.expected_returns)
+        # Frontier scalars: 1' inv(cov) 1, 1' inv(cov) mu and mu' inv(cov) mu.
+        self._a = float(self._inv_ones.sum())
+        self._b = float(self._inv_mean.sum())
+        self._c = float(self.expected_returns @ self._inv_mean)
+
+    def solve(self, rhs: np.ndarray) -> np.ndarray:
+        """inv(cov) @ rhs through the cached eigendecomposition."""
+        return self._vectors @ ((self._vectors.T @ rhs) / self._values)
+
+    def min_variance(self) -> np.ndarray:
+        return self._inv_ones / self._a
+
+    def mean_variance(self, risk_aversion: float = 3.0) -> np.ndarray:
+        """Maximize ``mu' w - risk_aversion / 2 * w' cov w`` subject to fully invested weights."""
+        if risk_aversion <= 0:
+            raise ValueError("risk_aversion must be positive")
+        minimum = self.min_variance()
+        return minimum + (self._inv_mean - self._b * minimum) / risk_aversion
+
+    def risk_parity(self, budgets: np.ndarray | None = None, tol: float = 1e-12, max_iter: int = 100) -> np.ndarray:
+        """Long-only weights whose risk contributions match ``budgets`` (default: equal)."""
+        width = len(self.assets)
+        budgets = np.full(width, 1.0 / width) if budgets is None else np.asarray(budgets, dtype=np.float64)
+        if budgets.shape != (width,) or (budgets <= 0).any():
+            raise ValueError(f"Expected {width} positive risk budgets")
+        budgets = budgets / budgets.sum()
+
+        def objective(y: np.ndarray) -> float:
+            return 0.5 * float(y @ self.covariance @ y) - float(budgets @ np.log(y))
+
+        # Minimize 0.5 y' cov y - budgets' log(y); at the optimum y * (cov @ y) == budgets.
+        y = budgets / np.sqrt(np.diag(self.covariance))
+        for _ in range(max_iter):
+            marginal = self.covariance @ y
+            if np.abs(y * marginal - budgets).max() <= tol:
+                break
+            gradient = marginal - budgets / y
+            step = np.linalg.solve(self.covariance + np.diag(budgets / (y * y)), gradient)
+            # Backtrack to stay inside the positive orthant and keep the objective decreasing.
+            scale, current, decrease = 1.0, objective(y), 1e-4 * float(gradient @ step)
+            while scale > 1e-12 and (
+                (y - scale * step <= 0).any() or objective(y - scale * step) > current - scale * decrease
+            ):
+                scale *= 0.5
+            y = y - scale * step
+        return y / y.sum()
+
+    def frontier(self, points: int = 50) -> Tuple[np.ndarray, np.ndarray]:
+        """Target returns and (points, assets) weights from the minimum-variance return to the best asset's."""
+        if points < 1:
+            raise ValueError("points must be positive")
+        lowest = self._b / self._a
+        targets = np.linspace(lowest, max(float(self.expected_returns.max()), lowest), points)
+        determinant = self._a * self._c - self._b * self._b
+        if determinant <= EIGENVALUE_FLOOR * self._a * self._c:
+            # Equal expected returns (or one asset): every target collapses to the minimum-variance mix.
+            return targets, np.tile(self.min_variance(), (points, 1))
+        weights = np.outer(self._c - targets * self._b, self._inv_ones)
+        weights += np.outer(targets * self._a - self._b, self._inv_mean)
+        return targets, weights / determinant
+
+    def weights_table(self, risk_aversion: float = 3.0) -> pd.DataFrame:
+        weights = np.vstack([self.min_variance(), self.mean_variance(risk_aversion), self.risk_parity()])
+        return self._table(list(PORTFOLIOS), weights)
+
+    def frontier_table(self, points: int = 50) -> pd.DataFrame:
+        _, weights = self.frontier(points)
+        return self._table(["frontier"] * points, weights)
+
+    def _table(self, names: List[str], weights: np.ndarray) -> pd.DataFrame:
+        # Variance of every portfolio in one pass: diag(W @ cov @ W').
+        variance = np.einsum("ij,ij->i", weights @ self.covariance, weights)
+        returns = weights @ self.expected_returns
+        volatility = np.sqrt(np.maximum(variance, 0.0))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            sharpe = np.where(volatility > 0, returns / volatility, np.nan)
+        table = pd.DataFrame(
+            {
+                "portfolio": names,
+                "annualized_return": returns,
+                "annualized_volatility": volatility,
+                "sharpe": sharpe,
+            }
+        )
+        weight_columns = pd.DataFrame(weights, columns=[f"{asset}_weight" for asset in self.assets])
+        return pd.concat([table, weight_columns], axis=1)
@@ -0,0 +1,216 @@
+"""
+Rolling Risk Analytics
+
+Streaming fixed-window risk metrics for a universe of assets:
+- Annualized volatility and downside deviation
+- Sharpe and Sortino ratios
+- Current and maximum drawdown
+- Beta and correlation against a benchmark asset
+
+The engine keeps the last ``window`` returns per asset in a ring buffer and updates
+window moments (window_moments.py) as a tick enters and the oldest tick leaves, so each
+new tick costs O(1) per asset regardless of the window length. Missing returns (an unobserved
+interval) count as no move; the price change lands on the first observed return. The
+newest tick can be taken back out once, e.g. a resample bucket that was still filling.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from window_moments import WindowMoments
+
+
+class RollingRiskEngine:
+    def __init__(
+        self,
+        assets: Iterable[str],
+        window: int,
+        periods_per_year: float = 365.0,
+        benchmark: str | None = None,
+        resync_interval: int = 1000,
+    ) -> None:
+        self.assets: List[str] = list(assets)
+        if not self.assets:
+            raise ValueError("assets must not be empty")
+        if window < 2:
+            raise ValueError("window must be at least 2")
+        if benchmark is not None and benchmark not in self.assets:
+            raise ValueError(f"benchmark '{benchmark}' is not one of the assets")
+
+        self.window = window
+        self.periods_per_year = periods_per_year
+        self.benchmark = benchmark
+        self.benchmark_index = self.assets.index(benchmark) if benchmark is not None else None
+        self.resync_interval = resync_interval
+
+        n_assets = len(self.assets)
+        self._buffer = np.zeros((window, n_assets), dtype=np.float64)
+        self._head = 0
+        self._count = 0
+        self._ticks = 0
+
+        self._moments = WindowMoments(n_assets, benchmark=self.benchmark_index)
+        self._downside_sq = np.zeros(n_assets)
+
+        self._equity = np.ones(n_assets)
+        self._peak = np.ones(n_assets)
+        self._max_drawdown = np.zeros(n_assets)
+        # Equity, peak and max drawdown before the newest tick, so pop() can restore them.
+        self._previous: Tuple[np.ndarray, np.ndarray, np.ndarray] | None = None
+
+    @property
+    def ticks(self) -> int:
+        return self._ticks
+
+    def prime(self, returns: np.ndarray) -> None:
+        """Load a (rows, assets) block of history in one vectorized pass."""
+        returns = np.nan_to_num(np.asarray(returns, dtype=np.float64), nan=0.0)
+        if returns.ndim != 2 or returns.shape[1] != len(self.assets):
+            raise ValueError(f"Expected a (rows, {len(self.assets)}) return matrix, got {returns.shape}")
+        if len(returns) == 0:
+            return
+
+        equity = self._equity * np.cumprod(1.0 + returns, axis=0)
+        peak = np.maximum(self._peak, np.maximum.accumulate(equity, axis=0))
+        drawdown = equity / peak - 1.0
+        if len(returns) > 1:
+            self._previous = (equity[-2], peak[-2], np.minimum(self._max_drawdown, drawdown[:-1].min(axis=0)))
+        else:
+            self._previous = (self._equity, self._peak, self._max_drawdown)
+        self._max_drawdown = np.minimum(self._max_drawdown, drawdown.min(axis=0))
+        self._equity = equity[-1]
+        self._peak = peak[-1]
+
+        # Replay into the ring buffer so later updates evict ticks in arrival order.
+        window_rows = self._window_rows()
+        recent = np.concatenate([window_rows, returns[-self.window :]])[-self.window :]
+        self._buffer[:] = 0.0
+        self._buffer[: len(recent)] = recent
+        self._count = len(recent)
+        self._head = len(recent) % self.window
+        self._ticks += len(returns)
+        self._resync()
+
+    def update(self, returns: np.ndarray) -> None:
+        """Add one tick of returns (one value per asset)."""
+        row = np.nan_to_num(np.asarray(returns, dtype=np.float64), nan=0.0)
+        if row.shape != (len(self.assets),):
+            raise ValueError(f"Expected {len(self.assets)} returns, got shape {row.shape}")
+
+        if self._count == self.window:
+            self._remove(self._buffer[self._head].copy())
+        self._buffer[self._head] = row
+        self._head = (self._head + 1) % self.window
+        self._add(row)
+
+        self._previous = (self._equity, self._peak, self._max_drawdown)
+        self._equity = self._equity * (1.0 + row)
+        self._peak = np.maximum(self._peak, self._equity)
+        self._max_drawdown = np.minimum(self._max_drawdown, self._equity / self._peak - 1.0)
+
+        self._ticks += 1
+        if self._ticks % self.resync_interval == 0:
+            self._resync()
+
+    def pop(self) -> None:
+        """Take the newest tick back out; only one tick can be undone until the next update."""
+        if self._previous is None or not self._count:
+            raise RuntimeError("No tick to take back out")
+        self._head = (self._head - 1) % self.window
+        self._remove(self._buffer[self._head].copy())
+        self._buffer[self._head] = 0.0
+        self._equity, self._peak, self._max_drawdown = self._previous
+        self._previous = None
+        self._ticks -= 1
+
+    def snapshot(self) -> pd.DataFrame:
+        """Current window metrics, one row per asset."""
+        n = self._count
+        moments = self._moments
+        annualizer = np.sqrt(self.periods_per_year)
+        missing = np.full(len(self.assets), np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            variance = np.maximum(moments.m2, 0.0) / (n - 1) if n > 1 else missing
+            volatility = np.sqrt(variance) * annualizer
+            downside = np.sqrt(np.maximum(self._downside_sq, 0.0) / n) * annualizer if n else missing
+            annual_mean = moments.mean * self.periods_per_year if n else missing
+            sharpe = np.where(volatility > 0, annual_mean / volatility, np.nan)
+            sortino = np.where(downside > 0, annual_mean / downside, np.nan)
+
+            metrics = {
+                "window_points": np.full(len(self.assets), n),
+                "annualized_volatility": volatility,
+                "downside_deviation": downside,
+                "sharpe_ratio": sharpe,
+                "sortino_ratio": sortino,
+                "drawdown": self._equity / self._peak - 1.0,
+                "max_drawdown": self._max_drawdown.copy(),
+            }
+            if self.benchmark_index is not None:
+                bench_m2 = max(moments.m2[self.benchmark_index], 0.0)
+                metrics["beta"] = np.where(bench_m2 > 0, moments.cov / bench_m2, np.nan)
+                denom = np.sqrt(np.maximum(moments.m2, 0.0) * bench_m2)
+                metrics["correlation"] = np.where(denom > 0, moments.cov / denom, np.nan)
+
+        return pd.DataFrame(metrics, index=pd.Index(self.assets, name="asset"))
+
+    def save(self, path: Path) -> None:
+        np.savez(
+            path,
+            assets=np.asarray(self.assets, dtype=str),
+            window=self.window,
+            periods_per_year=self.periods_per_year,
+            benchmark=np.asarray(self.benchmark if self.benchmark is not None else ""),
+            resync_interval=self.resync_interval,
+            counters=np.array([self._head, self._count, self._ticks]),
+            buffer=self._buffer,
+            moments=np.vstack([self._moments.mean, self._moments.m2, self._downside_sq]),
+            cov=self._moments.cov if self._moments.cov is not None else np.zeros(len(self.assets)),
+            drawdown=np.vstack([self._equity, self._peak, self._max_drawdown]),
+            previous=np.vstack(self._previous) if self._previous is not None else np.empty((0, len(self.assets))),
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "RollingRiskEngine":
+        with np.load(path, allow_pickle=False) as data:
+            engine = cls(
+                data["assets"].tolist(),
+                int(data["window"]),
+                float(data["periods_per_year"]),
+                str(data["benchmark"]) or None,
+                int(data["resync_interval"]),
+            )
+            engine._head, engine._count, engine._ticks = (int(value) for value in data["counters"])
+            engine._buffer = data["buffer"].copy()
+            engine._moments.mean, engine._moments.m2, engine._downside_sq = data["moments"].copy()
+            engine._moments.count = engine._count
+            if engine._moments.cov is not None:
+                engine._moments.cov = data["cov"].copy()
+            engine._equity, engine._peak, engine._max_drawdown = data["drawdown"].copy()
+            if len(data["previous"]):
+                engine._previous = tuple(data["previous"].copy())
+        return engine
+
+    def _window_rows(self) -> np.ndarray:
+        # Oldest first; after a pop() the window can be short of full while wrapped around.
+        return self._buffer[(self._head - self._count + np.arange(self._count)) % self.window]
+
+    def _add(self, row: np.ndarray) -> None:
+        self._count += 1
+        self._moments.add(row)
+        self._downside_sq += np.minimum(row, 0.0) ** 2
+
+    def _remove(self, row: np.ndarray) -> None:
+        self._count -= 1
+        self._moments.remove(row)
+        self._downside_sq -= np.minimum(row, 0.0) ** 2
+
+    def _resync(self) -> None:
+        rows = self._window_rows()
+        self._moments.rebuild(rows)
+        self._downside_sq = (np.minimum(rows, 0.0) ** 2).sum(axis=0)
@@ -0,0 +1,122 @@
+"""
+Stage Profiler
+
+Lightweight instrumentation for the crypto pipeline stages:
+- Wall-clock and CPU time per stage
+- Peak resident set size and optional tracemalloc allocation deltas
+- Free-form counters (rows, network bytes, retries) attributed to the running stage
+- Optional cProfile dump per stage for drill-down with pstats or snakeviz
+"""
+
+from __future__ import annotations
+
+import cProfile
+import json
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+try:
+    import resource
+except ImportError:  # Windows has no resource module.
+    resource = None
+
+
+@dataclass
+class StageTiming:
+    name: str
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    peak_rss_mb: float | None = None
+    alloc_delta_mb: float | None = None
+    alloc_peak_mb: float | None = None
+    counters: Dict[str, float] = field(default_factory=dict)
+
+
+def _peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class StageProfiler:
+    def __init__(self, trace_memory: bool = False, profile_dir: Path | None = None) -> None:
+        self.trace_memory = trace_memory
+        self.profile_dir = profile_dir
+        self.stages: List[StageTiming] = []
+        self._current: StageTiming | None = None
+        self._lock = threading.Lock()
+
+        if self.profile_dir is not None:
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageTiming]:
+        timing = StageTiming(name=name)
+        self.stages.append(timing)
+        previous, self._current = self._current, timing
+
+        started_tracing = False
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+            alloc_before = tracemalloc.get_traced_memory()[0]
+
+        profiler = cProfile.Profile() if self.profile_dir is not None else None
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield timing
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            timing.wall_seconds = time.perf_counter() - wall_start
+            timing.cpu_seconds = time.process_time() - cpu_start
+            timing.peak_rss_mb = _peak_rss_mb()
+
+            if self.trace_memory:
+                current, peak = tracemalloc.get_traced_memory()
+                timing.alloc_delta_mb = (current - alloc_before) / (1024 * 1024)
+                timing.alloc_peak_mb = (peak - alloc_before) / (1024 * 1024)
+                if started_tracing:
+                    tracemalloc.stop()
+
+            if profiler is not None:
+                profiler.dump_stats(self.profile_dir / f"{len(self.stages):02d}_{name}.prof")
+            self._current = previous
+
+    def count(self, key: str, amount: float = 1) -> None:
+        """Add to a counter on the running stage; a no-op outside any stage."""
+        timing = self._current
+        if timing is None:
+            return
+        with self._lock:
+            timing.counters[key] = timing.counters.get(key, 0) + amount
+
+    def report(self) -> dict:
+        totals: Dict[str, float] = {}
+        for timing in self.stages:
+            for key, value in timing.counters.items():
+                totals[key] = totals.get(key, 0) + value
+        return {
+            "stages": [asdict(timing) for timing in self.stages],
+            "total_wall_seconds": sum(timing.wall_seconds for timing in self.stages),
+            "total_cpu_seconds": sum(timing.cpu_seconds for timing in self.stages),
+            "peak_rss_mb": _peak_rss_mb(),
+            "counters": totals,
+        }
+
+    def write_report(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.report(), indent=2), encoding="utf-8")
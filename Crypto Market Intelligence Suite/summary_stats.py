@@ -0,0 +1,122 @@
+"""
+Summary Statistics
+
+Vectorized per-asset statistics for the asset summary:
+- Moments for every column of a (rows, assets) block from one sum and one centered pass,
+  skipping NaNs, instead of one pandas reduction per statistic
+- Medians and extremes from np.nanpercentile selection and masked argmax/argmin
+- Return quantiles plus historical VaR/CVaR from one multi-point np.partition, so
+  adding confidence levels costs a few more selection points rather than another scan
+"""
+
+from __future__ import annotations
+
+import warnings
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+
+DEFAULT_QUANTILES = (0.05, 0.25, 0.75, 0.95)
+DEFAULT_VAR_LEVELS = (0.95, 0.99)
+
+
+def column_moments(block: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """NaN-skipping count, mean and sample standard deviation (ddof=1) per column."""
+    block = np.asarray(block, dtype=np.float64)
+    missing = np.isnan(block)
+    has_missing = bool(missing.any())
+    count = len(block) - missing.sum(axis=0).astype(np.float64)
+    # Complete blocks (the usual case for returns) skip the masking copies entirely.
+    observed = np.where(missing, 0.0, block) if has_missing else block
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = observed.sum(axis=0) / count
+        centered = observed - mean
+        if has_missing:
+            centered[missing] = 0.0
+        std = np.sqrt(np.einsum("ij,ij->j", centered, centered) / (count - 1))
+    std[count < 2] = np.nan
+    return count, mean, std
+
+
+def extreme_rows(block: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Row of the first maximum and first minimum per column; -1 for all-NaN columns."""
+    block = np.asarray(block, dtype=np.float64)
+    missing = np.isnan(block)
+    empty = missing.all(axis=0)
+    arg_max = np.where(missing, -np.inf, block).argmax(axis=0)
+    arg_min = np.where(missing, np.inf, block).argmin(axis=0)
+    return np.where(empty, -1, arg_max), np.where(empty, -1, arg_min)
+
+
+def median(block: np.ndarray) -> np.ndarray:
+    block = np.asarray(block, dtype=np.float64)
+    if not len(block):
+        return np.full(block.shape[1], np.nan)
+    with warnings.catch_warnings():
+        # All-NaN columns yield NaN, which is the intended result.
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanpercentile(block, 50.0, axis=0)
+
+
+def quantile_label(quantile: float) -> str:
+    return f"return_q{round(quantile * 100, 2):g}".replace(".", "_")
+
+
+def var_labels(level: float) -> Tuple[str, str]:
+    suffix = f"{round(level * 100, 2):g}".replace(".", "_")
+    return f"var_{suffix}", f"cvar_{suffix}"
+
+
+def validate_levels(values: Iterable[float], name: str) -> Tuple[float, ...]:
+    levels = tuple(dict.fromkeys(float(value) for value in values))
+    if any(not 0.0 < value < 1.0 for value in levels):
+        raise ValueError(f"{name} must lie strictly between 0 and 1")
+    return levels
+
+
+def tail_statistics(
+    returns: np.ndarray,
+    quantiles: Iterable[float] = DEFAULT_QUANTILES,
+    var_levels: Iterable[float] = DEFAULT_VAR_LEVELS,
+) -> Dict[str, np.ndarray]:
+    """Return quantiles, historical VaR and CVaR (as positive losses) per column.
+
+    Quantiles interpolate linearly like np.nanpercentile. VaR at ``level`` is minus the
+    ``1 - level`` quantile and CVaR minus the mean of the worst ``ceil((1 - level) * n)``
+    returns. Every order statistic comes from one multi-kth np.partition per group of
+    columns with the same number of observations.
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    quantiles, var_levels = tuple(quantiles), tuple(var_levels)
+    width = returns.shape[1]
+    labels = [quantile_label(q) for q in quantiles] + [label for level in var_levels for label in var_labels(level)]
+    stats = {label: np.full(width, np.nan) for label in labels}
+    if not labels:
+        return stats
+
+    count = (~np.isnan(returns)).sum(axis=0)
+    for n in np.unique(count[count > 0]):
+        columns = np.flatnonzero(count == n)
+        points = {q: q * (n - 1) for q in (*quantiles, *(1.0 - level for level in var_levels))}
+        # Rounding first keeps e.g. (1 - 0.95) * 1500 = 75.00000000000007 at 75 rows.
+        tails = {level: max(int(np.ceil(round((1.0 - level) * n, 9))), 1) for level in var_levels}
+        kth = {int(np.floor(position)) for position in points.values()}
+        kth |= {min(int(np.floor(position)) + 1, n - 1) for position in points.values()}
+        kth |= {tail - 1 for tail in tails.values()}
+        # A column-major copy keeps each column contiguous for the in-place selection. NaNs
+        # partition to the end, so the first n rows of each column are its observations.
+        block = np.array(returns if len(columns) == width else returns[:, columns], order="F")
+        block.partition(sorted(kth), axis=0)
+
+        def quantile(q: float) -> np.ndarray:
+            lo = int(np.floor(points[q]))
+            lower, upper = block[lo], block[min(lo + 1, n - 1)]
+            return lower + (upper - lower) * (points[q] - lo)
+
+        for q in quantiles:
+            stats[quantile_label(q)][columns] = quantile(q)
+        for level in var_levels:
+            var_label, cvar_label = var_labels(level)
+            stats[var_label][columns] = -quantile(1.0 - level)
+            stats[cvar_label][columns] = -block[: tails[level]].sum(axis=0) / tails[level]
+    return stats
@@ -0,0 +1,136 @@
+"""
+Shared test fixtures: the pipeline module and a local stand-in for the CoinGecko API.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+SUITE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SUITE_DIR))
+
+from benchmark_pipeline import load_pipeline_module, synthetic_payload  # noqa: E402
+
+
+class MarketAPI:
+    """Threaded market_chart server; queued replies are sent before any payload."""
+
+    def __init__(self) -> None:
+        self.payloads: Dict[str, dict] = {}
+        # (status, headers) answered in order, one per request, before payloads are served.
+        self.replies: List[Tuple[int, Dict[str, str]]] = []
+        self.paths: List[str] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/v3/coins/{{coin_id}}/market_chart"
+
+    def add_coin(self, coin_id: str, points: int, seed: int = 7) -> dict:
+        self.payloads[coin_id] = synthetic_payload(len(self.payloads), points, seed)
+        return self.payloads[coin_id]
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def _next_reply(self) -> Tuple[int, Dict[str, str]] | None:
+        with self._lock:
+            return self.replies.pop(0) if self.replies else None
+
+    def _handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                api.paths.append(self.path)
+                reply = api._next_reply()
+                if reply is not None:
+                    status, headers = reply
+                    self.send_response(status)
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.send_header("Content-Length", "2")
+                    self.end_headers()
+                    self.wfile.write(b"{}")
+                    return
+
+                url = urlparse(self.path)
+                parts = url.path.strip("/").split("/")
+                payload = api.payloads.get(parts[3] if len(parts) > 3 else "")
+                if payload is None:
+                    self.send_error(404)
+                    return
+                if parts[-1] == "range":
+                    query = parse_qs(url.query)
+                    start = int(query["from"][0]) * 1000
+                    end = int(query["to"][0]) * 1000
+                    payload = {key: [row for row in rows if start < row[0] <= end] for key, rows in payload.items()}
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        return Handler
+
+
+@pytest.fixture(scope="session")
+def pipeline_module():
+    return load_pipeline_module()
+
+
+@pytest.fixture
+def market_api():
+    api = MarketAPI()
+    api.start()
+    yield api
+    api.stop()
+
+
+@pytest.fixture
+def make_pipeline(pipeline_module, market_api, tmp_path):
+    """Pipeline against the local API; flat keyword options are routed to their config dataclass."""
+    groups = {
+        "fetch": pipeline_module.FetchConfig,
+        "storage": pipeline_module.StorageConfig,
+        "analytics": pipeline_module.AnalyticsConfig,
+        "output": pipeline_module.OutputConfig,
+    }
+
+    def make(output_dir: Path | None = None, days: int = 30, **kwargs):
+        options = dict(
+            base_url=market_api.base_url,
+            request_spacing_seconds=0,
+            retry_backoff=0.01,
+            use_cache=False,
+            charts=[],
+        )
+        options.update(kwargs)
+        configs = {}
+        for name, config in groups.items():
+            fields = {field.name for field in dataclasses.fields(config)}
+            configs[name] = config(**{key: options.pop(key) for key in list(options) if key in fields})
+        return pipeline_module.CryptoMarketPipeline(days, output_dir or tmp_path / "outputs", **configs, **options)
+
+    return make
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtesting import backtest, run_sweep, strategy_weights
+
+
+def test_pnl_matches_a_hand_computed_case():
+    returns = np.array([[0.0, 0.0], [0.10, -0.05], [0.02, np.nan], [-0.10, 0.0]])
+    # Row t's weights earn row t + 1's returns; the NaN weight row is flat.
+    weights = np.array([[0.5, 0.5], [1.0, 0.0], [1.0, 0.0], [np.nan, np.nan]])
+
+    result = backtest(returns, weights, cost_bps=10.0, periods_per_year=4.0)
+
+    np.testing.assert_allclose(result.positions, [[0, 0], [0.5, 0.5], [1, 0], [1, 0]])
+    np.testing.assert_allclose(result.turnover, [0.0, 1.0, 1.0, 0.0])
+    np.testing.assert_allclose(result.costs, [0.0, 0.001, 0.001, 0.0])
+    np.testing.assert_allclose(result.gross_pnl, [0.0, 0.025, 0.02, -0.10])
+    np.testing.assert_allclose(result.net_pnl, [0.0, 0.024, 0.019, -0.10])
+    np.testing.assert_allclose(result.equity, [1.0, 1.024, 1.043456, 0.9391104])
+    np.testing.assert_allclose(result.drawdown, [0.0, 0.0, 0.0, -0.1], atol=1e-15)
+
+    metrics = result.metrics()
+    assert metrics["total_return"] == pytest.approx(-0.0608896)
+    assert metrics["annualized_return"] == pytest.approx(-0.0608896)
+    assert metrics["max_drawdown"] == pytest.approx(-0.1)
+    assert metrics["total_cost"] == pytest.approx(0.002)
+    assert metrics["avg_turnover"] == pytest.approx(0.5)
+    assert metrics["avg_exposure"] == pytest.approx(0.75)
+    net = np.array([0.0, 0.024, 0.019, -0.10])
+    assert metrics["sharpe"] == pytest.approx(net.mean() / net.std(ddof=1) * 2.0)
+
+    frame = result.frame(pd.Series(pd.date_range("2024-01-01", periods=4, freq="D")))
+    np.testing.assert_allclose(frame["gross_exposure"], [0.0, 1.0, 1.0, 1.0])
+
+
+def test_momentum_weights_follow_the_sign_of_the_lookback_return():
+    prices = np.array([[10.0, 5.0], [11.0, 4.0], [11.0, 6.0], [9.0, 6.5]])
+    weights = strategy_weights("momentum", prices, {"lookback": 1})
+    np.testing.assert_array_equal(weights, [[np.nan, np.nan], [0.5, -0.5], [0.0, 0.5], [-0.5, 0.5]])
+
+
+def test_parallel_sweep_matches_serial_sweep(tmp_path):
+    rng = np.random.default_rng(4)
+    returns = rng.normal(0.0, 0.01, size=(600, 3))
+    prices = 100.0 * np.cumprod(1.0 + returns, axis=0)
+    grid = {"fast": [6, 12], "slow": [24, 48]}
+
+    serial = run_sweep(prices, returns, "ma_crossover", grid, workers=1)
+    parallel = run_sweep(prices, returns, "ma_crossover", grid, workers=2, scratch_dir=tmp_path)
+
+    assert len(serial) == 4
+    pd.testing.assert_frame_equal(parallel, serial)
+    assert serial["sharpe"].is_monotonic_decreasing
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from chart_rendering import CHART_FILES, minmax_decimate, render_charts
+
+LABELS = ["Coin-A", "Coin-B"]
+
+
+def _arrays(rows: int = 500) -> dict:
+    rng = np.random.default_rng(2)
+    returns = rng.normal(0.0, 0.01, size=(rows, len(LABELS)))
+    return {
+        "timestamps": pd.date_range("2024-01-01", periods=rows, freq="5min").to_numpy("datetime64[ns]"),
+        "prices": 100.0 * np.cumprod(1.0 + returns, axis=0),
+        "returns": returns,
+        "correlation": np.array([[1.0, 0.3], [0.3, 1.0]]),
+    }
+
+
+def test_selected_charts_render_in_a_process_pool(tmp_path):
+    charts = ["price_trends", "return_boxplot", "correlation_heatmap"]
+    rendered = render_charts(_arrays(), LABELS, tmp_path, charts=charts, workers=2)
+
+    assert rendered == [tmp_path / CHART_FILES[chart] for chart in charts]
+    assert all(path.stat().st_size > 0 for path in rendered)
+    # Only the selected charts are drawn, and the shared input arrays are cleaned up.
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(CHART_FILES[chart] for chart in charts)
+
+
+def test_unknown_chart_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="Unknown chart"):
+        render_charts(_arrays(), LABELS, tmp_path, charts=["price_trends", "candles"])
+    assert render_charts(_arrays(), LABELS, tmp_path, charts=[]) == []
+
+
+@pytest.mark.filterwarnings("ignore:All-NaN slice")
+def test_minmax_decimate_keeps_each_bucket_envelope():
+    rows, buckets = 10_007, 100
+    rng = np.random.default_rng(4)
+    x = np.arange(rows)
+    y = np.cumsum(rng.normal(size=(rows, 2)), axis=0)
+    y[2000:2300, 1] = np.nan
+    y[5000, 0] = 1e6
+
+    x_out, y_out = minmax_decimate(x, y, buckets)
+    assert x_out.shape == (2 * buckets,) and y_out.shape == (2 * buckets, 2)
+    assert np.all(np.diff(x_out) >= 0)
+
+    starts = np.linspace(0, rows, buckets, endpoint=False).astype(np.int64)
+    for bucket, (start, end) in enumerate(zip(starts, np.append(starts[1:], rows))):
+        block = y[start:end]
+        np.testing.assert_array_equal(y_out[2 * bucket], np.nanmin(block, axis=0))
+        np.testing.assert_array_equal(y_out[2 * bucket + 1], np.nanmax(block, axis=0))
+    # The drawn range matches the full-resolution plot, spikes included.
+    np.testing.assert_array_equal(np.nanmax(y_out, axis=0), np.nanmax(y, axis=0))
+    np.testing.assert_array_equal(np.nanmin(y_out, axis=0), np.nanmin(y, axis=0))
+
+
+def test_minmax_decimate_leaves_short_and_missing_series_alone():
+    x = np.arange(150)
+    y = np.linspace(0.0, 1.0, 150)
+    x_out, y_out = minmax_decimate(x, y, 100)
+    np.testing.assert_array_equal(x_out, x)
+    np.testing.assert_array_equal(y_out, y)
+
+    y = np.full(1000, np.nan)
+    y[:500] = 1.0
+    _, y_out = minmax_decimate(np.arange(1000), y, 10)
+    # An all-NaN bucket stays NaN, so the line breaks instead of joining across the gap.
+    assert y_out.ndim == 1 and np.isnan(y_out[10:]).all() and (y_out[:10] == 1.0).all()
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import pandas as pd
+
+COINS = ["coin-a", "coin-b", "coin-c"]
+
+
+def test_chunked_summary_matches_in_memory(market_api, make_pipeline, tmp_path):
+    for coin_id in COINS:
+        market_api.add_coin(coin_id, 400)
+    summaries = []
+    for name, chunk_rows in (("memory", None), ("chunked", 64)):
+        pipeline = make_pipeline(output_dir=tmp_path / name, chunk_rows=chunk_rows)
+        pipeline.fetch_all(COINS)
+        pipeline.prepare_market_table()
+        pipeline.compute_returns_and_risk()
+        summaries.append(pipeline.build_summary())
+
+    in_memory, chunked = summaries
+    assert chunked["time_of_max_price"].dtype == in_memory["time_of_max_price"].dtype
+    pd.testing.assert_frame_equal(chunked, in_memory, check_exact=False, rtol=1e-9)
+
+
+def test_chunk_files_are_removed_when_the_pipeline_closes(pipeline_module, market_api, make_pipeline):
+    for coin_id in COINS:
+        market_api.add_coin(coin_id, 200)
+    pipeline = make_pipeline(chunk_rows=64, export_formats=["csv", "npy"], charts=["price_trends"])
+    pipeline.run(COINS)
+    chunk_dir = pipeline.output_dir / pipeline_module.CHUNK_DIR
+    assert any(chunk_dir.iterdir())
+
+    pipeline.close()
+    assert not chunk_dir.exists()
+    assert len(pd.read_csv(pipeline.output_dir / "market_data_with_returns.csv")) > 0
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+
+@pytest.mark.parametrize(
+    ("config", "options", "message"),
+    [
+        ("FetchConfig", {"on_fetch_error": "retry"}, "on_fetch_error"),
+        ("FetchConfig", {"vs_currencies": []}, "vs_currencies"),
+        ("StorageConfig", {"resample": "2h"}, "resample"),
+        ("StorageConfig", {"chunk_rows": 64, "incremental": True}, "Chunked processing"),
+        ("AnalyticsConfig", {"indicators": ["stochastic"]}, "Unsupported indicator"),
+        ("AnalyticsConfig", {"backtest_strategy": "momentum", "backtest_grid": {"fast": [6]}}, "Unknown momentum"),
+        ("OutputConfig", {"export_formats": ["xlsx"]}, "Unsupported export format"),
+    ],
+)
+def test_configs_validate_on_creation(pipeline_module, config, options, message):
+    with pytest.raises(ValueError, match=message):
+        getattr(pipeline_module, config)(**options)
+
+
+def test_configs_normalize_their_options(pipeline_module):
+    fetch = pipeline_module.FetchConfig(vs_currencies=("USD", "eur", "usd"))
+    storage = pipeline_module.StorageConfig(max_gap="30min")
+    analytics = pipeline_module.AnalyticsConfig(indicators=("sma", "rsi", "sma"), var_levels=[0.99, 0.99])
+
+    assert fetch.vs_currencies == ["usd", "eur"]
+    assert storage.max_gap == pd.Timedelta(minutes=30)
+    assert analytics.indicators == ["sma", "rsi"] and analytics.var_levels == (0.99,)
+
+
+def test_pipeline_checks_options_across_configs(pipeline_module, tmp_path):
+    with pytest.raises(ValueError, match="single quote currency"):
+        pipeline_module.CryptoMarketPipeline(
+            days=30,
+            output_dir=tmp_path,
+            fetch=pipeline_module.FetchConfig(vs_currencies=["usd", "eur"]),
+            storage=pipeline_module.StorageConfig(chunk_rows=64),
+        )
+
+    pipeline = pipeline_module.CryptoMarketPipeline(days=30, output_dir=tmp_path)
+    try:
+        assert pipeline.fetch == pipeline_module.FetchConfig()
+        assert pipeline.vs_currency == "usd" and not pipeline.checkpoint and pipeline.store is None
+    finally:
+        pipeline.close()
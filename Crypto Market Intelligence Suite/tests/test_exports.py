@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+COINS = ["coin-a", "coin-b"]
+
+
+def test_correlation_tables_keep_their_row_labels(pipeline_module, market_api, make_pipeline):
+    for coin_id in COINS:
+        market_api.add_coin(coin_id, 200)
+    pipeline = make_pipeline(export_formats=["csv", "npy"])
+    pipeline.run(COINS)
+
+    for name in ("price_correlation", "return_correlation"):
+        column_dir = pipeline.output_dir / f"{name}_npy"
+        assert not (column_dir / ".npy").exists()
+        table = pd.read_csv(pipeline.output_dir / f"{name}.csv", index_col="asset")
+        assert np.load(column_dir / "asset.npy").tolist() == list(table.index) == list(table.columns)
+
+
+def test_npy_export_rejects_unnamed_columns(pipeline_module, tmp_path):
+    frame = pd.DataFrame({"": ["a"], "value": [1.0]})
+    with pytest.raises(ValueError, match="unnamed"):
+        pipeline_module.write_table(frame, tmp_path / "table", "npy")
+
+
+def _table(rows: int = 50) -> pd.DataFrame:
+    rng = np.random.default_rng(11)
+    return pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2024-01-01", periods=rows, freq="h", tz="UTC", unit="ns"),
+            "coin-a_price": rng.normal(100.0, 5.0, rows),
+            "coin-a_pct_return": np.r_[np.nan, rng.normal(0.0, 0.01, rows - 1)],
+            "coin-a_filled": rng.random(rows) < 0.2,
+        }
+    )
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet", "feather", "npy"])
+def test_export_formats_round_trip(pipeline_module, tmp_path, fmt):
+    frame = _table()
+    pipeline_module.write_table(frame, tmp_path / "table", fmt)
+    loaded = pipeline_module.read_table(tmp_path / "table", fmt)
+
+    if fmt == "npy":
+        # Column files are memory-mapped; timestamps come back as naive UTC datetime64[ns].
+        assert sorted(loaded) == sorted(frame.columns)
+        assert isinstance(loaded["coin-a_price"], np.memmap)
+        loaded = pd.DataFrame({column: np.asarray(loaded[column]) for column in frame.columns})
+        loaded["timestamp"] = loaded["timestamp"].dt.tz_localize("UTC")
+    elif fmt == "csv":
+        loaded["timestamp"] = pd.to_datetime(loaded["timestamp"], utc=True)
+    pd.testing.assert_frame_equal(loaded, frame, check_dtype=fmt != "csv")
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet", "feather", "npy"])
+def test_streamed_export_matches_write_table(pipeline_module, tmp_path, fmt):
+    frame = _table(120)
+    pipeline_module.write_table(frame, tmp_path / "whole", fmt)
+    with pipeline_module.ChunkedTableWriter(tmp_path / "streamed", fmt, rows=len(frame)) as writer:
+        for start in range(0, len(frame), 32):
+            writer.write(frame.iloc[start : start + 32])
+
+    whole = pipeline_module.read_table(tmp_path / "whole", fmt)
+    streamed = pipeline_module.read_table(tmp_path / "streamed", fmt)
+    if fmt == "npy":
+        assert sorted(whole) == sorted(streamed)
+        for column in whole:
+            np.testing.assert_array_equal(streamed[column], whole[column])
+    else:
+        pd.testing.assert_frame_equal(streamed, whole)
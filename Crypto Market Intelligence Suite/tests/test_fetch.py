@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import time
+from email.utils import formatdate
+
+import pytest
+
+
+def _record_pauses(pipeline_module, monkeypatch) -> list:
+    pauses = []
+    original = pipeline_module.RateLimiter.pause
+
+    def pause(self, seconds: float) -> None:
+        pauses.append(seconds)
+        original(self, seconds)
+
+    monkeypatch.setattr(pipeline_module.RateLimiter, "pause", pause)
+    return pauses
+
+
+def test_rate_limiter_spaces_acquisitions(pipeline_module):
+    limiter = pipeline_module.RateLimiter(0.05)
+    start = time.monotonic()
+    for _ in range(5):
+        limiter.acquire()
+    # The first token is available at once; each later one waits a full spacing.
+    assert 0.19 <= time.monotonic() - start < 0.6
+
+
+def test_concurrent_fetches_share_one_pace(pipeline_module, market_api, make_pipeline, monkeypatch):
+    coins = [f"coin-{idx}" for idx in range(6)]
+    for coin_id in coins:
+        market_api.add_coin(coin_id, 50)
+    granted = []
+    original = pipeline_module.RateLimiter.acquire
+
+    def acquire(self) -> None:
+        original(self)
+        granted.append(time.monotonic())
+
+    monkeypatch.setattr(pipeline_module.RateLimiter, "acquire", acquire)
+    pipeline = make_pipeline(max_concurrency=4, request_spacing_seconds=0.05)
+    pipeline.fetch_all(coins)
+
+    assert sorted(pipeline.raw_series) == coins
+    assert len(pipeline.rate_limiters) == 1
+    # Four workers still get six requests through one token bucket: five spacings at least.
+    assert len(granted) == len(coins)
+    assert max(granted) - min(granted) >= 5 * 0.05 - 0.01
+
+
+def test_rate_limited_reply_pauses_the_shared_limiter(pipeline_module, market_api, make_pipeline, monkeypatch):
+    for coin_id in ("coin-a", "coin-b", "coin-c"):
+        market_api.add_coin(coin_id, 50)
+    market_api.replies.append((429, {"Retry-After": "0.2"}))
+    pauses = _record_pauses(pipeline_module, monkeypatch)
+
+    pipeline = make_pipeline(max_concurrency=3)
+    pipeline.fetch_all(["coin-a", "coin-b", "coin-c"])
+
+    assert pauses == [pytest.approx(0.2)]
+    assert sorted(pipeline.raw_series) == ["coin-a", "coin-b", "coin-c"]
+
+
+def test_http_date_retry_after_is_honoured(pipeline_module, market_api, make_pipeline, monkeypatch):
+    market_api.add_coin("coin-a", 50)
+    market_api.replies.append((429, {"Retry-After": formatdate(time.time() + 1, usegmt=True)}))
+    pauses = _record_pauses(pipeline_module, monkeypatch)
+
+    pipeline = make_pipeline()
+    pipeline.fetch_all(["coin-a"])
+
+    assert len(pauses) == 1 and 0.0 <= pauses[0] <= 2.0
+    assert list(pipeline.raw_series) == ["coin-a"]
+
+
+def test_unparseable_retry_after_falls_back_to_backoff(pipeline_module, market_api, make_pipeline, monkeypatch):
+    market_api.add_coin("coin-a", 50)
+    market_api.replies.append((429, {"Retry-After": "soon"}))
+    pauses = _record_pauses(pipeline_module, monkeypatch)
+
+    make_pipeline(retry_backoff=0.1).fetch_all(["coin-a"])
+
+    assert pauses == [pytest.approx(0.1)]
+
+
+def test_retry_after_seconds(pipeline_module):
+    parse = pipeline_module.retry_after_seconds
+    assert parse("2.5") == 2.5
+    assert parse(None) is None
+    assert parse("not a date") is None
+    assert parse("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+def test_cache_entries_are_not_shared_across_base_urls(market_api, make_pipeline, tmp_path):
+    market_api.add_coin("coin-a", 50)
+    output_dir = tmp_path / "shared"
+    make_pipeline(output_dir=output_dir, use_cache=True).fetch_all(["coin-a"])
+    make_pipeline(output_dir=output_dir, use_cache=True).fetch_all(["coin-a"])
+    assert len(market_api.paths) == 1
+
+    # Same cache directory, another endpoint: the payload must come from that endpoint.
+    other = market_api.base_url.replace("/api/v3/", "/api/v4/")
+    make_pipeline(output_dir=output_dir, use_cache=True, base_url=other).fetch_all(["coin-a"])
+    assert len(market_api.paths) == 2 and market_api.paths[-1].startswith("/api/v4/")
+
+
+def test_default_run_writes_no_checkpoints(pipeline_module, market_api, make_pipeline, monkeypatch):
+    market_api.add_coin("coin-a", 50)
+
+    def no_engine(*args, **kwargs):
+        raise ImportError("Unable to find a usable engine")
+
+    # Without --resume or the skip policy nothing is checkpointed, so no Parquet engine is needed.
+    monkeypatch.setattr(pipeline_module.pd.DataFrame, "to_parquet", no_engine)
+    pipeline = make_pipeline(export_formats=["csv"])
+    pipeline.run(["coin-a"])
+
+    assert not (pipeline.output_dir / pipeline_module.CHECKPOINT_DIR).exists()
+    assert (pipeline.output_dir / "market_data_with_returns.csv").exists()
+
+
+def test_skipped_coin_resumes_from_checkpoints(pipeline_module, market_api, make_pipeline):
+    market_api.add_coin("coin-a", 50)
+    first = make_pipeline(on_fetch_error="skip", retries=1)
+    first.fetch_all(["coin-a", "coin-b"])
+    assert list(first.failed_coins) == ["coin-b"]
+    assert (first.output_dir / pipeline_module.CHECKPOINT_DIR).exists()
+
+    market_api.add_coin("coin-b", 50)
+    requests_before = len(market_api.paths)
+    resumed = make_pipeline(resume=True)
+    resumed.fetch_all(["coin-a", "coin-b"])
+    # coin-a comes back from its checkpoint; only coin-b is fetched.
+    assert [path.split("/")[4] for path in market_api.paths[requests_before:]] == ["coin-b"]
+    assert sorted(resumed.raw_series) == ["coin-a", "coin-b"]
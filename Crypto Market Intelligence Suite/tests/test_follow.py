@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import pytest
+
+
+@pytest.fixture
+def followed(market_api, make_pipeline):
+    market_api.add_coin("coin-a", 300)
+    pipeline = make_pipeline()
+    pipeline.run(["coin-a"])
+    return pipeline
+
+
+def test_failed_poll_is_retried(market_api, followed):
+    rows = len(followed.price_returns)
+    market_api.replies.append((404, {}))
+    followed.follow(poll_interval=0, buffer_size=100, max_polls=3, max_failures=2)
+    # The failed poll left the batch tables and live window in place, and the next polls went ahead.
+    assert len(followed.price_returns) == rows
+    assert not market_api.replies
+    assert sum("/range" in path for path in market_api.paths) == 3
+
+
+def test_consecutive_failed_polls_end_the_session(market_api, followed):
+    market_api.replies.extend([(404, {})] * 3)
+    with pytest.raises(RuntimeError, match="2 failed polls in a row"):
+        followed.follow(poll_interval=0, buffer_size=100, max_polls=5, max_failures=2)
+    assert len(market_api.replies) == 1
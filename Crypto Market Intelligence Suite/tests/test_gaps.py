@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+COINS = ["coin-a", "coin-b"]
+
+
+@pytest.fixture
+def gapped_api(market_api):
+    # Five hours of coin-a are missing, and the price resumes 9% higher.
+    for coin_id in COINS:
+        market_api.add_coin(coin_id, 400)
+    payload = market_api.payloads["coin-a"]
+    for key in ("prices", "market_caps", "total_volumes"):
+        rows = payload[key]
+        payload[key] = rows[:200] + [[ts, value * 1.09] for ts, value in rows[260:]]
+    return market_api
+
+
+def _analyse(pipeline) -> None:
+    pipeline.fetch_all(COINS)
+    pipeline.prepare_market_table()
+    pipeline.compute_returns_and_risk()
+    pipeline.build_summary()
+    pipeline.optimize_portfolio()
+    pipeline.compute_rolling_risk()
+
+
+def test_returns_stay_missing_across_an_unfilled_gap(gapped_api, make_pipeline):
+    pipeline = make_pipeline(max_gap="30min", backtest_strategy="momentum")
+    _analyse(pipeline)
+    pipeline.run_backtest()
+    table = pipeline.price_returns
+
+    prices = table["coin-a_price"].to_numpy()
+    returns = table["coin-a_pct_return"].to_numpy()
+    missing = np.flatnonzero(np.isnan(prices))
+    assert len(missing) > 0
+    assert np.isnan(returns[missing]).all()
+    assert np.isnan(table["coin-a_log_return"].to_numpy()[missing]).all()
+
+    # The first return after the outage carries the whole move from the last observed price.
+    before, after = prices[missing[0] - 1], prices[missing[-1] + 1]
+    assert returns[missing[-1] + 1] == pytest.approx(after / before - 1.0)
+    assert np.isfinite(np.delete(returns, missing)).all()
+
+    engine = pipeline.correlation_engines["returns"]
+    assert engine.count == engine.rows - len(missing)
+    assert np.isfinite(pipeline.correlation_matrix.to_numpy()).all()
+    assert np.isfinite(pipeline.summary_table["annualized_volatility"]).all()
+    assert np.isfinite(pipeline.rolling_risk["annualized_volatility"]).all()
+    assert np.isfinite(pipeline.portfolio_weights.filter(like="_weight").to_numpy()).all()
+    assert np.isfinite(pipeline.backtest_equity["equity"]).all()
+
+
+def test_chunk_boundary_inside_a_gap_matches_in_memory(gapped_api, make_pipeline, tmp_path):
+    in_memory = make_pipeline(output_dir=tmp_path / "memory", max_gap="30min")
+    _analyse(in_memory)
+    # 37-row chunks put several boundaries inside the 60-row outage.
+    chunked = make_pipeline(output_dir=tmp_path / "chunked", max_gap="30min", chunk_rows=37)
+    _analyse(chunked)
+
+    columns = [f"{coin}_{field}" for coin in COINS for field in ("pct_return", "log_return")]
+    stored = pd.concat(list(chunked.returns_store.chunks(columns)), ignore_index=True)
+    pd.testing.assert_frame_equal(stored, in_memory.price_returns[columns])
+    pd.testing.assert_frame_equal(chunked.rolling_risk, in_memory.rolling_risk)
+
+
+def test_block_without_new_rows_has_no_returns(pipeline_module):
+    # An incremental run that finds no new candles passes an empty block after the stored prices.
+    returns = pipeline_module.compute_return_matrix(np.empty((0, 2)), np.array([100.0, np.nan]))
+    assert returns.shape == (0, 2, 2)
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+COINS = ["coin-a", "coin-b"]
+MOMENT_COLUMNS = ["mean_price", "std_price", "annualized_volatility", "downside_volatility", "avg_pct_return"]
+
+
+def _serve(market_api, full: dict, hourly_points: int, points: int) -> None:
+    # An hourly history, as a full fetch of a multi-day window returns, then 5-minute points from /range.
+    market_api.payloads = {
+        coin_id: {key: rows[:hourly_points:12] + rows[hourly_points:points] for key, rows in payload.items()}
+        for coin_id, payload in full.items()
+    }
+
+
+@pytest.mark.parametrize("method", ["sample", "ewma"])
+def test_incremental_runs_keep_a_days_window_on_the_stored_grid(
+    pipeline_module, market_api, make_pipeline, tmp_path, method
+):
+    for coin_id in COINS:
+        market_api.add_coin(coin_id, 1500)
+    full = dict(market_api.payloads)
+    options = dict(days=2, incremental=True, correlation_method=method, indicators=["sma"], indicator_window=5)
+
+    for points in (720, 1100, 1500):
+        _serve(market_api, full, 720, points)
+        stored = len(pd.read_parquet(tmp_path / "outputs" / pipeline_module.STATE_FILE)) if points > 720 else 0
+        pipeline = make_pipeline(**options)
+        pipeline.run(COINS)
+        table = pipeline.price_returns
+
+        timestamps = table["timestamp"]
+        if stored:
+            assert timestamps.iloc[0] >= timestamps.iloc[-1] - pd.Timedelta(days=2)
+            # 5-minute points were sampled onto the stored hourly spacing.
+            spacing = timestamps.iloc[stored - pipeline.trimmed_rows - 1 :].diff().iloc[1:]
+            assert spacing.nunique() == 1
+            assert abs(spacing.iloc[0] - pd.Timedelta(hours=1)) < pd.Timedelta(seconds=5)
+            assert pipeline.trimmed_rows > 0
+
+        # Saved moments and engines, slid along with the window, match a rebuild over the window.
+        rebuilt = pipeline._summary_frame(table, COINS)
+        pd.testing.assert_frame_equal(pipeline.summary_table[MOMENT_COLUMNS], rebuilt[MOMENT_COLUMNS], rtol=1e-9)
+        for name, engine in pipeline.correlation_engines.items():
+            fresh = pipeline_module.CorrelationEngine(engine.assets, engine.method, engine.halflife)
+            fresh.update(table[engine.assets].iloc[1 if name == "returns" else 0 :].to_numpy(dtype=np.float64))
+            assert engine.rows == fresh.rows
+            np.testing.assert_allclose(engine.covariance(), fresh.covariance(), rtol=1e-9)
+        assert pipeline.indicator_table["timestamp"].equals(timestamps)
+
+
+def test_rolling_risk_engine_is_restored_and_fed_only_the_delta(pipeline_module, market_api, make_pipeline, monkeypatch):
+    for coin_id in COINS:
+        market_api.add_coin(coin_id, 400)
+    full = dict(market_api.payloads)
+    _serve(market_api, full, 0, 300)
+    make_pipeline(incremental=True).run(COINS)
+
+    primed = []
+    original = pipeline_module.RollingRiskEngine.prime
+
+    def prime(self, returns):
+        primed.append(len(returns))
+        original(self, returns)
+
+    monkeypatch.setattr(pipeline_module.RollingRiskEngine, "prime", prime)
+    _serve(market_api, full, 0, 400)
+    pipeline = make_pipeline(incremental=True)
+    pipeline.run(COINS)
+    table = pipeline.price_returns
+    assert primed == [len(table) - len(pipeline.state)]
+
+    rebuilt = pipeline_module.RollingRiskEngine(COINS, pipeline.analytics.rolling_window, benchmark=COINS[0])
+    rebuilt.prime(table[[f"{coin}_pct_return" for coin in COINS]].to_numpy())
+    pd.testing.assert_frame_equal(pipeline.rolling_engine.snapshot(), rebuilt.snapshot(), rtol=1e-9)
+
+    # A different coin set cannot reuse the saved engine, so the history is primed again.
+    primed.clear()
+    smaller = make_pipeline(incremental=True)
+    smaller.run(COINS[:1])
+    assert primed == [len(smaller.price_returns)]
+
+
+@pytest.mark.parametrize("method", ["sample", "ewma"])
+def test_resampled_incremental_run_matches_a_fresh_run(market_api, make_pipeline, tmp_path, method):
+    for coin_id in COINS:
+        market_api.add_coin(coin_id, 600)
+    full = dict(market_api.payloads)
+    options = dict(resample="1h", correlation_method=method, indicators=["sma", "ema"], indicator_window=5)
+
+    # Both runs stop part-way through an hourly bucket; the next run completes it.
+    for points in (305, 450, 454):
+        _serve(market_api, full, 0, points)
+        incremental = make_pipeline(output_dir=tmp_path / "incremental", incremental=True, **options)
+        incremental.run(COINS)
+    assert incremental.reopened_state is not None
+    fresh = make_pipeline(output_dir=tmp_path / "fresh", **options)
+    fresh.run(COINS)
+
+    pd.testing.assert_frame_equal(incremental.price_returns, fresh.price_returns, rtol=1e-9)
+    pd.testing.assert_frame_equal(incremental.summary_table, fresh.summary_table, rtol=1e-9)
+    pd.testing.assert_frame_equal(incremental.correlation_matrix, fresh.correlation_matrix, rtol=1e-9)
+    pd.testing.assert_frame_equal(incremental.return_correlation, fresh.return_correlation, rtol=1e-9)
+    pd.testing.assert_frame_equal(incremental.indicator_table, fresh.indicator_table, rtol=1e-9)
+    pd.testing.assert_frame_equal(incremental.rolling_risk, fresh.rolling_risk, rtol=1e-9)
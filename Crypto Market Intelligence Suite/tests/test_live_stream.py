@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+COINS = ["coin-a", "coin-b", "coin-c"]
+
+
+@pytest.mark.parametrize("capacity", [2, 25])
+def test_live_summary_matches_a_recompute_over_the_window(pipeline_module, make_pipeline, capacity):
+    pipeline = make_pipeline()
+    window = pipeline_module.PriceRingBuffer(COINS, capacity, resync_interval=50)
+    rng = np.random.default_rng(3)
+    # Rounded prices repeat, so extremes tie and leave the window often; coin-c starts unobserved.
+    prices = np.round(100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.02, size=(200, len(COINS))), axis=0)), 0)
+    prices[:40, 2] = np.nan
+    timestamps = pd.date_range("2024-01-01", periods=len(prices), freq="5min", tz="UTC").as_unit("ns").asi8
+
+    for row in range(len(prices)):
+        window.append(int(timestamps[row]), prices[row])
+        live = pipeline._live_summary(window, COINS)
+        rebuilt = pipeline._summary_frame(window.window_frame(), COINS)
+        pd.testing.assert_frame_equal(live, rebuilt, rtol=1e-9)
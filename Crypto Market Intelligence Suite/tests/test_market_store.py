@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from market_store import MarketStore
+
+COINS = ["coin-a", "coin-b"]
+
+
+def _table(start: str, periods: int, offset: float = 0.0) -> pd.DataFrame:
+    timestamps = pd.date_range(start, periods=periods, freq="6h", tz="UTC")
+    table = {"timestamp": timestamps}
+    for index, coin in enumerate(COINS):
+        table[f"{coin}_price"] = 100.0 * (index + 1) + np.arange(periods) + offset
+        table[f"{coin}_volume"] = np.arange(periods) * 10.0 + offset
+        table[f"{coin}_filled"] = np.zeros(periods, dtype=bool)
+    return pd.DataFrame(table)
+
+
+def test_write_upserts_overlapping_rows(tmp_path):
+    store = MarketStore(tmp_path)
+    first = _table("2024-01-30", 12)
+    # Overlaps the last four rows of the first write, across the month boundary.
+    second = _table("2024-02-01", 8, offset=0.5)
+
+    assert store.write(first, COINS, "usd") == 4
+    store.write(second, COINS, "usd")
+
+    assert store.coins("usd") == COINS
+    assert store.months("coin-a") == ["2024-01", "2024-02"]
+    stored = store.query("coin-a")
+    expected = pd.concat([first.iloc[:8], second], ignore_index=True)
+    assert stored["timestamp"].is_unique
+    pd.testing.assert_series_equal(stored["timestamp"], expected["timestamp"], check_dtype=False)
+    np.testing.assert_array_equal(stored["price"], expected["coin-a_price"])
+    np.testing.assert_array_equal(stored["volume"], expected["coin-a_volume"])
+    # Fields the table did not carry are not invented.
+    assert "market_cap" not in stored.columns
+
+
+def test_query_returns_the_half_open_range(tmp_path):
+    store = MarketStore(tmp_path)
+    table = _table("2024-01-25", 60)
+    store.write(table, COINS, "usd")
+
+    result = store.query(COINS, start="2024-02-01", end="2024-02-03 06:00", fields=["price"])
+    assert list(result.columns) == ["timestamp", "coin", "price"]
+    inside = table[
+        (table["timestamp"] >= pd.Timestamp("2024-02-01", tz="UTC"))
+        & (table["timestamp"] < pd.Timestamp("2024-02-03 06:00", tz="UTC"))
+    ]
+    assert len(inside) == 9
+    for coin in COINS:
+        rows = result[result["coin"] == coin]
+        np.testing.assert_array_equal(rows["timestamp"].to_numpy(), inside["timestamp"].to_numpy())
+        np.testing.assert_array_equal(rows["price"], inside[f"{coin}_price"])
+
+    assert store.query("coin-a", start="2025-01-01").empty
+    assert store.query("coin-a", vs_currency="eur").empty
+    with pytest.raises(ValueError, match="Unknown field"):
+        store.query("coin-a", fields=["close"])
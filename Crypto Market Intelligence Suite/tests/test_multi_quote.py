@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+COINS = ["coin-a", "coin-b"]
+
+
+def test_incremental_run_keeps_the_full_primary_quote(market_api, make_pipeline, tmp_path):
+    for coin_id in COINS:
+        market_api.add_coin(coin_id, 400)
+    full = {coin_id: payload for coin_id, payload in market_api.payloads.items()}
+    market_api.payloads = {
+        coin_id: {key: rows[:300] for key, rows in payload.items()} for coin_id, payload in full.items()
+    }
+    options = dict(output_dir=tmp_path / "incremental", vs_currencies=["usd", "eur"], incremental=True)
+    make_pipeline(**options).run(COINS)
+
+    # The second run only fetches the last 100 points of the first quote through /range.
+    market_api.payloads = full
+    incremental = make_pipeline(**options)
+    incremental.run(COINS)
+    fresh = make_pipeline(output_dir=tmp_path / "fresh", vs_currencies=["usd", "eur"])
+    fresh.run(COINS)
+
+    usd = incremental.multi_quote_table.xs("usd", level="vs_currency")
+    assert len(usd) == len(fresh.multi_quote_table.xs("usd", level="vs_currency"))
+    assert not usd[[f"{coin}_filled" for coin in COINS]].to_numpy().all(axis=1).any()
+    assert np.isfinite(usd[[f"{coin}_price" for coin in COINS]].to_numpy()).all()
+    pd.testing.assert_frame_equal(incremental.multi_quote_table, fresh.multi_quote_table)
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pytest
+
+from benchmark_pipeline import synthetic_payload
+from market_payload import PAYLOAD_KEYS, VALUE_DTYPES, parse_market_chart_stream, payload_to_arrays
+
+
+def _chunks(body: bytes, size: int):
+    return (body[start : start + size] for start in range(0, len(body), size))
+
+
+def _payload() -> dict:
+    payload = synthetic_payload(0, 500, seed=3)
+    payload["total_volumes"][7][1] = None
+    payload["market_caps"][11][1] = 1.5e-7
+    # Unknown keys are skipped by the stream parser.
+    return {"meta": {"prices": "not a series"}, **payload, "trailer": [[1, 2]]}
+
+
+@pytest.mark.parametrize("value_dtype", VALUE_DTYPES)
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 20])
+def test_stream_parser_matches_bulk_parser(value_dtype, chunk_size):
+    payload = _payload()
+    body = json.dumps(payload).encode("utf-8")
+
+    bulk = payload_to_arrays(payload, value_dtype)
+    streamed = parse_market_chart_stream(_chunks(body, chunk_size), value_dtype)
+
+    for key in PAYLOAD_KEYS:
+        np.testing.assert_array_equal(streamed[key][0], bulk[key][0])
+        assert streamed[key][0].dtype == np.int64
+        assert streamed[key][1].dtype == np.dtype(value_dtype) == bulk[key][1].dtype
+        np.testing.assert_array_equal(streamed[key][1], bulk[key][1])
+    assert np.isnan(streamed["total_volumes"][1][7])
+
+
+def test_stream_parser_rejects_truncated_body():
+    body = json.dumps(synthetic_payload(0, 20, seed=3)).encode("utf-8")
+    with pytest.raises(ValueError, match="Truncated"):
+        parse_market_chart_stream(_chunks(body[: len(body) // 2], 16))
+
+
+@pytest.mark.parametrize("value_dtype", VALUE_DTYPES)
+def test_streamed_fetch_matches_bulk_fetch(market_api, make_pipeline, value_dtype):
+    market_api.add_coin("coin-a", 400)
+    bulk = make_pipeline(value_dtype=value_dtype)._fetch_coin_series("coin-a").dataframe
+    streamed = make_pipeline(value_dtype=value_dtype, stream_threshold_bytes=0)._fetch_coin_series("coin-a").dataframe
+
+    assert streamed.dtypes.equals(bulk.dtypes)
+    assert bulk["coin-a_price"].dtype == np.dtype(value_dtype)
+    assert streamed.equals(bulk)
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from portfolio import PortfolioOptimizer
+
+ASSETS = ["coin-a", "coin-b", "coin-c", "coin-d"]
+
+
+def _moments():
+    rng = np.random.default_rng(21)
+    returns = rng.normal(0.0, 0.01, size=(500, len(ASSETS))) @ rng.uniform(0.2, 1.0, (len(ASSETS), len(ASSETS)))
+    returns += np.array([0.0004, 0.0001, -0.0002, 0.0003])
+    return returns.mean(axis=0), np.cov(returns, rowvar=False)
+
+
+def test_min_variance_weights_match_the_closed_form():
+    mean, covariance = _moments()
+    optimizer = PortfolioOptimizer(ASSETS, mean, covariance, periods_per_year=365)
+    weights = optimizer.min_variance()
+
+    inv_ones = np.linalg.solve(covariance, np.ones(len(ASSETS)))
+    assert weights.sum() == pytest.approx(1.0, abs=1e-12)
+    # Annualizing scales the covariance, which the normalization cancels.
+    np.testing.assert_allclose(weights, inv_ones / inv_ones.sum(), rtol=1e-9)
+
+    # No other fully invested mix has a lower variance.
+    rng = np.random.default_rng(3)
+    for _ in range(20):
+        tilt = rng.normal(0.0, 0.1, len(ASSETS))
+        other = weights + tilt - tilt.mean()
+        assert other @ covariance @ other >= weights @ covariance @ weights
+
+
+def test_mean_variance_and_frontier_stay_fully_invested():
+    mean, covariance = _moments()
+    optimizer = PortfolioOptimizer(ASSETS, mean, covariance, periods_per_year=365)
+
+    weights = optimizer.mean_variance(risk_aversion=3.0)
+    assert weights.sum() == pytest.approx(1.0, abs=1e-12)
+    # First-order condition: mu - ra * cov w is the same for every asset (the budget multiplier).
+    gradient = optimizer.expected_returns - 3.0 * optimizer.covariance @ weights
+    np.testing.assert_allclose(gradient, gradient.mean(), atol=1e-9)
+
+    targets, frontier = optimizer.frontier(points=5)
+    np.testing.assert_allclose(frontier.sum(axis=1), 1.0, atol=1e-12)
+    np.testing.assert_allclose(frontier @ optimizer.expected_returns, targets, rtol=1e-9)
+    np.testing.assert_allclose(frontier[0], optimizer.min_variance(), atol=1e-9)
+
+
+def test_risk_parity_equalizes_risk_contributions():
+    mean, covariance = _moments()
+    optimizer = PortfolioOptimizer(ASSETS, mean, covariance)
+    weights = optimizer.risk_parity()
+
+    assert weights.sum() == pytest.approx(1.0) and (weights > 0).all()
+    contributions = weights * (optimizer.covariance @ weights)
+    np.testing.assert_allclose(contributions / contributions.sum(), 0.25, rtol=1e-8)
+
+    table = optimizer.weights_table()
+    assert list(table["portfolio"]) == ["min_variance", "mean_variance", "risk_parity"]
+    np.testing.assert_allclose(table[[f"{asset}_weight" for asset in ASSETS]].sum(axis=1), 1.0)
+
+
+def test_rejects_mismatched_shapes():
+    with pytest.raises(ValueError, match="covariance matrix"):
+        PortfolioOptimizer(ASSETS, np.zeros(3), np.eye(4))
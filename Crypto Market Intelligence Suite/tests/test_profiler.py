@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from stage_profiler import StageProfiler
+
+REPORT_KEYS = {"stages", "total_wall_seconds", "total_cpu_seconds", "peak_rss_mb", "counters"}
+STAGE_KEYS = {"name", "wall_seconds", "cpu_seconds", "peak_rss_mb", "alloc_delta_mb", "alloc_peak_mb", "counters"}
+
+
+def test_report_totals_stage_timings_and_counters(tmp_path):
+    profiler = StageProfiler(trace_memory=True, profile_dir=tmp_path / "profile")
+    profiler.count("ignored")  # Outside any stage.
+    with profiler.stage("load"):
+        profiler.count("rows", 10)
+        profiler.count("requests")
+        profiler.count("requests")
+    with profiler.stage("save"):
+        profiler.count("rows", 5)
+        buffer = bytearray(1 << 20)
+
+    report = profiler.report()
+    assert set(report) == REPORT_KEYS
+    assert [stage["name"] for stage in report["stages"]] == ["load", "save"]
+    assert all(set(stage) == STAGE_KEYS for stage in report["stages"])
+    assert report["stages"][0]["counters"] == {"rows": 10, "requests": 2}
+    assert report["counters"] == {"rows": 15, "requests": 2}
+    assert report["total_wall_seconds"] == pytest.approx(sum(stage["wall_seconds"] for stage in report["stages"]))
+    assert report["stages"][1]["alloc_peak_mb"] >= 1.0 > report["stages"][0]["alloc_peak_mb"]
+    assert sorted(path.name for path in (tmp_path / "profile").iterdir()) == ["01_load.prof", "02_save.prof"]
+    del buffer
+
+    profiler.write_report(tmp_path / "report" / "timing_report.json")
+    assert json.loads((tmp_path / "report" / "timing_report.json").read_text(encoding="utf-8")) == report
+
+
+def test_pipeline_run_reports_every_stage(market_api, make_pipeline):
+    for coin_id in ("coin-a", "coin-b"):
+        market_api.add_coin(coin_id, 200)
+    pipeline = make_pipeline()
+    pipeline.run(["coin-a", "coin-b"])
+
+    report = pipeline.profiler.report()
+    assert [stage["name"] for stage in report["stages"]] == [
+        "fetch_all",
+        "prepare_market_table",
+        "compute_returns_and_risk",
+        "build_summary",
+        "optimize_portfolio",
+        "compute_rolling_risk",
+        "compute_indicators",
+        "run_backtest",
+        "make_visualizations",
+        "export_outputs",
+    ]
+    assert report["stages"][0]["counters"]["requests"] == 2
+    assert report["stages"][-1]["counters"]["rows"] == len(pipeline.price_returns)
+    assert report["stages"][0]["peak_rss_mb"] > 0
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import pandas as pd
+
+
+def test_incremental_run_with_fewer_coins_projects_the_state(pipeline_module, market_api, make_pipeline, tmp_path):
+    coins = ["coin-a", "coin-b", "coin-c"]
+    for coin_id in coins:
+        market_api.add_coin(coin_id, 400)
+    full = dict(market_api.payloads)
+    market_api.payloads = {
+        coin_id: {key: rows[:300] for key, rows in payload.items()} for coin_id, payload in full.items()
+    }
+    output_dir = tmp_path / "outputs"
+    first = make_pipeline(output_dir=output_dir, incremental=True)
+    first.run(coins)
+    stored_rows = len(first.price_returns)
+
+    market_api.payloads = full
+    second = make_pipeline(output_dir=output_dir, incremental=True)
+    second.run(coins[:2])
+
+    # Only the delta was fetched, and the stored history was kept for the remaining coins.
+    assert any("/range" in path for path in market_api.paths)
+    assert len(second.price_returns) > stored_rows
+    kept = first.price_returns.drop(columns=[col for col in first.price_returns.columns if col.startswith("coin-c_")])
+    pd.testing.assert_frame_equal(second.price_returns.iloc[:stored_rows], kept, check_like=True)
+    state = pd.read_parquet(output_dir / pipeline_module.STATE_FILE)
+    assert not [col for col in state.columns if col.startswith("coin-c_")]
+    assert list(second.summary_table["coin"]) == ["Coin-A", "Coin-B"]
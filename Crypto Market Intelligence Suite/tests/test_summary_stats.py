@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from summary_stats import column_moments, quantile_label, tail_statistics, var_labels
+
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95)
+VAR_LEVELS = (0.9, 0.95, 0.99, 0.995)
+
+
+def _returns() -> np.ndarray:
+    rng = np.random.default_rng(11)
+    returns = rng.standard_t(3, size=(1500, 4)) * 0.02
+    # Uneven histories: the selection runs once per distinct observation count.
+    returns[:400, 1] = np.nan
+    returns[rng.choice(1500, 37, replace=False), 2] = np.nan
+    returns[:, 3] = np.nan
+    returns[-1, 3] = 0.01
+    return returns
+
+
+def test_quantiles_and_var_match_np_quantile():
+    returns = _returns()
+    stats = tail_statistics(returns, QUANTILES, VAR_LEVELS)
+
+    for q in QUANTILES:
+        np.testing.assert_allclose(stats[quantile_label(q)], np.nanquantile(returns, q, axis=0), rtol=1e-12)
+    for level in VAR_LEVELS:
+        var_label, _ = var_labels(level)
+        np.testing.assert_allclose(stats[var_label], -np.nanquantile(returns, 1.0 - level, axis=0), rtol=1e-12)
+
+
+def test_cvar_averages_the_worst_returns():
+    returns = _returns()
+    stats = tail_statistics(returns, (), VAR_LEVELS)
+
+    for level in VAR_LEVELS:
+        _, cvar_label = var_labels(level)
+        for column in range(returns.shape[1]):
+            observed = np.sort(returns[~np.isnan(returns[:, column]), column])
+            tail = max(math.ceil(round((1.0 - level) * len(observed), 9)), 1)
+            assert stats[cvar_label][column] == pytest.approx(-observed[:tail].mean(), rel=1e-12)
+    # CVaR is never a smaller loss than VaR at the same level.
+    for level in VAR_LEVELS:
+        var_label, cvar_label = var_labels(level)
+        assert np.all(stats[cvar_label] >= tail_statistics(returns, (), (level,))[var_label])
+
+
+def test_empty_columns_are_nan():
+    returns = np.full((10, 2), np.nan)
+    returns[:, 0] = np.linspace(-0.05, 0.04, 10)
+    stats = tail_statistics(returns, (0.5,), (0.95,))
+    assert np.isnan(stats["return_q50"][1]) and np.isnan(stats["var_95"][1]) and np.isnan(stats["cvar_95"][1])
+    assert stats["cvar_95"][0] == pytest.approx(0.05)
+
+
+def test_column_moments_match_pandas():
+    returns = _returns()
+    count, mean, std = column_moments(returns)
+    frame = pd.DataFrame(returns)
+    np.testing.assert_array_equal(count, frame.count().to_numpy())
+    np.testing.assert_allclose(mean, frame.mean().to_numpy(), rtol=1e-12)
+    np.testing.assert_allclose(std, frame.std().to_numpy(), rtol=1e-10)
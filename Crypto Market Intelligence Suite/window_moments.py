@@ -0,0 +1,69 @@
+"""
+Window Moments
+
+Count, mean and second moments of the rows in a sliding window:
+- Welford updates as a row enters and the oldest row leaves, O(width) per row, or
+  O(width^2) when the full co-moment matrix is kept
+- Per-column sums of squared deviations, plus either the full co-moment matrix or the
+  co-moments of every column with one benchmark column
+- Removing rows accumulates rounding error, so owners keep the rows in a buffer and
+  ``rebuild`` from it every so often
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+
+class WindowMoments:
+    def __init__(self, width: int, full: bool = False, benchmark: int | None = None) -> None:
+        self.width = width
+        self.full = full
+        self.benchmark = benchmark
+        self.clear()
+
+    def clear(self) -> None:
+        self.count = 0
+        self.mean = np.zeros(self.width)
+        self.m2 = np.zeros(self.width)
+        self.comoment = np.zeros((self.width, self.width)) if self.full else None
+        self.cov = np.zeros(self.width) if self.benchmark is not None else None
+
+    def add(self, row: np.ndarray) -> None:
+        self.count += 1
+        delta = row - self.mean
+        self.mean += delta / self.count
+        after = row - self.mean
+        self.m2 += delta * after
+        if self.comoment is not None:
+            self.comoment += np.outer(delta, after)
+        if self.cov is not None:
+            self.cov += delta * after[self.benchmark]
+
+    def remove(self, row: np.ndarray) -> None:
+        self.count -= 1
+        if self.count == 0:
+            self.clear()
+            return
+        delta = row - self.mean
+        self.mean -= delta / self.count
+        after = row - self.mean
+        self.m2 -= delta * after
+        if self.comoment is not None:
+            self.comoment -= np.outer(after, delta)
+        if self.cov is not None:
+            self.cov -= after * delta[self.benchmark]
+
+    def rebuild(self, rows: np.ndarray) -> None:
+        """Recompute the moments from the (rows, width) block currently in the window."""
+        if not len(rows):
+            self.clear()
+            return
+        self.count = len(rows)
+        self.mean = rows.mean(axis=0)
+        centered = rows - self.mean
+        self.m2 = (centered**2).sum(axis=0)
+        if self.full:
+            self.comoment = centered.T @ centered
+        if self.benchmark is not None:
+            self.cov = (centered * centered[:, [self.benchmark]]).sum(axis=0)